@@ -0,0 +1,63 @@
+"""
+Persistent cache of compiled programs, similar to Python's __pycache__. After a script has been scanned, parsed and
+resolved, its statements, which carry the depths of their local variables, are pickled into a __loxcache__ directory
+next to the script. The cache file records a hash of the script's contents and the cache format version, and is only
+loaded while both still match, letting later runs skip the Scanner, Parser and Resolver entirely.
+"""
+
+import os
+import sys
+import pickle
+import hashlib
+
+# Version of the cached data; bump whenever the AST classes or resolver output change shape.
+CACHE_VERSION = 15
+
+# Name of the directory, created next to each script, that holds the cache files.
+CACHE_DIR = "__loxcache__"
+
+
+class AstCache:
+    # Extension of the cache files.
+    extension = "pickle"
+
+    # Initialise the cache, tagging entries with the format version, the Python version and any compilation variant.
+    def __init__(self, variant: str = ""):
+        self.tag = f"lox{CACHE_VERSION}-py{sys.version_info.major}{sys.version_info.minor}{variant}"
+
+    # Return the path of the cache file for a script.
+    def path_for(self, script_path: str):
+        directory, name = os.path.split(os.path.abspath(script_path))
+        return os.path.join(directory, CACHE_DIR, f"{name}.{self.tag}.{self.extension}")
+
+    # Return a hash of the script's contents.
+    def digest(self, script_path: str):
+        with open(script_path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    # Load the cached statements for a script, or return None if there is no valid entry.
+    def load(self, script_path: str, digest: str):
+        try:
+            with open(self.path_for(script_path), "rb") as f:
+                header, statements = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+            # A missing, unreadable or incompatible entry is treated as a cache miss.
+            return None
+        # The entry is stale if the script has changed or it was written by a different version.
+        if header != (self.tag, digest):
+            return None
+        return statements
+
+    # Store the statements compiled from a script, silently giving up if the cache is not writable.
+    def store(self, script_path: str, digest: str, statements: list):
+        path = self.path_for(script_path)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "wb") as f:
+                pickle.dump(((self.tag, digest), statements), f, pickle.HIGHEST_PROTOCOL)
+            # Replace atomically so a concurrent run never sees a partly written entry.
+            os.replace(temp_path, path)
+        except (OSError, pickle.PicklingError, RecursionError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
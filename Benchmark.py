@@ -0,0 +1,646 @@
+"""
+Performance benchmarks for the interpreter. Each benchmark builds a large workload, usually by repeating the scripts in
+lox_scripts, times the engines being compared and prints the results. Run a benchmark by name, for example:
+
+    python Benchmark.py scanner --size 8
+"""
+
+import os
+import io
+import sys
+import argparse
+import shutil
+import tempfile
+import tracemalloc
+import timeit
+from contextlib import redirect_stderr
+from time import perf_counter
+from Scanner import Scanner
+from FastScanner import FastScanner
+from Parser import Parser
+from PrattParser import PrattParser
+from ErrorReporter import error_reporter
+from AstCache import AstCache
+import Expr
+import Stmt
+from lox import Lox, ENGINES, INTERPRETERS, RETURNS
+from Interpreter import Interpreter
+from LoxClass import LoxClass
+from LoxInstance import LoxInstance
+from Specializer import Specializer
+from Fuser import Fuser, superinstructions
+from Environment import Environment, allocations_avoided
+from contextlib import redirect_stdout
+
+
+# Directory holding the sample scripts used as benchmark input.
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lox_scripts")
+
+
+# Concatenates every script in lox_scripts into one source string, optionally only those that parse cleanly.
+def corpus(parseable: bool = False):
+    sources = []
+    for file in sorted(os.listdir(SCRIPTS_DIR)):
+        if file.endswith(".lox"):
+            with open(os.path.join(SCRIPTS_DIR, file), "r") as f:
+                src = f.read()
+            if parseable and not parses(src):
+                continue
+            sources.append(src)
+    return "\n".join(sources) + "\n"
+
+
+# Checks whether a source scans and parses without errors, keeping any error messages quiet.
+def parses(src: str):
+    with redirect_stderr(io.StringIO()):
+        Parser(Scanner(src).scan_tokens()).parse()
+    ok = not error_reporter.had_error
+    error_reporter.had_error = False
+    return ok
+
+
+# Repeats the given source until it is at least the requested number of megabytes long.
+def enlarge(src: str, size_mb: float):
+    copies = max(1, int(size_mb * 1024 * 1024 / len(src)) + 1)
+    return src * copies
+
+
+# Runs a function once under tracemalloc and returns the peak traced memory in bytes.
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# Runs a function under tracemalloc and returns its result with the number of bytes it still holds on to.
+def retained_memory(function):
+    tracemalloc.start()
+    try:
+        result = function()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+# Runs a function the given number of times and returns the fastest wall-clock time in seconds.
+def best_time(function, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+# Compares the throughput of the reference and table-driven scanners on a large source.
+def bench_scanner(args):
+    src = enlarge(corpus(), args.size)
+    size_mb = len(src.encode()) / (1024 * 1024)
+    print(f"Scanning {size_mb:.1f} MB of Lox source, best of {args.repeat}.")
+    results = {}
+    for name, scanner in (("reference", Scanner), ("fast", FastScanner)):
+        results[name] = scanner(src).scan_tokens()
+        seconds = best_time(lambda: scanner(src).scan_tokens(), args.repeat)
+        print(f"{name:>10}: {seconds:8.3f} s {size_mb / seconds:8.2f} MB/s")
+    # Both engines must agree token for token.
+    reference = [(t.type, t.lexme, t.literal, t.line) for t in results["reference"]]
+    fast = [(t.type, t.lexme, t.literal, t.line) for t in results["fast"]]
+    print("Token streams match." if reference == fast else "Token streams DIFFER.")
+
+
+# Compares peak memory and time of parsing from a fully scanned token list against a lazily streamed token window.
+def bench_stream(args):
+    src = enlarge(corpus(parseable=True), args.size)
+    size_mb = len(src.encode()) / (1024 * 1024)
+    print(f"Parsing {size_mb:.1f} MB of Lox source.")
+    modes = (("list", lambda: Parser(FastScanner(src).scan_tokens()).parse()),
+             ("stream", lambda: Parser(FastScanner(src).iter_tokens()).parse()))
+    for name, run in modes:
+        peak = peak_memory(run)
+        seconds = best_time(run, args.repeat)
+        print(f"{name:>10}: {seconds:8.3f} s, peak {peak / (1024 * 1024):8.1f} MB")
+
+
+# Compares the memory held per token by a list of Token objects against the compact array-backed store.
+def bench_tokens(args):
+    src = enlarge(corpus(), args.size)
+    size_mb = len(src.encode()) / (1024 * 1024)
+    print(f"Scanning {size_mb:.1f} MB of Lox source.")
+    modes = (("list", lambda: FastScanner(src).scan_tokens()), ("compact", lambda: FastScanner(src).scan_compact()))
+    for name, scan in modes:
+        tokens, held = retained_memory(scan)
+        seconds = best_time(scan, args.repeat)
+        print(f"{name:>10}: {len(tokens)} tokens, {held / len(tokens):6.1f} bytes/token, {seconds:8.3f} s")
+        del tokens
+
+
+# Compares the memory needed to scan a script file that is read into a string against scanning it memory-mapped.
+def bench_mmap(args):
+    src = enlarge(corpus(parseable=True), args.size)
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as f:
+        f.write(src)
+    size_mb = os.path.getsize(f.name) / (1024 * 1024)
+    print(f"Scanning a {size_mb:.1f} MB script file into compact tokens.")
+
+    # Reads the whole file into a string before scanning it.
+    def read():
+        with open(f.name, "r") as script:
+            return FastScanner(script.read()).scan_compact()
+
+    # Scans the mapped file in place.
+    def mapped():
+        return FastScanner(Lox().map_file(f.name)).scan_compact()
+
+    try:
+        for name, run in (("read", read), ("mmap", mapped)):
+            peak = peak_memory(run)
+            seconds = best_time(run, args.repeat)
+            print(f"{name:>10}: {seconds:8.3f} s, peak {peak / (1024 * 1024):8.1f} MB")
+    finally:
+        os.remove(f.name)
+
+
+# Builds an expression-heavy source by cycling through a few statements full of operators, calls and groupings.
+def expression_source(size_mb: float):
+    statements = (
+        "var v = (a + b * c - d / e) == (f < g or h >= i and !j);\n",
+        "print -a * (b + c.d(e, f - 1)) <= 3.5 != \"x\" + y;\n",
+        "total = total + price * (1 - discount / 100) * quantity;\n",
+        "ok = !(x > 0 and x < limit) or y == nil or z.w.v(1, 2, 3) >= -k;\n",
+    )
+    return enlarge("".join(statements), size_mb)
+
+
+# Compares the recursive-descent and Pratt expression parsers on pre-scanned, expression-heavy tokens.
+def bench_parser(args):
+    src = expression_source(args.size)
+    size_mb = len(src.encode()) / (1024 * 1024)
+    tokens = FastScanner(src).scan_tokens()
+    print(f"Parsing {len(tokens)} tokens ({size_mb:.1f} MB) of expression statements, best of {args.repeat}.")
+    for name, parser in (("descent", Parser), ("pratt", PrattParser)):
+        seconds = best_time(lambda: parser(tokens).parse(), args.repeat)
+        print(f"{name:>10}: {seconds:8.3f} s {size_mb / seconds:8.2f} MB/s {len(tokens) / seconds:12.0f} tokens/s")
+
+
+# Compares compiling a large script from source against loading its compiled program from the AST cache.
+def bench_cache(args):
+    src = enlarge(corpus(parseable=True), args.size)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.lox")
+    with open(path, "w") as f:
+        f.write(src)
+    print(f"Preparing a {os.path.getsize(path) / (1024 * 1024):.1f} MB script for execution, best of {args.repeat}.")
+    lox = Lox(cache=False)
+    cache = AstCache()
+    try:
+        digest = cache.digest(path)
+        cache.store(path, digest, lox.compile_file(path))
+        seconds = best_time(lambda: lox.compile_file(path), args.repeat)
+        print(f"{'compile':>10}: {seconds:8.3f} s")
+        seconds = best_time(lambda: cache.load(path, cache.digest(path)), args.repeat)
+        print(f"{'cached':>10}: {seconds:8.3f} s")
+    finally:
+        shutil.rmtree(directory)
+
+
+# Copies an AST into instances of the given classes, keyed by node class name, sharing tokens and literal values.
+def copy_tree(node, classes: dict):
+    if isinstance(node, list):
+        return [copy_tree(item, classes) for item in node]
+    if not isinstance(node, (Expr.Expr, Stmt.Stmt)):
+        return node
+    copy = object.__new__(classes[type(node).__name__])
+    for field in type(node).__slots__:
+        setattr(copy, field, copy_tree(getattr(node, field), classes))
+    return copy
+
+
+# Counts the nodes of an AST.
+def count_nodes(node):
+    if isinstance(node, list):
+        return sum(count_nodes(item) for item in node)
+    if not isinstance(node, (Expr.Expr, Stmt.Stmt)):
+        return 0
+    return 1 + sum(count_nodes(getattr(node, field)) for field in type(node).__slots__)
+
+
+# Compares the memory held by a large parsed and resolved program with slotted node classes against the same tree
+# built from plain classes with a per-instance __dict__, as the node classes were before they were generated.
+def bench_ast(args):
+    src = enlarge(corpus(parseable=True), args.size)
+    size_mb = len(src.encode()) / (1024 * 1024)
+    statements = Lox(cache=False).compile(src)
+    nodes = count_nodes(statements)
+    print(f"Holding the AST of {size_mb:.1f} MB of Lox source, {nodes} nodes.")
+    slotted = {cls.__name__: cls for module in (Expr, Stmt) for cls in vars(module).values()
+               if isinstance(cls, type) and issubclass(cls, (Expr.Expr, Stmt.Stmt))}
+    plain = {name: type(name, (), {}) for name in slotted}
+    # Only the copied nodes and lists are counted; tokens and literal values are shared with the original tree.
+    for name, classes in (("dict", plain), ("slots", slotted)):
+        tree, held = retained_memory(lambda: copy_tree(statements, classes))
+        print(f"{name:>10}: {held / (1024 * 1024):8.1f} MB, {held / nodes:6.1f} bytes/node")
+        del tree
+
+
+# Environment chain storing every variable by name, as all scopes did before locals were given slots.
+class NamedEnvironment:
+    # Initialise the environment with an optional enclosing environment.
+    def __init__(self, enclosing: "NamedEnvironment" = None):
+        self.enclosing = enclosing
+        self.values = {}
+
+    # Retrieve the environment at a specified distance away in the enclosure chain.
+    def ancestor(self, distance: int):
+        environment = self
+        for _ in range(distance):
+            environment = environment.enclosing
+        return environment
+
+    # Retrieve a variable's value by name from an environment a specific distance away.
+    def get_at(self, distance: int, name: str):
+        return self.ancestor(distance).values[name]
+
+    # Assign a variable by name in an environment a specific distance away.
+    def assign_at(self, distance: int, name: str, value: object):
+        self.ancestor(distance).values[name] = value
+
+
+# Builds a chain of environments, each holding a few locals, returning the innermost.
+def environment_chain(depth: int, named: bool):
+    names = ("a", "b", "c", "total")
+    environment = NamedEnvironment() if named else Environment()
+    for _ in range(depth + 1):
+        if named:
+            environment = NamedEnvironment(environment)
+            for name in names:
+                environment.values[name] = 1.0
+        else:
+            environment = Environment(environment, len(names))
+            environment.slots[:] = [1.0] * len(names)
+    return environment
+
+
+# Lox source that spends its time reading and writing locals of the current and enclosing scopes.
+VARIABLE_SOURCE = """
+fun run() {
+  var total = 0;
+  var step = 1;
+  for (var i = 0; i < 100000; i = i + 1) {
+    var a = i;
+    { var b = a; total = total + b * step; }
+  }
+  return total;
+}
+print run();
+"""
+
+
+# Compares local variable access through name-keyed and slot-indexed environments, then times a local-heavy script.
+def bench_variables(args):
+    count = 1000000
+    print(f"Reading and writing a local {count} times at each depth, best of {args.repeat}.")
+    for depth in (0, 1, 3):
+        named = environment_chain(depth, True)
+        slotted = environment_chain(depth, False)
+        timings = (
+            ("named", lambda: named.get_at(depth, "total"), lambda: named.assign_at(depth, "total", 2.0)),
+            ("slots", lambda: slotted.get_at(depth, 3), lambda: slotted.assign_at(depth, 3, 2.0)),
+        )
+        for name, get, assign in timings:
+            get_time = min(timeit.repeat(get, number=count, repeat=args.repeat))
+            assign_time = min(timeit.repeat(assign, number=count, repeat=args.repeat))
+            print(f"{name:>10} depth {depth}: get {get_time * 1e9 / count:6.1f} ns, "
+                  f"assign {assign_time * 1e9 / count:6.1f} ns")
+    lox = Lox(cache=False)
+    with redirect_stdout(io.StringIO()):
+        seconds = best_time(lambda: lox.run(VARIABLE_SOURCE), args.repeat)
+    print(f"{'script':>10}: {seconds:8.3f} s for 100000 iterations of local reads and writes")
+
+
+# Lox source that keeps many callbacks alive, each declared deep inside a function whose other locals it never uses.
+CLOSURE_SOURCE = """
+class Node { init(callback, next) { this.callback = callback; this.next = next; } }
+fun make(n) {
+  var unused1 = n * 2; var unused2 = "padding"; var unused3 = n + 1; var unused4 = nil;
+  fun level() {
+    var unused5 = n - 1; var unused6 = unused5 * 2;
+    fun callback() { return n; }
+    return callback;
+  }
+  return level();
+}
+var head = nil;
+for (var i = 0; i < COUNT; i = i + 1) head = Node(make(i), head);
+var total = 0;
+while (head != nil) { total = total + head.callback(); head = head.next; }
+print total;
+"""
+
+
+# Compares the memory held by long-lived closures and the time to build and call them with each closure representation.
+def bench_closures(args):
+    count = int(args.size * 10000)
+    src = CLOSURE_SOURCE.replace("COUNT", str(count))
+    print(f"Keeping {count} callbacks alive, best of {args.repeat}.")
+    for closures in ("chain", "flat"):
+        run = lambda: Lox(cache=False, closures=closures).run(src)
+        with redirect_stdout(io.StringIO()):
+            peak = peak_memory(run)
+            seconds = best_time(run, args.repeat)
+        print(f"{closures:>10}: {seconds:8.3f} s, peak {peak / (1024 * 1024):8.1f} MB, {peak / count:8.1f} bytes/callback")
+
+
+# Instance storing its fields in a dictionary of its own, as LoxInstance did before instances had shapes.
+class DictInstance:
+    # Initialise an instance of a class with no fields.
+    def __init__(self, klass: LoxClass):
+        self.klass = klass
+        self.fields = {}
+
+    # Assign a value to a field by name.
+    def set_field(self, name: str, value: object):
+        self.fields[name] = value
+
+
+# Lox source that allocates many small objects and reads and writes their fields.
+INSTANCE_SOURCE = """
+class Point { init(x, y) { this.x = x; this.y = y; } }
+var total = 0;
+for (var i = 0; i < 50000; i = i + 1) { var p = Point(i, 1); p.x = p.x + p.y; total = total + p.x + p.y; }
+print total;
+"""
+
+
+# Compares the memory held by small instances whose fields live in a dictionary of their own with instances laid out
+# by shapes, then times a script that allocates objects and accesses their fields under each engine.
+def bench_instances(args):
+    count = int(args.size * 25000)
+    klass = LoxClass("Point", None, {})
+    print(f"Holding {count} instances with three fields each.")
+    for name, instance_class in (("dict", DictInstance), ("shape", LoxInstance)):
+        def build():
+            instances = [instance_class(klass) for _ in range(count)]
+            for instance in instances:
+                for field in ("x", "y", "z"):
+                    instance.set_field(field, 1.0)
+            return instances
+        instances, held = retained_memory(build)
+        print(f"{name:>10}: {held / (1024 * 1024):8.1f} MB, {held / count:6.1f} bytes/instance")
+        del instances
+    for engine in ENGINES:
+        lox = Lox(cache=False, engine=engine)
+        with redirect_stdout(io.StringIO()):
+            seconds = best_time(lambda: lox.run(INSTANCE_SOURCE), args.repeat)
+        print(f"{engine:>10}: {seconds:8.3f} s for 50000 objects")
+
+
+# Runs a script file as lox.py would, with empty standard input and its output and errors discarded.
+def run_quietly(lox: Lox, path: str):
+    stdin = sys.stdin
+    sys.stdin = io.StringIO("\n")
+    try:
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            lox.run_file(path)
+    except SystemExit:
+        # Scripts that fail to compile or raise a runtime error exit like the command-line interpreter does.
+        pass
+    finally:
+        sys.stdin = stdin
+        error_reporter.had_error = False
+        error_reporter.had_runtime_error = False
+
+
+# Reports how many environment allocations escape analysis avoided while running each script in lox_scripts.
+def bench_escape(args):
+    kinds = list(allocations_avoided)
+    print(f"{'script':>24} " + " ".join(f"{kind:>8}" for kind in kinds))
+    totals = dict.fromkeys(kinds, 0)
+    for file in sorted(os.listdir(SCRIPTS_DIR)):
+        if not file.endswith(".lox"):
+            continue
+        for kind in kinds:
+            allocations_avoided[kind] = 0
+        run_quietly(Lox(cache=False, statistics=True), os.path.join(SCRIPTS_DIR, file))
+        for kind in kinds:
+            totals[kind] += allocations_avoided[kind]
+        print(f"{file:>24} " + " ".join(f"{allocations_avoided[kind]:8}" for kind in kinds))
+    print(f"{'total':>24} " + " ".join(f"{totals[kind]:8}" for kind in kinds))
+
+
+# Lox programs exercising loops, recursive calls and method calls, timed under each execution engine.
+ENGINE_SOURCES = {
+    "loop": """
+var total = 0;
+for (var i = 0; i < 200000; i = i + 1) { if (i / 2 > 10) total = total + i * 2 - 1; }
+print total;
+""",
+    "calls": """
+fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+print fib(20);
+""",
+    "methods": """
+class Counter { init() { this.count = 0; } add(n) { this.count = this.count + n; return this; } }
+var counter = Counter();
+for (var i = 0; i < 50000; i = i + 1) counter.add(i);
+print counter.count;
+""",
+    "locals": VARIABLE_SOURCE,
+    "inherit": """
+class A { init() { this.x = 0; } base(n) { return n + 1; } }
+class B < A {} class C < B {} class D < C {} class E < D {}
+class F < E { f() { return super.base(1); } }
+class G < F {}
+var total = 0;
+for (var i = 0; i < 20000; i = i + 1) { var g = G(); total = g.base(total) + g.f(); }
+print total;
+""",
+}
+
+
+# Compares the execution engines on the same programs, reporting each one's speed-up over the tree walker.
+def bench_engines(args):
+    print(f"Running each program with each engine, best of {args.repeat}.")
+    for name, src in ENGINE_SOURCES.items():
+        seconds = {}
+        for engine in ENGINES:
+            lox = Lox(cache=False, engine=engine)
+            with redirect_stdout(io.StringIO()):
+                seconds[engine] = best_time(lambda: lox.run(src), args.repeat)
+        print(f"{name:>10}: " + ", ".join(f"{engine} {seconds[engine]:6.3f} s ({seconds['tree'] / seconds[engine]:4.1f}x)"
+                                          for engine in ENGINES))
+
+
+# Arithmetic-heavy Lox programs, dominated by operator dispatch, timed with and without specialised operator nodes.
+ARITHMETIC_SOURCES = {
+    "arithmetic": """
+var total = 0;
+for (var i = 0; i < 100000; i = i + 1) { total = total + (i * 3 - i / 2) * 2 - (i - 1); }
+print total;
+""",
+    "compare": """
+var count = 0;
+for (var i = 0; i < 100000; i = i + 1) { if (i >= 10 and i <= 90000 and !(i == 500) or i != i) count = count + 1; }
+print count;
+""",
+    "bounds": """
+fun run(n) {
+  var total = 0;
+  for (var i = 0; i < n; i = i + 1) { if (total <= i) total = total + 3; }
+  return total;
+}
+print run(100000);
+""",
+    "loop": ENGINE_SOURCES["loop"],
+}
+
+
+# Compares the tree walker running generic Binary, Unary and Logical nodes with the operator-specific nodes the
+# Specializer substitutes for them, and with the superinstructions the Fuser substitutes on top of those.
+def bench_specialize(args):
+    print(f"Running each program with generic, specialised and fused nodes, best of {args.repeat}.")
+    for name, src in ARITHMETIC_SOURCES.items():
+        trees = {
+            "generic": Lox(cache=False).compile(src),
+            "specialised": Specializer().specialize(Lox(cache=False).compile(src)),
+            "fused": Fuser().specialize(Lox(cache=False).compile(src)),
+        }
+        seconds = {}
+        with redirect_stdout(io.StringIO()):
+            for variant, statements in trees.items():
+                seconds[variant] = best_time(lambda: Interpreter().interpret(statements), args.repeat)
+        print(f"{name:>10}: " + ", ".join(f"{variant} {seconds[variant]:6.3f} s "
+                                          f"({seconds['generic'] / seconds[variant]:4.2f}x)" for variant in trees))
+
+
+# Reports how many times each superinstruction ran in each script in lox_scripts and each arithmetic program.
+def bench_fusion(args):
+    kinds = list(superinstructions)
+    print(f"{'script':>24} " + " ".join(f"{kind:>16}" for kind in kinds))
+    totals = dict.fromkeys(kinds, 0)
+    runs = [(file, lambda lox, path=os.path.join(SCRIPTS_DIR, file): run_quietly(lox, path))
+            for file in sorted(os.listdir(SCRIPTS_DIR)) if file.endswith(".lox")]
+    runs += [(name, lambda lox, src=src: lox.run(src)) for name, src in ARITHMETIC_SOURCES.items()]
+    for name, run in runs:
+        for kind in kinds:
+            superinstructions[kind] = 0
+        with redirect_stdout(io.StringIO()):
+            run(Lox(cache=False, statistics=True))
+        for kind in kinds:
+            totals[kind] += superinstructions[kind]
+        print(f"{name:>24} " + " ".join(f"{superinstructions[kind]:16}" for kind in kinds))
+    print(f"{'total':>24} " + " ".join(f"{totals[kind]:16}" for kind in kinds))
+
+
+# Compares the tree walkers returning from functions by completion value and by raising Return, on call-heavy programs.
+def bench_returns(args):
+    print(f"Running each program with each way of returning, best of {args.repeat}.")
+    for name in ("calls", "methods"):
+        for closures in INTERPRETERS:
+            seconds = {}
+            for returns in RETURNS:
+                lox = Lox(cache=False, closures=closures, returns=returns)
+                with redirect_stdout(io.StringIO()):
+                    seconds[returns] = best_time(lambda: lox.run(ENGINE_SOURCES[name]), args.repeat)
+            print(f"{name:>10} {closures:>5}: " + ", ".join(
+                f"{returns} {seconds[returns]:6.3f} s ({seconds['exception'] / seconds[returns]:4.2f}x)"
+                for returns in RETURNS))
+
+
+# Lox programs recursing to the depth substituted for DEPTH: with one unfinished call per level, and with tail calls,
+# which the tree walker makes in place of the returning call.
+RECURSION_SOURCES = {
+    "nested": """
+fun depth(n) { if (n == 0) return 0; return 1 + depth(n - 1); }
+print depth(DEPTH);
+""",
+    "tail": """
+fun depth(n, total) { if (n == 0) return total; return depth(n - 1, total + 1); }
+print depth(DEPTH, 0);
+""",
+}
+
+
+# Runs recursive functions to increasing depths with each engine, showing how deep each can go and how fast.
+def bench_recursion(args):
+    print(f"Recursing to each depth with each engine, best of {args.repeat}.")
+    for name, source in RECURSION_SOURCES.items():
+        for depth in (100, 1000, 10000, 100000):
+            src = source.replace("DEPTH", str(depth))
+            results = []
+            for engine in ENGINES:
+                lox = Lox(cache=False, engine=engine)
+                try:
+                    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                        seconds = best_time(lambda: lox.run(src), args.repeat)
+                    results.append(f"{engine} {seconds:6.3f} s" if not error_reporter.had_runtime_error
+                                   else f"{engine} {'overflow':>8}")
+                except RecursionError:
+                    # The engines that recurse in Python run out of Python's stack, which is not a Lox error.
+                    results.append(f"{engine} {'failed':>8}")
+                error_reporter.had_runtime_error = False
+            print(f"{name:>6} {depth:>6}: " + ", ".join(results))
+
+
+# Naive recursive Lox programs taking exponential time unless the results of their pure functions are memoised.
+MEMOIZE_SOURCES = {
+    "fib": """
+fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+print fib(22);
+""",
+    "paths": """
+fun paths(rows, columns) {
+  if (rows == 0 or columns == 0) return 1;
+  return paths(rows - 1, columns) + paths(rows, columns - 1);
+}
+print paths(9, 9);
+""",
+}
+
+
+# Times naive recursive programs with and without memoising pure functions, reporting the memo's hits and misses.
+def bench_memoize(args):
+    print(f"Running each program with and without memoisation, best of {args.repeat}.")
+    for name, src in MEMOIZE_SOURCES.items():
+        seconds = {}
+        for size in (0, 1024):
+            lox = Lox(cache=False, memoize=size)
+            with redirect_stdout(io.StringIO()):
+                seconds[size] = best_time(lambda: lox.run(src), args.repeat)
+        # Each run declares the function afresh, so the statistics are those of the last run's memo.
+        info = lox._interpreter.globals.values[name].memo.cache_info()
+        print(f"{name:>10}: plain {seconds[0]:7.3f} s, memoised {seconds[1024]:7.3f} s "
+              f"({seconds[0] / seconds[1024]:6.1f}x), {info.hits} hits, {info.misses} misses")
+
+
+# Map of benchmark names to the functions that run them.
+BENCHMARKS = {
+    "scanner": bench_scanner,
+    "stream": bench_stream,
+    "tokens": bench_tokens,
+    "mmap": bench_mmap,
+    "parser": bench_parser,
+    "cache": bench_cache,
+    "ast": bench_ast,
+    "variables": bench_variables,
+    "closures": bench_closures,
+    "instances": bench_instances,
+    "escape": bench_escape,
+    "engines": bench_engines,
+    "specialize": bench_specialize,
+    "fusion": bench_fusion,
+    "returns": bench_returns,
+    "recursion": bench_recursion,
+    "memoize": bench_memoize,
+}
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run interpreter benchmarks.")
+    arg_parser.add_argument("benchmark", choices=BENCHMARKS, help="benchmark to run")
+    arg_parser.add_argument("--size", type=float, default=4, help="approximate input size in MB")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="number of timed runs; the best is reported")
+    args = arg_parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
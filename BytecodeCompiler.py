@@ -0,0 +1,340 @@
+"""
+Compiles a resolved program into bytecode for the VirtualMachine. The Resolver has already worked out where every
+variable lives and which ones closures capture, as it does for flat closures, so the compiler only has to lay out each
+function's frame: every scope gets a run of slots after those of the scopes enclosing it within the same function, and
+sibling scopes share the same slots. Captured variables are boxed in Cells in their slots and reached through upvalues
+from the functions that capture them, exactly as FlatInterpreter does.
+
+Each expression leaves its value on the VM's stack, and each statement leaves the stack as it found it.
+"""
+
+from typing import List
+import Expr
+import Stmt
+from TokenType import TokenType
+from OpCode import OpCode
+from Chunk import Chunk
+from VMFunction import VMFunction
+
+
+# Opcodes of the binary operators.
+BINARY_OPCODES = {
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+}
+
+
+class BytecodeCompiler(Expr.Visitor, Stmt.Visitor):
+    # Initialise the compiler outside any function.
+    def __init__(self):
+        # Chunk of the function being compiled.
+        self.chunk = None
+        # First slot of each scope of the function being compiled, innermost last.
+        self.scopes = []
+        # First slot after the innermost scope, and the most slots the function's frame has needed so far.
+        self.top = 0
+        self.size = 0
+        # Whether the function being compiled is an initialiser, which always returns 'this'.
+        self.initializer = False
+        # Source line of the code being emitted, taken from the last token compiled.
+        self.line = 0
+
+    # Compiles a program into the prototype of its top-level script.
+    def compile(self, statements: List[Stmt.Stmt]):
+        self.begin_function(False)
+        for statement in statements:
+            statement.accept(self)
+        return self.end_function("script", 0, [], [], False)
+
+    # Starts compiling a function into a new chunk, returning the state of the enclosing function.
+    def begin_function(self, initializer: bool):
+        enclosing = (self.chunk, self.scopes, self.top, self.size, self.initializer)
+        self.chunk = Chunk()
+        self.scopes = []
+        self.top = 0
+        self.size = 0
+        self.initializer = initializer
+        return enclosing
+
+    # Finishes the function being compiled with an implicit return and builds its prototype.
+    def end_function(self, name: str, arity: int, boxed_params: List[int], upvalues: List[int], uses_this: bool):
+        self.emit_return_default()
+        self.emit(OpCode.RETURN)
+        return VMFunction(name, arity, self.chunk, self.size, boxed_params, upvalues, self.initializer, uses_this)
+
+    # Compiles a function or method declaration into a prototype, with its captures laid out in the current frame.
+    def compile_function(self, _stmt: Stmt.Function, initializer: bool):
+        enclosing = self.begin_function(initializer)
+        # Parameters and the body's own locals share the function's outermost scope, parameters first.
+        self.begin_scope(_stmt.size)
+        for statement in _stmt.body:
+            statement.accept(self)
+        self.line = _stmt.name.line
+        function = self.end_function(_stmt.name.lexme, len(_stmt.params), list(_stmt.boxed_params), [],
+                                     _stmt.uses_this)
+        self.chunk, self.scopes, self.top, self.size, self.initializer = enclosing
+        # Captures are found from the scope the function is declared in.
+        function.upvalues = [self.scopes[-1 - depth] + index if depth is not None else -1 - index
+                             for depth, index in _stmt.upvalues]
+        return function
+
+    # Starts a scope whose variables take the next slots of the frame.
+    def begin_scope(self, size: int):
+        self.scopes.append(self.top)
+        self.top += size
+        self.size = max(self.size, self.top)
+
+    # Ends the innermost scope, freeing its slots for the next scope.
+    def end_scope(self):
+        self.top = self.scopes.pop()
+
+    # Appends an instruction and its operands to the chunk, returning the offset of the instruction.
+    def emit(self, op: OpCode, *operands: int):
+        offset = self.chunk.write(op, self.line)
+        for operand in operands:
+            self.chunk.write(operand, self.line)
+        return offset
+
+    # Emits a forward jump whose target is patched once it is known, returning the offset of its operand.
+    def emit_jump(self, op: OpCode):
+        return self.emit(op, 0) + 1
+
+    # Points a forward jump at the next instruction to be emitted.
+    def patch_jump(self, operand: int):
+        self.chunk.code[operand] = len(self.chunk.code)
+
+    # Emits the value a function returns when it has no return value: the instance for an initialiser, else nil.
+    def emit_return_default(self):
+        if self.initializer:
+            self.emit(OpCode.GET_UPVALUE, 0)
+        else:
+            self.emit(OpCode.NIL)
+
+    # Returns the constant pool index of a value in the current chunk.
+    def constant(self, value: object):
+        return self.chunk.add_constant(value)
+
+    # Returns the frame slot of a resolved local, given its depth and its slot within its scope.
+    def local_slot(self, depth: int, slot: int):
+        return self.scopes[-1 - depth] + slot
+
+    # Emits code storing the value on top of the stack in the variable a declaration defines, popping it.
+    def emit_define(self, _stmt: Stmt.Stmt):
+        if _stmt.slot is None:
+            self.emit(OpCode.DEFINE_GLOBAL, self.constant(_stmt.name.lexme))
+        elif _stmt.boxed:
+            self.emit(OpCode.DEFINE_BOXED, self.local_slot(0, _stmt.slot))
+        else:
+            self.emit(OpCode.DEFINE_LOCAL, self.local_slot(0, _stmt.slot))
+
+    # Emits code storing the value on top of the stack in a variable the declaration already defined, popping it.
+    def emit_redefine(self, _stmt: Stmt.Stmt):
+        if _stmt.slot is not None and _stmt.boxed:
+            self.emit(OpCode.SET_BOXED, self.local_slot(0, _stmt.slot))
+            self.emit(OpCode.POP)
+        else:
+            self.emit_define(_stmt)
+
+    # Emits code reading a resolved variable: through its upvalue, its slot, boxed or not, or by name.
+    def emit_get(self, _expr: Expr.Expr, name: str):
+        if _expr.upvalue is not None:
+            self.emit(OpCode.GET_UPVALUE, _expr.upvalue)
+        elif _expr.depth is None:
+            self.emit(OpCode.GET_GLOBAL, self.constant(name))
+        elif _expr.boxed:
+            self.emit(OpCode.GET_BOXED, self.local_slot(_expr.depth, _expr.slot))
+        else:
+            self.emit(OpCode.GET_LOCAL, self.local_slot(_expr.depth, _expr.slot))
+
+    # Blocks that declare something get a scope of their own.
+    def visit_block_stmt(self, _stmt: Stmt.Block):
+        if _stmt.scoped:
+            self.begin_scope(_stmt.size)
+        for statement in _stmt.statements:
+            statement.accept(self)
+        if _stmt.scoped:
+            self.end_scope()
+
+    # Classes are built from their methods' closures, which capture 'super' and 'this' Cells from two short scopes.
+    def visit_class_stmt(self, _stmt: Stmt.Class):
+        self.line = _stmt.name.line
+        if _stmt.superclass is not None:
+            _stmt.superclass.accept(self)
+            self.line = _stmt.superclass.name.line
+            self.emit(OpCode.INHERIT)
+            self.line = _stmt.name.line
+        # Methods of a captured local class capture its Cell, so it has to exist before they are created.
+        if _stmt.slot is not None and _stmt.boxed:
+            self.emit(OpCode.NIL)
+            self.emit_define(_stmt)
+        if _stmt.superclass is not None:
+            self.begin_scope(1)
+            self.emit(OpCode.DEFINE_BOXED, self.local_slot(0, 0))
+        self.begin_scope(1)
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.DEFINE_BOXED, self.local_slot(0, 0))
+        for method in _stmt.methods:
+            self.emit(OpCode.CLOSURE, self.constant(self.compile_function(method, method.name.lexme == "init")))
+        self.end_scope()
+        self.line = _stmt.name.line
+        if _stmt.superclass is not None:
+            self.emit(OpCode.GET_BOXED, self.local_slot(0, 0))
+            self.end_scope()
+        self.emit(OpCode.CLASS, self.constant(_stmt.name.lexme), len(_stmt.methods), int(_stmt.superclass is not None))
+        self.emit_redefine(_stmt)
+
+    # Expression statements discard their value.
+    def visit_expression_stmt(self, _stmt: Stmt.Expression):
+        _stmt.expression.accept(self)
+        self.emit(OpCode.POP)
+
+    # Function declarations create a closure and store it; a captured local function can then call itself.
+    def visit_function_stmt(self, _stmt: Stmt.Function):
+        self.line = _stmt.name.line
+        if _stmt.slot is not None and _stmt.boxed:
+            self.emit(OpCode.NIL)
+            self.emit_define(_stmt)
+        self.emit(OpCode.CLOSURE, self.constant(self.compile_function(_stmt, False)))
+        self.emit_redefine(_stmt)
+
+    # If statements jump over the branch not taken.
+    def visit_if_stmt(self, _stmt: Stmt.If):
+        _stmt.condition.accept(self)
+        else_jump = self.emit_jump(OpCode.POP_JUMP_IF_FALSE)
+        _stmt.then_branch.accept(self)
+        if _stmt.else_branch is None:
+            self.patch_jump(else_jump)
+            return
+        end_jump = self.emit_jump(OpCode.JUMP)
+        self.patch_jump(else_jump)
+        _stmt.else_branch.accept(self)
+        self.patch_jump(end_jump)
+
+    # Print statements print the value of their expression.
+    def visit_print_stmt(self, _stmt: Stmt.Print):
+        _stmt.expression.accept(self)
+        self.emit(OpCode.PRINT)
+
+    # Return statements return their value, nil, or 'this' from an initialiser.
+    def visit_return_stmt(self, _stmt: Stmt.Return):
+        self.line = _stmt.keyword.line
+        if _stmt.value is not None:
+            _stmt.value.accept(self)
+        else:
+            self.emit_return_default()
+        self.emit(OpCode.RETURN)
+
+    # Variable declarations store their initial value, nil by default.
+    def visit_var_stmt(self, _stmt: Stmt.Var):
+        self.line = _stmt.name.line
+        if _stmt.initializer is not None:
+            _stmt.initializer.accept(self)
+        else:
+            self.emit(OpCode.NIL)
+        self.emit_define(_stmt)
+
+    # While loops test their condition before each run of the body and jump back to it afterwards.
+    def visit_while_stmt(self, _stmt: Stmt.While):
+        start = len(self.chunk.code)
+        _stmt.condition.accept(self)
+        exit_jump = self.emit_jump(OpCode.POP_JUMP_IF_FALSE)
+        _stmt.body.accept(self)
+        self.emit(OpCode.JUMP, start)
+        self.patch_jump(exit_jump)
+
+    # Assignments store the value in the variable, leaving it on the stack.
+    def visit_assign_expr(self, _expr: Expr.Assign):
+        _expr.value.accept(self)
+        self.line = _expr.name.line
+        if _expr.upvalue is not None:
+            self.emit(OpCode.SET_UPVALUE, _expr.upvalue)
+        elif _expr.depth is None:
+            self.emit(OpCode.SET_GLOBAL, self.constant(_expr.name.lexme))
+        elif _expr.boxed:
+            self.emit(OpCode.SET_BOXED, self.local_slot(_expr.depth, _expr.slot))
+        else:
+            self.emit(OpCode.SET_LOCAL, self.local_slot(_expr.depth, _expr.slot))
+
+    # Binary expressions evaluate both operands, then apply the operator's instruction.
+    def visit_binary_expr(self, _expr: Expr.Binary):
+        _expr.left.accept(self)
+        _expr.right.accept(self)
+        self.line = _expr.operator.line
+        self.emit(BINARY_OPCODES[_expr.operator.type])
+
+    # Calls evaluate the callee and then the arguments, which the call replaces with its result.
+    def visit_call_expr(self, _expr: Expr.Call):
+        _expr.callee.accept(self)
+        for argument in _expr.arguments:
+            argument.accept(self)
+        self.line = _expr.paren.line
+        self.emit(OpCode.CALL, len(_expr.arguments))
+
+    # Property reads replace the instance with the property's value.
+    def visit_get_expr(self, _expr: Expr.Get):
+        _expr.object.accept(self)
+        self.line = _expr.name.line
+        self.emit(OpCode.GET_PROPERTY, self.constant(_expr.name.lexme))
+
+    # Parentheses compile to their expression.
+    def visit_grouping_expr(self, _expr: Expr.Grouping):
+        _expr.expression.accept(self)
+
+    # Literals push their value, with nil and the booleans having instructions of their own.
+    def visit_literal_expr(self, _expr: Expr.Literal):
+        value = _expr.value
+        if value is None:
+            self.emit(OpCode.NIL)
+        elif value is True:
+            self.emit(OpCode.TRUE)
+        elif value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emit(OpCode.CONSTANT, self.constant(value))
+
+    # Logical operators keep their left operand and skip the right one when it decides the result.
+    def visit_logical_expr(self, _expr: Expr.Logical):
+        _expr.left.accept(self)
+        self.line = _expr.operator.line
+        end_jump = self.emit_jump(OpCode.JUMP_IF_TRUE if _expr.operator.type == TokenType.OR else OpCode.JUMP_IF_FALSE)
+        self.emit(OpCode.POP)
+        _expr.right.accept(self)
+        self.patch_jump(end_jump)
+
+    # Property assignments check for an instance before the value is evaluated, as the Interpreter does.
+    def visit_set_expr(self, _expr: Expr.Set):
+        _expr.object.accept(self)
+        self.line = _expr.name.line
+        self.emit(OpCode.CHECK_INSTANCE)
+        _expr.value.accept(self)
+        self.line = _expr.name.line
+        self.emit(OpCode.SET_PROPERTY, self.constant(_expr.name.lexme))
+
+    # 'super' looks the method up in the captured superclass and binds it to the captured 'this'.
+    def visit_super_expr(self, _expr: Expr.Super):
+        self.line = _expr.method.line
+        self.emit(OpCode.GET_SUPER, self.constant(_expr.method.lexme), _expr.upvalue, _expr.this_upvalue)
+
+    # 'this' is read like any other variable.
+    def visit_this_expr(self, _expr: Expr.This):
+        self.line = _expr.keyword.line
+        self.emit_get(_expr, "this")
+
+    # Unary expressions apply their operator to the operand.
+    def visit_unary_expr(self, _expr: Expr.Unary):
+        _expr.right.accept(self)
+        self.line = _expr.operator.line
+        self.emit(OpCode.NOT if _expr.operator.type == TokenType.BANG else OpCode.NEGATE)
+
+    # Variables push their value.
+    def visit_variable_expr(self, _expr: Expr.Variable):
+        self.line = _expr.name.line
+        self.emit_get(_expr, _expr.name.lexme)
@@ -0,0 +1,13 @@
+"""
+Box holding a variable captured by a flat closure. The declaring scope stores the Cell in the variable's slot instead
+of the value itself, and every function that captures the variable holds the same Cell among its upvalues, so reads
+and assignments through either are seen by both.
+"""
+
+
+class Cell:
+    __slots__ = ("value",)
+
+    # Initialise the cell with the variable's current value.
+    def __init__(self, value: object):
+        self.value = value
@@ -0,0 +1,50 @@
+"""
+A compiled unit of bytecode for one function or the top-level script. The code is an array of unsigned words, each an
+opcode or one of its operands, with literal values and names kept in a constant pool. Source lines are recorded in a
+run-length line table, one entry wherever the line changes, so runtime errors and the disassembler can map any code
+offset back to the line it was compiled from.
+"""
+
+from array import array
+from math import copysign
+from bisect import bisect_right
+
+
+class Chunk:
+    __slots__ = ("code", "constants", "constant_indexes", "line_offsets", "line_numbers")
+
+    # Initialise an empty chunk.
+    def __init__(self):
+        # Opcodes and their operands.
+        self.code = array("I")
+        # Values referred to by index from the code: numbers, strings and function prototypes.
+        self.constants = []
+        # Index of each constant already in the pool, so repeated literals and names share one entry.
+        self.constant_indexes = {}
+        # Code offsets at which the source line changes, and the line each run of code comes from.
+        self.line_offsets = array("I")
+        self.line_numbers = array("I")
+
+    # Appends a word of code compiled from the given line, returning its offset.
+    def write(self, word: int, line: int):
+        offset = len(self.code)
+        self.code.append(word)
+        if not self.line_numbers or self.line_numbers[-1] != line:
+            self.line_offsets.append(offset)
+            self.line_numbers.append(line)
+        return offset
+
+    # Adds a value to the constant pool unless it is already there, returning its index.
+    def add_constant(self, value: object):
+        # Keyed on type as well, since 1.0 == True in Python but not in Lox, and on the sign of a number, since
+        # 0.0 == -0.0 but they print differently.
+        key = (type(value), value, copysign(1.0, value)) if type(value) is float else (type(value), value)
+        if key not in self.constant_indexes:
+            self.constant_indexes[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_indexes[key]
+
+    # Returns the source line the code at an offset was compiled from.
+    def line_at(self, offset: int):
+        index = bisect_right(self.line_offsets, offset) - 1
+        return self.line_numbers[index] if index >= 0 else 0
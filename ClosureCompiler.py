@@ -0,0 +1,465 @@
+"""
+Compiles a resolved program into nested Python closures for ClosureInterpreter. Each Stmt and Expr node is visited
+once and turned into a function of the current Environment, with everything that the tree-walking Interpreter decides
+on every evaluation decided at compile time instead: which operator a Binary or Unary node applies, whether a variable
+is global or how many environments out and in which slot it lives, and which statements a block runs. Running the
+program is then a chain of direct calls between closures, with no accept/visit dispatch and no operator tests.
+
+Expression closures return the expression's value. Statement closures return None to let execution continue, or a
+one-element tuple holding the value of an executed return statement, which every enclosing statement passes straight
+up to the function call. Runtime checks, error messages and results, including the Interpreter's quirks, match the
+Interpreter exactly.
+"""
+
+from typing import List
+import Expr
+import Stmt
+from TokenType import TokenType
+from RuntimeError import RuntimeError
+from Environment import Environment
+from LoxCallable import LoxCallable
+from LoxClass import LoxClass
+from LoxInstance import LoxInstance
+from CompiledFunction import CompiledFunction
+
+
+# Determines the truthiness of a value in Lox's logic: only nil and false are falsey.
+def is_truthy(value: object):
+    return value is not None and value is not False
+
+
+# Compares two values for equality in Lox's logic.
+def is_equal(a: object, b: object):
+    if a is None:
+        return b is None
+    return type(a) == type(b) and a == b
+
+
+# Returns the environment a given number of steps out from another.
+def ancestor(environment: Environment, distance: int):
+    for _ in range(distance):
+        environment = environment.enclosing
+    return environment
+
+
+class ClosureCompiler(Expr.Visitor, Stmt.Visitor):
+    # Initialise the compiler for programs run by the given interpreter, whose globals and output it shares.
+    def __init__(self, interpreter: "ClosureInterpreter"):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals.values
+
+    # Compiles a list of statements into one closure that runs them in order, stopping at a return.
+    def compile(self, statements: List[Stmt.Stmt]):
+        code = [statement.accept(self) for statement in statements]
+        if len(code) == 1:
+            return code[0]
+
+        def run(environment):
+            for statement in code:
+                result = statement(environment)
+                if result is not None:
+                    return result
+            return None
+        return run
+
+    # Compiles a function's body into a closure that calls it with a closure environment and arguments.
+    def compile_function(self, declaration: Stmt.Function):
+        body = self.compile(declaration.body)
+        size = declaration.size
+        # A function whose environment never escapes keeps a spare one between calls, as the Interpreter does.
+        reusable = declaration.reusable
+        spare = None
+
+        def invoke(closure, arguments):
+            nonlocal spare
+            environment = spare
+            if environment is None:
+                environment = Environment(closure, size)
+            else:
+                spare = None
+                environment.enclosing = closure
+            environment.slots[:len(arguments)] = arguments
+            result = body(environment)
+            if reusable:
+                spare = environment
+            return result[0] if result is not None else None
+        return invoke
+
+    # Compiles code that stores a value in the variable a declaration defines, globally or in its slot.
+    def compile_define(self, _stmt: Stmt.Stmt):
+        slot = _stmt.slot
+        if slot is None:
+            name = _stmt.name.lexme
+            globals = self.globals
+
+            def define(environment, value):
+                globals[name] = value
+            return define
+
+        def define(environment, value):
+            environment.slots[slot] = value
+        return define
+
+    # Compiles a read of a resolved local at a fixed depth and slot.
+    def compile_local(self, depth: int, slot: int):
+        if depth == 0:
+            return lambda environment: environment.slots[slot]
+        if depth == 1:
+            return lambda environment: environment.enclosing.slots[slot]
+        if depth == 2:
+            return lambda environment: environment.enclosing.enclosing.slots[slot]
+        return lambda environment: ancestor(environment, depth).slots[slot]
+
+    # Block statements run in a new environment, or in none when they declare nothing.
+    def visit_block_stmt(self, _stmt: Stmt.Block):
+        body = self.compile(_stmt.statements)
+        if not _stmt.scoped:
+            return body
+        size = _stmt.size
+        if not _stmt.reusable:
+            return lambda environment: body(Environment(environment, size))
+        spare = None
+
+        def run(environment):
+            nonlocal spare
+            frame = spare
+            if frame is None:
+                frame = Environment(environment, size)
+            else:
+                spare = None
+                frame.enclosing = environment
+            result = body(frame)
+            spare = frame
+            return result
+        return run
+
+    # Classes are created with compiled methods closing over the class's environment.
+    def visit_class_stmt(self, _stmt: Stmt.Class):
+        superclass_code = _stmt.superclass.accept(self) if _stmt.superclass is not None else None
+        methods = [(method, self.compile_function(method)) for method in _stmt.methods]
+        define = self.compile_define(_stmt)
+        name = _stmt.name.lexme
+
+        def run(environment):
+            superclass = None
+            if superclass_code is not None:
+                superclass = superclass_code(environment)
+                if not isinstance(superclass, LoxClass):
+                    raise RuntimeError(_stmt.superclass.name, "Superclass must be a class.")
+            define(environment, None)
+            closure = environment
+            if superclass is not None:
+                closure = Environment(environment, 1)
+                closure.slots[0] = superclass
+            functions = {}
+            for method, invoke in methods:
+                functions[method.name.lexme] = CompiledFunction(method, closure, method.name.lexme == "init", invoke)
+            define(environment, LoxClass(name, superclass, functions))
+            return None
+        return run
+
+    # Expression statements evaluate their expression for its side effects.
+    def visit_expression_stmt(self, _stmt: Stmt.Expression):
+        expression = _stmt.expression.accept(self)
+
+        def run(environment):
+            expression(environment)
+        return run
+
+    # Function declarations create a compiled function closing over the current environment.
+    def visit_function_stmt(self, _stmt: Stmt.Function):
+        invoke = self.compile_function(_stmt)
+        define = self.compile_define(_stmt)
+
+        def run(environment):
+            define(environment, CompiledFunction(_stmt, environment, False, invoke))
+        return run
+
+    # If statements test their condition and run one branch.
+    def visit_if_stmt(self, _stmt: Stmt.If):
+        condition = _stmt.condition.accept(self)
+        then_branch = _stmt.then_branch.accept(self)
+        if _stmt.else_branch is None:
+            def run(environment):
+                value = condition(environment)
+                if value is not None and value is not False:
+                    return then_branch(environment)
+                return None
+            return run
+        else_branch = _stmt.else_branch.accept(self)
+
+        def run(environment):
+            value = condition(environment)
+            if value is not None and value is not False:
+                return then_branch(environment)
+            return else_branch(environment)
+        return run
+
+    # Print statements write the stringified value.
+    def visit_print_stmt(self, _stmt: Stmt.Print):
+        expression = _stmt.expression.accept(self)
+        stringify = self.interpreter.stringify
+
+        def run(environment):
+            print(stringify(expression(environment)))
+        return run
+
+    # Return statements hand their value up to the function call.
+    def visit_return_stmt(self, _stmt: Stmt.Return):
+        if _stmt.value is None:
+            return lambda environment: (None,)
+        value = _stmt.value.accept(self)
+        return lambda environment: (value(environment),)
+
+    # Variable declarations define their initial value, nil by default.
+    def visit_var_stmt(self, _stmt: Stmt.Var):
+        define = self.compile_define(_stmt)
+        if _stmt.initializer is None:
+            return lambda environment: define(environment, None)
+        initializer = _stmt.initializer.accept(self)
+        slot = _stmt.slot
+        # The common case of a local declaration is stored directly.
+        if slot is not None:
+            def run(environment):
+                environment.slots[slot] = initializer(environment)
+            return run
+        return lambda environment: define(environment, initializer(environment))
+
+    # While loops rerun their body while the condition is truthy.
+    def visit_while_stmt(self, _stmt: Stmt.While):
+        condition = _stmt.condition.accept(self)
+        body = _stmt.body.accept(self)
+
+        def run(environment):
+            while True:
+                value = condition(environment)
+                if value is None or value is False:
+                    return None
+                result = body(environment)
+                if result is not None:
+                    return result
+        return run
+
+    # Assignments store the value globally or in the resolved slot.
+    def visit_assign_expr(self, _expr: Expr.Assign):
+        value = _expr.value.accept(self)
+        depth, slot = _expr.depth, _expr.slot
+        if depth is None:
+            name = _expr.name.lexme
+            token = _expr.name
+            globals = self.globals
+
+            def assign(environment):
+                result = value(environment)
+                if name not in globals:
+                    raise RuntimeError(token, f"Undefined variable '{name}'")
+                globals[name] = result
+                return result
+            return assign
+        if depth == 0:
+            def assign(environment):
+                result = environment.slots[slot] = value(environment)
+                return result
+            return assign
+        if depth == 1:
+            def assign(environment):
+                result = environment.enclosing.slots[slot] = value(environment)
+                return result
+            return assign
+
+        def assign(environment):
+            result = ancestor(environment, depth).slots[slot] = value(environment)
+            return result
+        return assign
+
+    # Binary expressions compile to a closure specialised for their operator.
+    def visit_binary_expr(self, _expr: Expr.Binary):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        operator = _expr.operator
+        type = operator.type
+        if type == TokenType.PLUS:
+            def plus(environment):
+                a = left(environment)
+                b = right(environment)
+                if isinstance(a, float):
+                    if isinstance(b, float):
+                        return a + b
+                    if isinstance(b, str):
+                        return str(a) + b
+                elif isinstance(a, str):
+                    if isinstance(b, str):
+                        return a + b
+                    if isinstance(b, float):
+                        return a + str(b)
+                raise RuntimeError(operator, "Operands must be two numbers or two strings.")
+            return plus
+        if type == TokenType.SLASH:
+            # Division performs no operand check.
+            return lambda environment: float(left(environment)) / float(right(environment))
+        if type == TokenType.EQUAL_EQUAL:
+            return lambda environment: is_equal(left(environment), right(environment))
+        if type == TokenType.BANG_EQUAL:
+            return lambda environment: not is_equal(left(environment), right(environment))
+        # The remaining operators all need two numbers.
+        apply = {
+            TokenType.MINUS: float.__sub__,
+            TokenType.STAR: float.__mul__,
+            TokenType.GREATER: float.__gt__,
+            TokenType.GREATER_EQUAL: float.__ge__,
+            TokenType.LESS: float.__lt__,
+            TokenType.LESS_EQUAL: float.__le__,
+        }[type]
+
+        def numeric(environment):
+            a = left(environment)
+            b = right(environment)
+            if isinstance(a, float) and isinstance(b, float):
+                return apply(a, b)
+            raise RuntimeError(operator, "Operands must be numbers.")
+        return numeric
+
+    # Calls evaluate the callee and arguments, then call it after checking it is callable with that many arguments.
+    def visit_call_expr(self, _expr: Expr.Call):
+        callee = _expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in _expr.arguments]
+        paren = _expr.paren
+        interpreter = self.interpreter
+
+        def call(environment):
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+            if not isinstance(function, LoxCallable):
+                raise RuntimeError(paren, "Can only call functions and classes.")
+            if len(values) != function.arity():
+                raise RuntimeError(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+            return function.call(interpreter, values)
+        return call
+
+    # Property reads require an instance.
+    def visit_get_expr(self, _expr: Expr.Get):
+        _object = _expr.object.accept(self)
+        name = _expr.name
+        lexme = name.lexme
+        # Inline cache of the last instance shape seen and the index of the field in it, or None if it has none.
+        cached_shape = None
+        cached_index = None
+
+        def get(environment):
+            nonlocal cached_shape, cached_index
+            instance = _object(environment)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeError(name, "Only instances have properties.")
+            if instance.shape is not cached_shape:
+                cached_shape = instance.shape
+                cached_index = cached_shape.indexes.get(lexme)
+            if cached_index is not None:
+                return instance.values[cached_index]
+            return instance.get(name)
+        return get
+
+    # Parentheses leave nothing to run.
+    def visit_grouping_expr(self, _expr: Expr.Grouping):
+        return _expr.expression.accept(self)
+
+    # Literals return their value.
+    def visit_literal_expr(self, _expr: Expr.Literal):
+        value = _expr.value
+        return lambda environment: value
+
+    # Logical operators short-circuit on their left operand.
+    def visit_logical_expr(self, _expr: Expr.Logical):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        if _expr.operator.type == TokenType.OR:
+            def logical_or(environment):
+                value = left(environment)
+                if value is not None and value is not False:
+                    return value
+                return right(environment)
+            return logical_or
+
+        def logical_and(environment):
+            value = left(environment)
+            if value is None or value is False:
+                return value
+            return right(environment)
+        return logical_and
+
+    # Property assignments require an instance, checked before the value is evaluated.
+    def visit_set_expr(self, _expr: Expr.Set):
+        _object = _expr.object.accept(self)
+        value = _expr.value.accept(self)
+        name = _expr.name
+        lexme = name.lexme
+        # Inline cache of the last instance shape seen, the shape it has with the field and the field's index.
+        cached_shape = None
+        cached_target = None
+        cached_index = None
+
+        def set(environment):
+            nonlocal cached_shape, cached_target, cached_index
+            instance = _object(environment)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeError(name, "Only instances have fields.")
+            result = value(environment)
+            shape = instance.shape
+            if shape is not cached_shape:
+                cached_shape = shape
+                cached_target = shape.with_field(lexme)
+                cached_index = cached_target.indexes[lexme]
+            if cached_target is shape:
+                instance.values[cached_index] = result
+            else:
+                instance.shape = cached_target
+                instance.values.append(result)
+            return result
+        return set
+
+    # 'super' finds the superclass method and binds it to 'this', one environment nearer.
+    def visit_super_expr(self, _expr: Expr.Super):
+        depth = _expr.depth
+        method = _expr.method
+
+        def super(environment):
+            this_environment = ancestor(environment, depth - 1)
+            found = this_environment.enclosing.slots[0].find_method(method.lexme)
+            if found is None:
+                raise RuntimeError(method, f"Undefined property '{method.lexme}'.")
+            return found.bind(this_environment.slots[0])
+        return super
+
+    # 'this' is a local like any other.
+    def visit_this_expr(self, _expr: Expr.This):
+        return self.compile_local(_expr.depth, _expr.slot)
+
+    # Unary operators compile to a closure for their operator.
+    def visit_unary_expr(self, _expr: Expr.Unary):
+        right = _expr.right.accept(self)
+        if _expr.operator.type == TokenType.BANG:
+            def negate(environment):
+                value = right(environment)
+                return value is None or value is False
+            return negate
+
+        def minus(environment):
+            value = right(environment)
+            if isinstance(value, float):
+                return -value
+            # As in the Interpreter, the error carries the operand rather than the operator.
+            raise RuntimeError(value, "Operand must be a number.")
+        return minus
+
+    # Variables read a resolved local directly, or a global by name.
+    def visit_variable_expr(self, _expr: Expr.Variable):
+        if _expr.depth is not None:
+            return self.compile_local(_expr.depth, _expr.slot)
+        name = _expr.name.lexme
+        token = _expr.name
+        globals = self.globals
+
+        def get_global(environment):
+            if name in globals:
+                return globals[name]
+            raise RuntimeError(token, f"Undefined variable '{name}'.")
+        return get_global
@@ -0,0 +1,27 @@
+"""
+Closure-compiling variant of Interpreter, selected with --engine closure. Instead of walking the tree, it has
+ClosureCompiler turn the resolved program into nested Python closures once and then calls them, so every decision the
+tree walker makes per evaluation, such as which operator to apply or where a variable lives, is made only once per
+node. Output and runtime errors are the same as the tree walker's.
+"""
+
+from typing import List
+import Stmt
+from RuntimeError import RuntimeError
+from ErrorReporter import error_reporter
+from Interpreter import Interpreter
+from ClosureCompiler import ClosureCompiler
+
+
+class ClosureInterpreter(Interpreter):
+    # Runs the resolved statements as they are: ClosureCompiler already specialises each operator in its own way.
+    def prepare(self, statements: List[Stmt.Stmt]):
+        return statements
+
+    # Compiles the statements into closures and runs them in the global environment.
+    def interpret(self, statements: List[Stmt.Stmt]):
+        program = ClosureCompiler(self).compile(statements)
+        try:
+            program(self.globals)
+        except RuntimeError as error:
+            error_reporter.runtime_error(error)
@@ -0,0 +1,102 @@
+"""
+Compact, array-backed storage for a scanned token stream. Instead of one Token object per token, the token types,
+source offsets and line numbers are kept in parallel arrays, costing a few bytes per token. Lexemes and literals are
+not stored at all: they are sliced from the source on demand. The source may be a string or a bytes-like buffer such
+as a memory-mapped file, in which case offsets are byte offsets and only the lexemes actually read are decoded. The parser iterates over lightweight TokenView objects
+that are only created as it pulls tokens, so tokens it does not keep in the AST are freed straight away.
+"""
+
+from array import array
+from Token import Token
+from TokenType import TokenType
+import Expr
+import Stmt
+
+# Token types indexed by their numeric value, for decoding the type codes stored in the arrays.
+TOKEN_TYPES = [None] * (max(t.value for t in TokenType) + 1)
+for token_type in TokenType:
+    TOKEN_TYPES[token_type.value] = token_type
+
+
+class CompactTokens:
+    # Initialise empty parallel arrays for the tokens of the given source.
+    def __init__(self, src):
+        self.src = src  # Source the offsets point into.
+        self.encoded = not isinstance(src, str)  # Whether lexemes must be decoded from UTF-8 bytes.
+        # Offsets use 32-bit entries unless the source is too large for them.
+        offset_code = "I" if len(src) < 2 ** 32 else "Q"
+        self.types = array("B")  # TokenType value of each token.
+        self.starts = array(offset_code)  # Offset of the first character of each lexeme.
+        self.ends = array(offset_code)  # Offset just past the last character of each lexeme.
+        self.lines = array("I")  # Line number of each token.
+
+    # Return the number of tokens stored.
+    def __len__(self):
+        return len(self.types)
+
+    # Return a view of the token at the given index.
+    def __getitem__(self, index: int):
+        return TokenView(self, index, TOKEN_TYPES[self.types[index]], self.lines[index])
+
+    # Yield a view of each token in order.
+    def __iter__(self):
+        types = TOKEN_TYPES
+        for index, (code, line) in enumerate(zip(self.types, self.lines)):
+            yield TokenView(self, index, types[code], line)
+
+    # Slice the lexeme of the token at the given index out of the source.
+    def lexeme(self, index: int):
+        text = self.src[self.starts[index] : self.ends[index]]
+        return text.decode() if self.encoded else text
+
+    # Compute the literal value of the token at the given index, if it has one.
+    def literal(self, index: int):
+        token_type = self.types[index]
+        if token_type == TokenType.NUMBER.value:
+            return float(self.lexeme(index))
+        if token_type == TokenType.STRING.value:
+            return self.lexeme(index)[1:-1]  # Drop the surrounding quotes.
+        return None
+
+
+class TokenView(Token):
+    # Only the position in the compact store is added; lexme and literal stay unset until first read.
+    __slots__ = ("_tokens", "_index")
+
+    # Initialise a view with its type and line, leaving the lexeme and literal to be materialised lazily.
+    def __init__(self, tokens: CompactTokens, index: int, type: TokenType, line: int):
+        self._tokens = tokens
+        self._index = index
+        self.type = type
+        self.line = line
+
+    # Pickle as a plain Token, so a cached tree does not drag the compact store and its source along with it.
+    def __reduce__(self):
+        return Token, (self.type, self.lexme, self.literal, self.line)
+
+    # Called only for unset attributes: materialise the lexeme or literal and cache it in its slot.
+    def __getattr__(self, name: str):
+        if name == "lexme":
+            value = self._tokens.lexeme(self._index)
+        elif name == "literal":
+            value = self._tokens.literal(self._index)
+        else:
+            raise AttributeError(name)
+        setattr(self, name, value)
+        return value
+
+
+# Materialises the lexeme and literal of every token view in a tree of nodes, or a list of them, so that the tree no
+# longer reads from the source it was scanned from and the source, such as a memory-mapped file, can be closed.
+def materialize(node: object):
+    if isinstance(node, TokenView):
+        # Reading each attribute once stores it in the view's slot, after which the view needs nothing else.
+        getattr(node, "lexme")
+        getattr(node, "literal")
+        node._tokens = None
+    elif isinstance(node, list):
+        for item in node:
+            materialize(item)
+    elif isinstance(node, (Expr.Expr, Stmt.Stmt)):
+        for name in node.__slots__:
+            materialize(getattr(node, name, None))
@@ -0,0 +1,38 @@
+"""
+Variant of LoxFunction run by ClosureInterpreter. Its body has already been compiled by ClosureCompiler into an invoke
+closure, which runs it in a new environment enclosing the function's closure and returns the value of its return
+statement, so a call is a single Python call with no Return exception to catch.
+"""
+
+from typing import Callable, List
+from Environment import Environment
+from LoxFunction import LoxFunction
+from LoxInstance import LoxInstance
+from Stmt import Function
+
+
+class CompiledFunction(LoxFunction):
+    # Initialise a compiled function with its declaration, closure, initializer status, and compiled body.
+    def __init__(self, declaration: Function, closure: Environment, is_initializer: bool, invoke: Callable):
+        super().__init__(declaration, closure, is_initializer)
+        self.invoke = invoke  # Runs the compiled body given the closure and the arguments.
+
+    # Create a new function bound to a given instance, sharing the compiled body.
+    def bind(self, instance: LoxInstance):
+        return CompiledFunction(self.declaration, self.binding(instance), self.is_initializer, self.invoke)
+
+    # Call this function with a given list of arguments.
+    def call(self, interpreter: "ClosureInterpreter", arguments: List[object]):
+        value = self.invoke(self.closure, arguments)
+        # An initialiser always returns the instance.
+        if self.is_initializer:
+            return self.closure.slots[0]
+        return value
+
+    # Call this method on an instance as if it had been bound to it first, without creating the bound function.
+    def call_method(self, interpreter: "ClosureInterpreter", instance: LoxInstance, arguments: List[object]):
+        closure = self.binding(instance)
+        value = self.invoke(closure, arguments)
+        if self.is_initializer:
+            return closure.slots[0]
+        return value
@@ -0,0 +1,58 @@
+"""
+Conformance check between execution engines. Runs every script in lox_scripts, or the scripts given, once with each of
+two engines, as separate lox.py processes with empty standard input, and diffs their output, error messages and exit
+codes. The tree walker is the reference. For example:
+
+    python Conformance.py --engines tree vm -O 1
+"""
+
+import os
+import sys
+import argparse
+import difflib
+import subprocess
+from lox import ENGINES
+from Optimizer import MAX_LEVEL
+
+
+# Directory holding the scripts checked by default.
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lox_scripts")
+# The interpreter's entry point.
+LOX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lox.py")
+
+
+# Runs a script with an engine at an optimisation level and returns its standard output, then its error output and
+# exit code.
+def run(engine: str, path: str, optimize: int = 0):
+    result = subprocess.run([sys.executable, LOX, "--no-cache", "--engine", engine, "-O", str(optimize), path],
+                            input="\n", capture_output=True, text=True)
+    return result.stdout.splitlines() + result.stderr.splitlines() + [f"exit code {result.returncode}"]
+
+
+# Runs each script with both engines, printing any differences, and returns the number of scripts that differed.
+def check(engines: list, paths: list, optimize: int = 0):
+    failures = 0
+    for path in paths:
+        expected, actual = (run(engine, path, optimize) for engine in engines)
+        if expected == actual:
+            print(f"ok    {path}")
+            continue
+        failures += 1
+        print(f"DIFF  {path}")
+        for line in difflib.unified_diff(expected, actual, *engines, lineterm=""):
+            print(f"      {line}")
+    print(f"{len(paths) - failures} of {len(paths)} scripts behave the same with {engines[0]} and {engines[1]}.")
+    return failures
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare the behaviour of two execution engines.")
+    arg_parser.add_argument("scripts", nargs="*", help="scripts to run; defaults to every script in lox_scripts")
+    arg_parser.add_argument("--engines", nargs=2, choices=ENGINES, default=["tree", "vm"],
+                            help="the reference engine and the engine checked against it")
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=range(MAX_LEVEL + 1), default=0,
+                            help="optimisation level both engines run at")
+    args = arg_parser.parse_args()
+    scripts = args.scripts or [os.path.join(SCRIPTS_DIR, file) for file in sorted(os.listdir(SCRIPTS_DIR))
+                               if file.endswith(".lox")]
+    sys.exit(1 if check(args.engines, scripts, args.optimize) else 0)
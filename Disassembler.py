@@ -0,0 +1,46 @@
+"""
+Prints compiled bytecode in a readable form, one instruction per line with its offset, source line, opcode and operands,
+resolving constant pool operands to their values. Functions are listed after the chunk that creates them. Used by
+lox.py --disassemble.
+"""
+
+from Chunk import Chunk
+from OpCode import OpCode, OPERANDS
+from VMFunction import VMFunction
+
+# Opcodes whose first operand indexes the constant pool.
+CONSTANT_OPERANDS = {
+    OpCode.CONSTANT, OpCode.GET_GLOBAL, OpCode.SET_GLOBAL, OpCode.DEFINE_GLOBAL, OpCode.GET_PROPERTY,
+    OpCode.SET_PROPERTY, OpCode.GET_SUPER, OpCode.CLOSURE, OpCode.CLASS,
+}
+
+
+# Returns the listing of a function's chunk followed by those of the functions it declares.
+def disassemble(function: VMFunction):
+    lines = [f"== {function.name} =="]
+    chunk = function.chunk
+    offset = 0
+    while offset < len(chunk.code):
+        text, offset = disassemble_instruction(chunk, offset)
+        lines.append(text)
+    for constant in chunk.constants:
+        if isinstance(constant, VMFunction):
+            lines.append("")
+            lines.append(disassemble(constant))
+    return "\n".join(lines)
+
+
+# Returns the listing of the instruction at an offset of a chunk and the offset of the next instruction.
+def disassemble_instruction(chunk: Chunk, offset: int):
+    op = OpCode(chunk.code[offset])
+    line = chunk.line_at(offset)
+    # As in clox, a line continuing the previous instruction's is shown as '|'.
+    source = "   |" if offset > 0 and chunk.line_at(offset - 1) == line else f"{line:4}"
+    operands = list(chunk.code[offset + 1:offset + 1 + OPERANDS.get(op, 0)])
+    text = f"{offset:04} {source} {op.name:<18}"
+    if operands:
+        text += " " + " ".join(f"{operand:4}" for operand in operands)
+    if op in CONSTANT_OPERANDS:
+        constant = chunk.constants[operands[0]]
+        text += f" '{constant.name if isinstance(constant, VMFunction) else constant}'"
+    return text.rstrip(), offset + 1 + len(operands)
@@ -3,6 +3,8 @@ Abstract base class for all expression types. Defines the structure for expressi
 Subclasses (Binary, Grouping, Literal, Unary, Variable, etc.) Represent specific types of expressions.
 Each subclass defines the structure and evaluation logic for its type of expression, such as binary
 operations, literals, variable references, and more.
+
+Generated by GenerateAst.py; edit the tables there and regenerate rather than editing this file.
 """
 
 from typing import Generic, TypeVar, List
@@ -11,8 +13,10 @@ from Token import Token
 # Defines a generic type variable R for return types.
 R = TypeVar("R")
 
-# Base class for all expression types.
+# Base class for all expression types; it has no fields of its own.
 class Expr:
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -21,7 +25,7 @@ class Visitor(Generic[R]):
     def __init__(self):
         pass
 
-# Maps expression types to their attributes for dynamic class generation.
+# Maps expression types to their attributes; the position of each, from 1, is its kind tag.
 subclasses = {
     "Assign": {"name": "Token", "value": "Expr"},
     "Binary": {"left": "Expr", "operator": "Token", "right": "Expr"},
@@ -35,19 +39,416 @@ subclasses = {
     "This": {"keyword": "Token"},
     "Unary": {"operator": "Token", "right": "Expr"},
     "Variable": {"name": "Token"},
+    "Add": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Subtract": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Multiply": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Divide": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Greater": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "GreaterEqual": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Less": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "LessEqual": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Equal": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "NotEqual": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Negate": {"operator": "Token", "right": "Expr"},
+    "Not": {"operator": "Token", "right": "Expr"},
+    "And": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Or": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Increment": {"name": "Token", "depth": "int", "slot": "int", "operator": "Token", "value": "float"},
+    "CompareConstant": {"depth": "int", "slot": "int", "operator": "Token", "value": "float", "test": "object"},
+    "CompareLocals": {"left_depth": "int", "left_slot": "int", "operator": "Token", "right_depth": "int", "right_slot": "int", "test": "object"},
 }
 
-# Iterate through expression types and dynamically create classes.
-for name, attributes in subclasses.items():
-    args = ""  # Initialises argument string for constructor signature.
-    for arg, arg_type in attributes.items():  # Builds constructor argument string.
-        args += f", {arg}: {arg_type}"
-    subclass_str = ""  # Initialises the string to hold the class definition code.
-    subclass_str += f"class {name}(Expr):\n"  # Starts class definition.
-    subclass_str += f"    def __init__(self{args}):\n"  # Adds constructor signature.
-    for arg in attributes:  # Adds code to assign instance variables.
-        subclass_str += f"        self.{arg} = {arg}\n"
-    subclass_str += "\n"
-    subclass_str += "    def accept(self, visitor: Visitor[R]):\n"  # Adds accept method for visitor pattern.
-    subclass_str += f"        return visitor.visit_{name.lower()}_expr(self)\n"
-    exec(subclass_str, globals())  # Dynamically executes the class definition code in the global namespace.
\ No newline at end of file
+
+class Assign(Expr):
+    __slots__ = ("name", "value", "depth", "slot", "upvalue", "boxed")
+    kind = 1
+
+    def __init__(self, name: Token, value: Expr):
+        self.name = name
+        self.value = value
+        self.depth = None
+        self.slot = None
+        self.upvalue = None
+        self.boxed = False
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_assign_expr(self)
+
+
+class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 2
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_binary_expr(self)
+
+
+class Call(Expr):
+    __slots__ = ("callee", "paren", "arguments")
+    kind = 3
+
+    def __init__(self, callee: Expr, paren: Token, arguments: List[Expr]):
+        self.callee = callee
+        self.paren = paren
+        self.arguments = arguments
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_call_expr(self)
+
+
+class Get(Expr):
+    __slots__ = ("object", "name", "cache_class", "cache_method", "cache_shape", "cache_index")
+    kind = 4
+
+    def __init__(self, object: Expr, name: Token):
+        self.object = object
+        self.name = name
+        self.cache_class = None
+        self.cache_method = None
+        self.cache_shape = None
+        self.cache_index = None
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_get_expr(self)
+
+
+class Grouping(Expr):
+    __slots__ = ("expression",)
+    kind = 5
+
+    def __init__(self, expression: Expr):
+        self.expression = expression
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_grouping_expr(self)
+
+
+class Literal(Expr):
+    __slots__ = ("value",)
+    kind = 6
+
+    def __init__(self, value: object):
+        self.value = value
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_literal_expr(self)
+
+
+class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 7
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_logical_expr(self)
+
+
+class Set(Expr):
+    __slots__ = ("object", "name", "value", "cache_shape", "cache_index", "cache_target")
+    kind = 8
+
+    def __init__(self, object: Expr, name: Token, value: Expr):
+        self.object = object
+        self.name = name
+        self.value = value
+        self.cache_shape = None
+        self.cache_index = None
+        self.cache_target = None
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_set_expr(self)
+
+
+class Super(Expr):
+    __slots__ = ("keyword", "method", "depth", "slot", "upvalue", "this_upvalue", "cache_class", "cache_method")
+    kind = 9
+
+    def __init__(self, keyword: Token, method: Token):
+        self.keyword = keyword
+        self.method = method
+        self.depth = None
+        self.slot = None
+        self.upvalue = None
+        self.this_upvalue = None
+        self.cache_class = None
+        self.cache_method = None
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_super_expr(self)
+
+
+class This(Expr):
+    __slots__ = ("keyword", "depth", "slot", "upvalue", "boxed")
+    kind = 10
+
+    def __init__(self, keyword: Token):
+        self.keyword = keyword
+        self.depth = None
+        self.slot = None
+        self.upvalue = None
+        self.boxed = False
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_this_expr(self)
+
+
+class Unary(Expr):
+    __slots__ = ("operator", "right")
+    kind = 11
+
+    def __init__(self, operator: Token, right: Expr):
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_unary_expr(self)
+
+
+class Variable(Expr):
+    __slots__ = ("name", "depth", "slot", "upvalue", "boxed")
+    kind = 12
+
+    def __init__(self, name: Token):
+        self.name = name
+        self.depth = None
+        self.slot = None
+        self.upvalue = None
+        self.boxed = False
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_variable_expr(self)
+
+
+class Add(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 13
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_add_expr(self)
+
+
+class Subtract(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 14
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_subtract_expr(self)
+
+
+class Multiply(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 15
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_multiply_expr(self)
+
+
+class Divide(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 16
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_divide_expr(self)
+
+
+class Greater(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 17
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_greater_expr(self)
+
+
+class GreaterEqual(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 18
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_greaterequal_expr(self)
+
+
+class Less(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 19
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_less_expr(self)
+
+
+class LessEqual(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 20
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_lessequal_expr(self)
+
+
+class Equal(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 21
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_equal_expr(self)
+
+
+class NotEqual(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 22
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_notequal_expr(self)
+
+
+class Negate(Expr):
+    __slots__ = ("operator", "right")
+    kind = 23
+
+    def __init__(self, operator: Token, right: Expr):
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_negate_expr(self)
+
+
+class Not(Expr):
+    __slots__ = ("operator", "right")
+    kind = 24
+
+    def __init__(self, operator: Token, right: Expr):
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_not_expr(self)
+
+
+class And(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 25
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_and_expr(self)
+
+
+class Or(Expr):
+    __slots__ = ("left", "operator", "right")
+    kind = 26
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_or_expr(self)
+
+
+class Increment(Expr):
+    __slots__ = ("name", "depth", "slot", "operator", "value")
+    kind = 27
+
+    def __init__(self, name: Token, depth: int, slot: int, operator: Token, value: float):
+        self.name = name
+        self.depth = depth
+        self.slot = slot
+        self.operator = operator
+        self.value = value
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_increment_expr(self)
+
+
+class CompareConstant(Expr):
+    __slots__ = ("depth", "slot", "operator", "value", "test")
+    kind = 28
+
+    def __init__(self, depth: int, slot: int, operator: Token, value: float, test: object):
+        self.depth = depth
+        self.slot = slot
+        self.operator = operator
+        self.value = value
+        self.test = test
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_compareconstant_expr(self)
+
+
+class CompareLocals(Expr):
+    __slots__ = ("left_depth", "left_slot", "operator", "right_depth", "right_slot", "test")
+    kind = 29
+
+    def __init__(self, left_depth: int, left_slot: int, operator: Token, right_depth: int, right_slot: int, test: object):
+        self.left_depth = left_depth
+        self.left_slot = left_slot
+        self.operator = operator
+        self.right_depth = right_depth
+        self.right_slot = right_slot
+        self.test = test
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_comparelocals_expr(self)
@@ -0,0 +1,171 @@
+"""
+Table-driven alternative to Scanner. Rather than branching on every character, a single compiled master regular
+expression splits the source into lexemes and each lexeme is classified through a table keyed on its first character.
+It produces exactly the same token stream as Scanner.scan_tokens, including line numbers and lexical error reporting,
+and is the default scanning engine; Scanner remains available as the reference implementation.
+"""
+
+import re
+from TokenType import TokenType
+from Token import Token
+from ErrorReporter import error_reporter
+from Scanner import Scanner
+from CompactTokens import CompactTokens
+
+
+# Master pattern matching one lexeme at a time. Spaces, tabs and carriage returns match no alternative, so findall
+# skips over them without producing anything; every other character, including unexpected ones, yields a lexeme.
+LEXEME_PATTERN = re.compile(
+    r"[A-Za-z_][A-Za-z0-9_]*"       # Identifiers and keywords.
+    r"|[0-9]+(?:\.[0-9]+)?"         # Number literals.
+    r'|"[^"]*"?'                    # String literals, possibly left open at the end of the source.
+    r"|!=|==|<=|>="                 # Two-character operators.
+    r"|//[^\n]*"                    # Comments.
+    r"|[^ \t\r]"                    # Newlines, single-character tokens and unexpected characters.
+)
+
+# Lexeme kinds, selected by the first character of each lexeme.
+SYMBOL, IDENTIFIER, NUMBER, STRING, NEWLINE, SLASH, UNEXPECTED = range(7)
+
+# Map of operator and punctuation lexemes to their token types.
+SYMBOLS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+# Dispatch table from the first character of a lexeme to its kind; characters not listed are unexpected.
+FIRST_CHARACTER = {symbol[0]: SYMBOL for symbol in SYMBOLS}
+FIRST_CHARACTER.update({c: IDENTIFIER for c in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_"})
+FIRST_CHARACTER.update({c: NUMBER for c in "0123456789"})
+FIRST_CHARACTER.update({'"': STRING, "\n": NEWLINE, "/": SLASH})
+
+# Byte-level counterparts of the tables above, used to scan memory-mapped and other bytes-like sources in place. The
+# extra alternative keeps a multi-byte UTF-8 character together so it is reported as one unexpected character.
+BYTE_LEXEME_PATTERN = re.compile(
+    rb"[A-Za-z_][A-Za-z0-9_]*"
+    rb"|[0-9]+(?:\.[0-9]+)?"
+    rb'|"[^"]*"?'
+    rb"|!=|==|<=|>="
+    rb"|//[^\n]*"
+    rb"|[\xc0-\xff][\x80-\xbf]*"
+    rb"|[^ \t\r]"
+)
+BYTE_SYMBOLS = {symbol.encode(): type for symbol, type in SYMBOLS.items()}
+BYTE_FIRST_CHARACTER = {ord(c): kind for c, kind in FIRST_CHARACTER.items()}
+
+
+class FastScanner(Scanner):
+    # Splits the source into lexemes with the master pattern and returns the list of tokens, ending with an EOF token.
+    def scan_tokens(self):
+        self.tokens.extend(self.tokenize(LEXEME_PATTERN.findall(self.src)))
+        return self.tokens
+
+    # Yields tokens one at a time as the master pattern finds them, without keeping the whole list.
+    def iter_tokens(self):
+        return self.tokenize(match.group() for match in LEXEME_PATTERN.finditer(self.src))
+
+    # Scans the source into a CompactTokens store of parallel arrays rather than a list of Token objects. The source may
+    # also be a bytes-like buffer such as a memory-mapped file, which is scanned in place without being decoded.
+    def scan_compact(self):
+        tokens = CompactTokens(self.src)
+        # Bound once to avoid attribute lookups per token.
+        add_type, add_start = tokens.types.append, tokens.starts.append
+        add_end, add_line = tokens.ends.append, tokens.lines.append
+        if isinstance(self.src, str):
+            pattern, kinds, symbols, keywords = LEXEME_PATTERN, FIRST_CHARACTER, SYMBOLS, self.keywords
+            newline, quote = "\n", '"'
+        else:
+            pattern, kinds, symbols = BYTE_LEXEME_PATTERN, BYTE_FIRST_CHARACTER, BYTE_SYMBOLS
+            keywords = {keyword.encode(): type for keyword, type in self.keywords.items()}
+            newline, quote = b"\n", b'"'
+        line = self.line
+        for match in pattern.finditer(self.src):
+            text = match.group()
+            kind = kinds.get(text[0], UNEXPECTED)
+            # Ordered by how often each kind appears in typical scripts.
+            if kind == SYMBOL:
+                type = symbols[text]
+            elif kind == IDENTIFIER:
+                type = keywords.get(text, TokenType.IDENTIFIER)
+            elif kind == NEWLINE:
+                line += 1
+                continue
+            elif kind == NUMBER:
+                type = TokenType.NUMBER
+            elif kind == STRING:
+                # Strings are stamped with the line of their closing quote, as in the reference scanner.
+                line += text.count(newline)
+                if len(text) == 1 or text[-1:] != quote:
+                    error_reporter.error(line, "Unterminated string.")
+                    continue
+                type = TokenType.STRING
+            elif kind == SLASH:
+                # A lone slash is division; anything longer is a comment running to the end of the line.
+                if len(text) > 1:
+                    continue
+                type = TokenType.SLASH
+            else:
+                error_reporter.error(line, "Unexpected character.")
+                continue
+            start, end = match.span()
+            add_type(type.value)
+            add_start(start)
+            add_end(end)
+            add_line(line)
+        self.line = line
+        self.start = self.current = len(self.src)
+        # Finish with an End of File token spanning no characters.
+        add_type(TokenType.EOF.value)
+        add_start(self.current)
+        add_end(self.current)
+        add_line(line)
+        return tokens
+
+    # Classifies each lexeme by its first character and yields the corresponding tokens, followed by an EOF token.
+    def tokenize(self, lexemes):
+        keywords = self.keywords
+        kinds = FIRST_CHARACTER
+        line = self.line
+        for text in lexemes:
+            kind = kinds.get(text[0], UNEXPECTED)
+            # Ordered by how often each kind appears in typical scripts.
+            if kind == SYMBOL:
+                yield Token(SYMBOLS[text], text, None, line)
+            elif kind == IDENTIFIER:
+                yield Token(keywords.get(text, TokenType.IDENTIFIER), text, None, line)
+            elif kind == NEWLINE:
+                line += 1
+            elif kind == NUMBER:
+                yield Token(TokenType.NUMBER, text, float(text), line)
+            elif kind == STRING:
+                # Strings are stamped with the line of their closing quote, as in the reference scanner.
+                line += text.count("\n")
+                if len(text) > 1 and text[-1] == '"':
+                    yield Token(TokenType.STRING, text, text[1:-1], line)
+                else:
+                    error_reporter.error(line, "Unterminated string.")
+            elif kind == SLASH:
+                # A lone slash is division; anything longer is a comment running to the end of the line.
+                if len(text) == 1:
+                    yield Token(TokenType.SLASH, text, None, line)
+            else:
+                error_reporter.error(line, "Unexpected character.")
+        self.line = line
+        self.start = self.current = len(self.src)
+        yield Token(TokenType.EOF, "", None, line)  # Finish with an End of File token.
@@ -0,0 +1,77 @@
+"""
+Flat closure variant of LoxFunction, used by FlatInterpreter. Instead of keeping the whole environment chain it was
+declared in alive, a FlatFunction holds only the Cells of the variables it captures, its upvalues, in the order the
+Resolver listed them. Calls run in an environment that is not chained to the caller's or the declaring function's
+scopes. A method's first upvalue is always 'this', so binding one only replaces that Cell.
+"""
+
+from typing import List
+from Return import Return
+from Environment import Environment, allocations_avoided
+from LoxFunction import LoxFunction, memo_keys
+from LoxInstance import LoxInstance
+from Cell import Cell
+from Stmt import Function
+
+
+class FlatFunction(LoxFunction):
+    # Initialise a flat closure with its declaration, the Cells it captured, and initializer status.
+    def __init__(self, declaration: Function, upvalues: List[Cell], is_initializer: bool):
+        super().__init__(declaration, None, is_initializer)
+        self.upvalues = upvalues  # Cells of the captured variables, indexed by the Resolver's upvalue indexes.
+
+    # Create a new function bound to a given instance by giving it its own 'this' Cell.
+    def bind(self, instance: LoxInstance):
+        return FlatFunction(self.declaration, self.binding(instance), self.is_initializer)
+
+    # Return the upvalues of this method when bound to a given instance.
+    def binding(self, instance: LoxInstance):
+        # A method that never reads 'this' can keep its unbound upvalues; only the initialiser always needs the instance.
+        if not self.declaration.uses_this and not self.is_initializer:
+            return self.upvalues
+        return [Cell(instance), *self.upvalues[1:]]
+
+    # Return the upvalues for an instance as binding does, counting them into allocations_avoided if they are shared.
+    def counting_binding(self, instance: LoxInstance):
+        if not self.declaration.uses_this and not self.is_initializer:
+            allocations_avoided["bind"] += 1
+        return FlatFunction.binding(self, instance)
+
+    # Call this function with a given list of arguments, or look up the result of the same call if it is memoised.
+    def call(self, interpreter: "FlatInterpreter", arguments: List[object]):
+        if self.memo is not None:
+            return self.memo(*memo_keys(arguments))
+        return self.run(interpreter, self.upvalues, arguments)
+
+    # Run the function's body with the given arguments and upvalues, and then any tail call it ends with in its place.
+    def run(self, interpreter: "FlatInterpreter", upvalues: List[Cell], arguments: List[object]):
+        function = self
+        while True:
+            declaration = function.declaration
+            # Only globals lie outside the function's own scopes; everything else it uses was captured.
+            if declaration.reusable:
+                environment = interpreter.take_frame(declaration, interpreter.globals, "call")
+            else:
+                environment = Environment(interpreter.globals, declaration.size)
+            environment.slots[:len(arguments)] = arguments
+            # Parameters a nested function captures live in Cells.
+            for slot in declaration.boxed_params:
+                environment.slots[slot] = Cell(environment.slots[slot])
+            enclosing_upvalues = interpreter.upvalues
+            interpreter.upvalues = upvalues
+            try:
+                completion = interpreter.execute_block(declaration.body, environment)
+            except Return as return_value:
+                completion = (return_value.value,)
+            finally:
+                interpreter.upvalues = enclosing_upvalues
+                if declaration.reusable:
+                    declaration.frame = environment
+            # An initialiser always returns the instance, and other functions return nil by default.
+            if function.is_initializer:
+                return upvalues[0].value
+            if completion is None:
+                return None
+            if len(completion) == 1:
+                return completion[0]
+            function, upvalues, arguments = completion
@@ -0,0 +1,116 @@
+"""
+Closure-converting variant of Interpreter, selected with --closures flat. Functions are FlatFunctions that capture only
+the variables they use, as clox upvalues do, so a long-lived closure no longer keeps every enclosing environment alive
+and a captured variable is reached through one Cell instead of a walk up the environment chain. It relies on the
+captures the Resolver records: locals that a nested function captures are boxed in Cells in their slots, and each
+function lists where its upvalues are found when it is declared.
+"""
+
+from typing import List
+import Expr
+import Stmt
+from Token import Token
+from RuntimeError import RuntimeError
+from Environment import Environment
+from Interpreter import Interpreter
+from LoxClass import LoxClass
+from FlatFunction import FlatFunction
+from Cell import Cell
+
+
+class FlatInterpreter(Interpreter):
+    # Initialises the interpreter, starting outside any function and so with no upvalues.
+    def __init__(self, returns: str = "value", memoize: int = 0, statistics: bool = False):
+        super().__init__(returns, memoize, statistics)
+        # Cells captured by the function currently executing.
+        self.upvalues = []
+
+    # Collects the Cells a function declared in the current environment captures.
+    def capture(self, upvalues: List[tuple]):
+        cells = []
+        for depth, index in upvalues:
+            # A local of the declaring function, found in its boxed slot, or one of that function's own upvalues.
+            if depth is not None:
+                cells.append(self.environment.get_at(depth, index))
+            else:
+                cells.append(self.upvalues[index])
+        return cells
+
+    # Looks up a variable's value: a captured one through its Cell, a local in its slot, or a global by name.
+    def look_up_variable(self, name: Token, _expr: Expr.Expr):
+        if _expr.upvalue is not None:
+            return self.upvalues[_expr.upvalue].value
+        distance = _expr.depth
+        if distance is not None:
+            value = self.environment.get_at(distance, _expr.slot)
+            return value.value if _expr.boxed else value
+        return self.globals.get(name)
+
+    # Assigns a new value to a variable, through its Cell if it is captured.
+    def visit_assign_expr(self, _expr: Expr.Assign):
+        value = self.evaluate(_expr.value)
+        if _expr.upvalue is not None:
+            self.upvalues[_expr.upvalue].value = value
+        elif _expr.depth is not None:
+            if _expr.boxed:
+                self.environment.get_at(_expr.depth, _expr.slot).value = value
+            else:
+                self.environment.assign_at(_expr.depth, _expr.slot, value)
+        else:
+            self.globals.assign(_expr.name, value)
+        return value
+
+    # Defines the name a statement declares, boxing it if a nested function captures it.
+    def define(self, _stmt: Stmt.Stmt, value: object):
+        super().define(_stmt, Cell(value) if _stmt.boxed else value)
+
+    # Stores a new value in the variable a statement declared, once it has been defined.
+    def redefine(self, _stmt: Stmt.Stmt, value: object):
+        if _stmt.slot is None:
+            self.environment.define(_stmt.name.lexme, value)
+        elif _stmt.boxed:
+            self.environment.slots[_stmt.slot].value = value
+        else:
+            self.environment.slots[_stmt.slot] = value
+
+    # Defines a new function as a flat closure over the variables it captures.
+    def visit_function_stmt(self, _stmt: Stmt.Function):
+        # The function's own Cell has to exist before it is captured, so that a local function can call itself.
+        self.define(_stmt, None)
+        self.redefine(_stmt, self.memoized(FlatFunction(_stmt, self.capture(_stmt.upvalues), False)))
+        return None
+
+    # Defines a new class whose methods capture 'super' and 'this' Cells from short-lived environments.
+    def visit_class_stmt(self, _stmt: Stmt.Class):
+        superclass = None
+        if _stmt.superclass is not None:
+            superclass = self.evaluate(_stmt.superclass)
+            if not isinstance(superclass, LoxClass):
+                raise RuntimeError(_stmt.superclass.name, "Superclass must be a class.")
+        self.define(_stmt, None)
+        enclosing = self.environment
+        # The methods' declaring scopes, as the Resolver saw them, are 'super', when there is a superclass, and then
+        # 'this', whose Cell every bound method replaces with its own.
+        if superclass is not None:
+            self.environment = Environment(self.environment, 1)
+            self.environment.slots[0] = Cell(superclass)
+        self.environment = Environment(self.environment, 1)
+        self.environment.slots[0] = Cell(None)
+        methods = {}
+        for method in _stmt.methods:
+            methods[method.name.lexme] = FlatFunction(method, self.capture(method.upvalues), method.name.lexme == "init")
+        if self.statistics:
+            self.count_bindings(methods)
+        self.environment = enclosing
+        self.redefine(_stmt, LoxClass(_stmt.name.lexme, superclass, methods))
+        return None
+
+    # Finds the superclass method a 'super' expression names, with the instance, both through captured Cells.
+    def find_super_method(self, _expr: Expr.Super):
+        superclass = self.upvalues[_expr.upvalue].value
+        _object = self.upvalues[_expr.this_upvalue].value
+        return self.find_cached_method(_expr, superclass, _expr.method), _object
+
+    # Returns the upvalues a flat function runs with when called by itself rather than as a method of an instance.
+    def closure_of(self, function: FlatFunction):
+        return function.upvalues
@@ -0,0 +1,190 @@
+"""
+Generates the AST node modules Expr.py and Stmt.py from the tables below. Each node becomes a real class with
+__slots__, so instances carry no per-node __dict__, and with a stable integer kind tag: kinds follow the order of the
+tables, so new node types must be appended at the end. Fields listed under annotations are not constructor arguments
+but slots that later passes fill in, initialised to the given default. Run this script after changing a table:
+
+    python GenerateAst.py
+"""
+
+import os
+
+# Maps expression types to their constructor fields and field types.
+expr_subclasses = {
+    "Assign": {"name": "Token", "value": "Expr"},
+    "Binary": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Call": {"callee": "Expr", "paren": "Token", "arguments": "List[Expr]"},
+    "Get": {"object": "Expr", "name": "Token"},
+    "Grouping": {"expression": "Expr"},
+    "Literal": {"value": "object"},
+    "Logical": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Set": {"object": "Expr", "name": "Token", "value": "Expr"},
+    "Super": {"keyword": "Token", "method": "Token"},
+    "This": {"keyword": "Token"},
+    "Unary": {"operator": "Token", "right": "Expr"},
+    "Variable": {"name": "Token"},
+    # Operator-specific forms of Binary, Unary and Logical that the Specializer substitutes after resolution, so the
+    # interpreter reaches the code for an operator directly instead of testing the operator on every evaluation.
+    "Add": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Subtract": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Multiply": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Divide": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Greater": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "GreaterEqual": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Less": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "LessEqual": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Equal": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "NotEqual": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Negate": {"operator": "Token", "right": "Expr"},
+    "Not": {"operator": "Token", "right": "Expr"},
+    "And": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    "Or": {"left": "Expr", "operator": "Token", "right": "Expr"},
+    # Superinstructions the Fuser substitutes for common idioms on plain locals, each carrying the depth and slot of
+    # the locals it reads: adding a number to a local and assigning it back, as in i = i + 1, and comparing a local with
+    # a number or with another local using the comparison function test.
+    "Increment": {"name": "Token", "depth": "int", "slot": "int", "operator": "Token", "value": "float"},
+    "CompareConstant": {"depth": "int", "slot": "int", "operator": "Token", "value": "float", "test": "object"},
+    "CompareLocals": {"left_depth": "int", "left_slot": "int", "operator": "Token", "right_depth": "int",
+                      "right_slot": "int", "test": "object"},
+}
+
+# Maps expression types to the slots filled in after parsing and their initial values.
+expr_annotations = {
+    # Set by the Resolver: how many scopes out a local variable was declared, or None for a global, and its slot in
+    # that scope's environment. For flat closures, also the index of the enclosing function's variable among the
+    # function's upvalues, or None if it is not captured, and whether a local of the function itself is boxed in a
+    # Cell because a nested function captures it.
+    "Assign": {"depth": "None", "slot": "None", "upvalue": "None", "boxed": "False"},
+    # Set by the Interpreter: an inline cache of the method the expression last found and the class it was found in,
+    # the instance's class for a property read and the superclass for 'super'. Property reads and assignments also
+    # cache the last instance shape they saw with the index of the field in it, or None if it has no such field, and
+    # an assignment the shape the instance has once it has the field.
+    "Get": {"cache_class": "None", "cache_method": "None", "cache_shape": "None", "cache_index": "None"},
+    "Set": {"cache_shape": "None", "cache_index": "None", "cache_target": "None"},
+    "Super": {"depth": "None", "slot": "None", "upvalue": "None", "this_upvalue": "None", "cache_class": "None",
+              "cache_method": "None"},
+    "This": {"depth": "None", "slot": "None", "upvalue": "None", "boxed": "False"},
+    "Variable": {"depth": "None", "slot": "None", "upvalue": "None", "boxed": "False"},
+}
+
+# Maps statement types to their constructor fields and field types.
+stmt_subclasses = {
+    "Block": {"statements": "List[Stmt]"},
+    "Expression": {"expression": "Expr"},
+    "Function": {"name": "Token", "params": "List[Token]", "body": "List[Stmt]"},
+    "Class": {"name": "Token", "superclass": "Variable", "methods": "List[Function]"},
+    "If": {"condition": "Expr", "then_branch": "Stmt", "else_branch": "Stmt"},
+    "Print": {"expression": "Expr"},
+    "Return": {"keyword": "Token", "value": "Expr"},
+    "Var": {"name": "Token", "initializer": "Expr"},
+    "While": {"condition": "Expr", "body": "Stmt"},
+}
+
+# Maps statement types to the slots filled in after parsing and their initial values.
+stmt_annotations = {
+    # Set by the Resolver: whether the block needs an environment and how many slots it has, and whether it never
+    # escapes, so that one spare environment, kept in frame while the block is not running, can be reused.
+    "Block": {"scoped": "True", "size": "0", "reusable": "False", "frame": "None"},
+    # Set by the Resolver: the slot of each declared name in the current environment, or None for a global, whether
+    # it is boxed for a flat closure, and for functions the number of slots their environment needs for parameters
+    # and locals, the slots of boxed parameters and how to find each captured variable when the function is declared.
+    # Like a block's, a function's environment may be reused between calls when it never escapes, and a method that
+    # never refers to 'this' does not need a new environment for it when it is bound.
+    # Set by the PurityAnalyzer: whether the function is pure, so that its calls can be memoised.
+    "Class": {"slot": "None", "boxed": "False"},
+    "Function": {"slot": "None", "boxed": "False", "size": "0", "boxed_params": "()", "upvalues": "()",
+                 "reusable": "False", "frame": "None", "uses_this": "True", "pure": "False"},
+    "Var": {"slot": "None", "boxed": "False"},
+    # Set by the Resolver: whether the returned value is a call, which a function returning it makes as the last thing
+    # it does, so that the Interpreter can run the callee in place of the returning function instead of on top of it.
+    "Return": {"tail_call": "False"},
+}
+
+# Module docstrings and imports for each generated module.
+EXPR_HEADER = '''"""
+Abstract base class for all expression types. Defines the structure for expression evaluation.
+Subclasses (Binary, Grouping, Literal, Unary, Variable, etc.) Represent specific types of expressions.
+Each subclass defines the structure and evaluation logic for its type of expression, such as binary
+operations, literals, variable references, and more.
+
+Generated by GenerateAst.py; edit the tables there and regenerate rather than editing this file.
+"""
+
+from typing import Generic, TypeVar, List
+from Token import Token
+'''
+
+STMT_HEADER = '''"""
+Abstract base class for all statement types in Lox. Defines the structure for statement execution. Subclasses
+(Expression, Print, Var, Block, If, While, Function, Return, etc.) Represent specific types of statements.
+Each subclass defines the structure and execution logic for its type of statement, such as variable declarations,
+control flow constructs, and function definitions.
+
+Generated by GenerateAst.py; edit the tables there and regenerate rather than editing this file.
+"""
+
+from Expr import Expr, Variable
+from Token import Token
+from typing import Generic, TypeVar, List
+'''
+
+
+# Build the source of a module defining the base class, the visitor and one slotted class per table entry.
+def define_ast(header: str, base: str, noun: str, subclasses: dict, annotations: dict):
+    lines = [header]
+    lines.append("# Defines a generic type variable R for return types.")
+    lines.append('R = TypeVar("R")')
+    lines.append("")
+    lines.append(f"# Base class for all {noun} types; it has no fields of its own.")
+    lines.append(f"class {base}:")
+    lines.append("    __slots__ = ()")
+    lines.append("")
+    lines.append("    def __init__(self):")
+    lines.append("        pass")
+    lines.append("")
+    lines.append(f"# Generic visitor class for implementing visitor pattern for {noun}s.")
+    lines.append("class Visitor(Generic[R]):")
+    lines.append("    def __init__(self):")
+    lines.append("        pass")
+    lines.append("")
+    lines.append(f"# Maps {noun} types to their attributes; the position of each, from 1, is its kind tag.")
+    lines.append("subclasses = {")
+    for name, attributes in subclasses.items():
+        fields = ", ".join(f'"{field}": "{field_type}"' for field, field_type in attributes.items())
+        lines.append(f'    "{name}": {{{fields}}},')
+    lines.append("}")
+    for kind, (name, attributes) in enumerate(subclasses.items(), start=1):
+        lines.extend(define_type(base, name, kind, attributes, annotations.get(name, {})))
+    return "\n".join(lines) + "\n"
+
+
+# Build the source lines of one node class.
+def define_type(base: str, name: str, kind: int, attributes: dict, annotations: dict):
+    slots = ", ".join(f'"{field}"' for field in [*attributes, *annotations])
+    args = "".join(f", {field}: {field_type}" for field, field_type in attributes.items())
+    lines = ["", ""]
+    lines.append(f"class {name}({base}):")
+    lines.append(f"    __slots__ = ({slots}{',' if len(attributes) + len(annotations) == 1 else ''})")
+    lines.append(f"    kind = {kind}")
+    lines.append("")
+    lines.append(f"    def __init__(self{args}):")
+    for field in attributes:
+        lines.append(f"        self.{field} = {field}")
+    for field, default in annotations.items():
+        lines.append(f"        self.{field} = {default}")
+    lines.append("")
+    lines.append("    def accept(self, visitor: Visitor[R]):")
+    lines.append(f"        return visitor.visit_{name.lower()}_{base.lower()}(self)")
+    return lines
+
+
+# Write a generated module next to this script.
+def write_module(file_name: str, source: str):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+    with open(path, "w") as f:
+        f.write(source)
+
+
+if __name__ == "__main__":
+    write_module("Expr.py", define_ast(EXPR_HEADER, "Expr", "expression", expr_subclasses, expr_annotations))
+    write_module("Stmt.py", define_ast(STMT_HEADER, "Stmt", "statement", stmt_subclasses, stmt_annotations))
@@ -4,7 +4,7 @@ and execute statements, managing the flow of control, function calls, and variab
 for variable management and ErrorReporter for error handling.
 """
 from time import time
-from typing import List, Self
+from typing import Callable, Dict, List, Self
 from types import MethodType
 import Expr
 import Stmt
@@ -12,24 +12,42 @@ from TokenType import TokenType
 from Token import Token
 from RuntimeError import RuntimeError
 from ErrorReporter import error_reporter
-from Environment import Environment
+from Environment import Environment, allocations_avoided
 from LoxCallable import LoxCallable
 from LoxFunction import LoxFunction
 from LoxClass import LoxClass
 from LoxInstance import LoxInstance
+from Shape import Shape
 from Return import Return
 from LoxInput import LoxInput
-
-
-class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
-    # Initialises the interpreter with global variables and predefined functions.
-    def __init__(self):
+from Fuser import Fuser, superinstructions
+
+
+# Wraps a handler so that each call also counts one of a kind in a table of statistics.
+def counted(handler: Callable, table: Dict[str, int], kind: str):
+    def counting_handler(node: object):
+        table[kind] += 1
+        return handler(node)
+    return counting_handler
+
+
+class Interpreter(Expr.Visitor[object], Stmt.Visitor[object]):
+    # Initialises the interpreter with global variables and predefined functions, with how return statements leave
+    # their function: "value", passing a completion up through the statements enclosing them, or "exception", and with
+    # how many results of calls to each pure function to memoise, if any, and with whether to collect statistics.
+    def __init__(self, returns: str = "value", memoize: int = 0, statistics: bool = False):
+        # Whether a return statement raises Return instead of producing a completion, as every return once did.
+        self.exceptional_returns = returns == "exception"
+        # Number of results of calls cached for each pure function, or 0 when calls are not memoised.
+        self.memo_size = memoize
+        # Whether the interpreter counts what its optimisations do, for the benchmarks; the plain handlers never do.
+        self.statistics = statistics
+        if statistics:
+            self.count_statistics()
         # Establishes a global environment for variables and functions.
         self.globals = Environment()  
         # Sets the current environment scope to global by default.
         self.environment = self.globals  
-        # Keeps track of local scopes for variables.
-        self.locals = {} 
         # Defines a built-in "input" function within the global scope.
         self.globals.define("input", LoxInput())
 
@@ -57,6 +75,54 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         # Adds the "clock" function to the global scope, making it available in Lox programs.
         self.globals.define("clock", clock)
 
+    # Installs handlers on this interpreter, in front of the plain ones, that count the superinstructions they run into
+    # superinstructions and the environments they avoid allocating into allocations_avoided, so that counting costs
+    # nothing when statistics are not collected.
+    def count_statistics(self):
+        visit_block_stmt = self.visit_block_stmt
+        take_frame = self.take_frame
+        visit_call_expr = self.visit_call_expr
+
+        # Counts each block that declares nothing, and so runs without an environment of its own.
+        def counting_visit_block_stmt(_stmt: Stmt.Block):
+            if not _stmt.scoped:
+                allocations_avoided["block"] += 1
+            return visit_block_stmt(_stmt)
+
+        # Counts each spare environment that is reused.
+        def counting_take_frame(node: Stmt.Stmt, enclosing: Environment, kind: str):
+            if node.frame is not None:
+                allocations_avoided[kind] += 1
+            return take_frame(node, enclosing, kind)
+
+        # Counts each method called directly on its instance, which a call through 'super' always is, and one through a
+        # property is when the property's cache found no field.
+        def counting_visit_call_expr(_expr: Expr.Call):
+            value = visit_call_expr(_expr)
+            callee = _expr.callee
+            if type(callee) is Expr.Super or type(callee) is Expr.Get and callee.cache_index is None:
+                allocations_avoided["invoke"] += 1
+            return value
+
+        self.visit_block_stmt = counting_visit_block_stmt
+        self.take_frame = counting_take_frame
+        self.visit_call_expr = counting_visit_call_expr
+        self.visit_increment_expr = counted(self.visit_increment_expr, superinstructions, "increment")
+        self.visit_compareconstant_expr = counted(self.visit_compareconstant_expr, superinstructions,
+                                                  "compare_constant")
+        self.visit_comparelocals_expr = counted(self.visit_comparelocals_expr, superinstructions, "compare_locals")
+
+    # Makes the methods of a class being declared count the bindings they share into allocations_avoided.
+    def count_bindings(self, methods: Dict[str, LoxFunction]):
+        for method in methods.values():
+            method.binding = method.counting_binding
+
+    # Turns resolved statements into the program this interpreter runs, which is what lox.py caches; the tree walker runs
+    # the statements themselves, with each operator specialised into its own node type and common idioms on locals fused
+    # into superinstructions.
+    def prepare(self, statements: List[Stmt.Stmt]):
+        return Fuser().specialize(statements)
+
     # Executes a list of statements as part of the program's interpretation process.
     def interpret(self, statements: List[Stmt.Stmt]):
         try:
@@ -92,19 +158,44 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         if not isinstance(_object, LoxInstance):
             raise RuntimeError(_expr.name, "Only instances have fields.")
         value = self.evaluate(_expr.value)
-        _object.set(_expr.name, value)
+        # The expression's inline cache knows, for the last shape it saw, where the field goes and the shape after it.
+        shape = _object.shape
+        if shape is not _expr.cache_shape:
+            _expr.cache_shape = shape
+            _expr.cache_target = shape.with_field(_expr.name.lexme)
+            _expr.cache_index = _expr.cache_target.indexes[_expr.name.lexme]
+        if _expr.cache_target is shape:
+            _object.values[_expr.cache_index] = value
+        else:
+            _object.shape = _expr.cache_target
+            _object.values.append(value)
         return value
 
     # Handles the 'super' keyword, binding methods from a superclass.
     def visit_super_expr(self, _expr: Expr.Super):
-        distance = self.locals.get(_expr)
-        superclass = self.environment.get_at(distance, "super")
-        _object = self.environment.get_at(distance - 1, "this")
-        method = superclass.find_method(_expr.method.lexme)
-        if method is None:
-            raise RuntimeError(_expr.method, f"Undefined property '{_expr.method.lexme}'.")
+        method, _object = self.find_super_method(_expr)
         return method.bind(_object)
 
+    # Finds the superclass method a 'super' expression names, returning it with the instance 'this' refers to.
+    def find_super_method(self, _expr: Expr.Super):
+        distance = _expr.depth
+        # 'super' and 'this' are each the only slot of their environments.
+        superclass = self.environment.get_at(distance, 0)
+        _object = self.environment.get_at(distance - 1, 0)
+        # The superclass is the same on every evaluation unless the class declaration itself runs again.
+        return self.find_cached_method(_expr, superclass, _expr.method), _object
+
+    # Finds a method of a class through the inline cache of the Get or Super expression naming it, refilling the cache
+    # when the class is not the one it last saw.
+    def find_cached_method(self, _expr: Expr.Expr, klass: LoxClass, name: Token):
+        if klass is not _expr.cache_class:
+            _expr.cache_class = klass
+            _expr.cache_method = klass.find_method(name.lexme)
+        method = _expr.cache_method
+        if method is None:
+            raise RuntimeError(name, f"Undefined property '{name.lexme}'.")
+        return method
+
     # Evaluates and returns the current object instance for 'this'.
     def visit_this_expr(self, _expr: Expr.This):
         return self.look_up_variable(_expr.keyword, _expr)
@@ -127,9 +218,9 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
 
    # Looks up a variable's value, considering both local and global scopes.
     def look_up_variable(self, name: Token, _expr: Expr.Expr):
-        if _expr in self.locals:
-            distance = self.locals[_expr]
-            return self.environment.get_at(distance, name.lexme)
+        distance = _expr.depth
+        if distance is not None:
+            return self.environment.get_at(distance, _expr.slot)
         else:
             return self.globals.get(name)
 
@@ -180,28 +271,62 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
     def evaluate(self, _expr: Expr.Expr):
         return _expr.accept(self)
 
-    # Executes a statement by accepting its visitor method.
+    # Executes a statement by accepting its visitor method, returning its completion: None when execution continues with
+    # the next statement, or a one-element tuple holding the value of a return statement it executed.
     def execute(self, _stmt: Stmt.Stmt):
-        _stmt.accept(self)
+        return _stmt.accept(self)
 
-    # Records the depth at which a local variable is found for later retrieval.
-    def resolve(self, _expr: Expr.Expr, depth: int):
-        self.locals[_expr] = depth
+    # Records the depth and slot at which a local variable is found on the expression itself for later retrieval.
+    def resolve(self, _expr: Expr.Expr, depth: int, slot: int):
+        _expr.depth = depth
+        _expr.slot = slot
 
-    # Executes a block of statements in a new environment scope.
+    # Defines the name a statement declares in the current environment: by name at global scope, otherwise in its slot.
+    def define(self, _stmt: Stmt.Stmt, value: object):
+        if _stmt.slot is None:
+            self.environment.define(_stmt.name.lexme, value)
+        else:
+            self.environment.slots[_stmt.slot] = value
+
+    # Executes a block of statements in a new environment scope, stopping at the first that completes with a return.
     def execute_block(self, statements: List[Stmt.Stmt], environment: Environment):
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                completion = statement.accept(self)
+                if completion is not None:
+                    return completion
+            return None
         finally:
             self.environment = previous
 
-    # Handles the execution of a block statement by creating a new scope.
+    # Handles the execution of a block statement by creating a new scope, unless it declares nothing.
     def visit_block_stmt(self, _stmt: Stmt.Block):
-        self.execute_block(_stmt.statements, Environment(self.environment))
-        return None
+        if not _stmt.scoped:
+            for statement in _stmt.statements:
+                completion = statement.accept(self)
+                if completion is not None:
+                    return completion
+            return None
+        if _stmt.reusable:
+            environment = self.take_frame(_stmt, self.environment, "block")
+            try:
+                return self.execute_block(_stmt.statements, environment)
+            finally:
+                _stmt.frame = environment
+        return self.execute_block(_stmt.statements, Environment(self.environment, _stmt.size))
+
+    # Takes the spare environment of a scope that never escapes, or allocates one if it is already in use, as when a
+    # function recurses. Values left from its last use are redefined before they can be read. The caller hands the
+    # environment back by storing it in the node's frame once the scope has finished.
+    def take_frame(self, node: Stmt.Stmt, enclosing: Environment, kind: str):
+        environment = node.frame
+        if environment is None:
+            return Environment(enclosing, node.size)
+        node.frame = None
+        environment.enclosing = enclosing
+        return environment
 
     # Defines a new class, handling inheritance if a superclass is specified.
     def visit_class_stmt(self, _stmt: Stmt.Class):
@@ -210,18 +335,23 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
             superclass = self.evaluate(_stmt.superclass)
             if not isinstance(superclass, LoxClass):
                 raise RuntimeError(_stmt.superclass.name, "Superclass must be a class.")
-        self.environment.define(_stmt.name.lexme, None)
+        self.define(_stmt, None)
         if _stmt.superclass is not None:
-            self.environment = Environment(self.environment)
-            self.environment.define("super", superclass)
+            self.environment = Environment(self.environment, 1)
+            self.environment.slots[0] = superclass
         methods = {}
         for method in _stmt.methods:
             function = LoxFunction(method, self.environment, method.name.lexme == "init")
             methods[method.name.lexme] = function
+        if self.statistics:
+            self.count_bindings(methods)
         klass = LoxClass(_stmt.name.lexme, superclass, methods)
         if superclass is not None:
             self.environment = self.environment.enclosing
-        self.environment.assign(_stmt.name, klass)
+        if _stmt.slot is None:
+            self.environment.assign(_stmt.name, klass)
+        else:
+            self.environment.slots[_stmt.slot] = klass
         return None
 
     # Evaluates and executes an expression statement.
@@ -232,15 +362,21 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
     # Defines a new function, adding it to the current environment.
     def visit_function_stmt(self, _stmt: Stmt.Function):
         function = LoxFunction(_stmt, self.environment, False)
-        self.environment.define(_stmt.name.lexme, function)
+        self.define(_stmt, self.memoized(function))
         return None
 
+    # Returns a newly declared function, memoising its calls first if memoisation is enabled and the function is pure.
+    def memoized(self, function: LoxFunction):
+        if self.memo_size and function.declaration.pure:
+            function.memoize(self, self.closure_of(function), self.memo_size)
+        return function
+
     # Executes the branches of an if statement based on the condition's truthiness.
     def visit_if_stmt(self, _stmt: Stmt.If):
         if self.is_truthy(self.evaluate(_stmt.condition)):
-            self.execute(_stmt.then_branch)
+            return self.execute(_stmt.then_branch)
         elif _stmt.else_branch is not None:
-            self.execute(_stmt.else_branch)
+            return self.execute(_stmt.else_branch)
         return None
 
     # Prints the string representation of an expression's value.
@@ -249,33 +385,40 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         print(self.stringify(value))
         return None
 
-    # Handles the return statement in a function, throwing a special exception.
+    # Handles the return statement in a function. Its completion holds the value, and every enclosing statement passes
+    # it straight up to the function call; in exception mode a Return exception carries the value there instead.
     def visit_return_stmt(self, _stmt: Stmt.Return):
+        if _stmt.tail_call and not self.exceptional_returns:
+            return self.tail_call(_stmt.value)
         value = None
         if _stmt.value is not None:
             value = self.evaluate(_stmt.value)
-        raise Return(value)
+        if self.exceptional_returns:
+            raise Return(value)
+        return (value,)
 
     # Defines a variable in the current environment, optionally initialising it.
     def visit_var_stmt(self, _stmt: Stmt.Var):
         value = None
         if _stmt.initializer is not None:
             value = self.evaluate(_stmt.initializer)
-        self.environment.define(_stmt.name.lexme, value)
+        self.define(_stmt, value)
         return None
 
     # Repeatedly executes a statement while the condition is truthy.
     def visit_while_stmt(self, _stmt: Stmt.While):
         while self.is_truthy(self.evaluate(_stmt.condition)):
-            self.execute(_stmt.body)
+            completion = self.execute(_stmt.body)
+            if completion is not None:
+                return completion
         return None
 
     # Assigns a new value to a variable, handling both local and global scopes.
     def visit_assign_expr(self, _expr: Expr.Assign):
         value = self.evaluate(_expr.value)
-        if _expr in self.locals:
-            distance = self.locals[_expr]
-            self.environment.assign_at(distance, _expr.name, value)
+        distance = _expr.depth
+        if distance is not None:
+            self.environment.assign_at(distance, _expr.slot, value)
         else:
             self.globals.assign(_expr.name, value)
         return value
@@ -322,12 +465,169 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
         # Unreachable, but included for completeness.
         return None
 
-    # Calls a function or class constructor, evaluating its arguments and executing it.
+    # The handlers below evaluate the operator-specific nodes the Specializer substitutes for Binary, Unary and Logical
+    # nodes. Each applies its own operator, calling accept on its operands directly rather than going through evaluate.
+
+    # Adds two numbers or concatenates two strings, converting a number added to a string.
+    def visit_add_expr(self, _expr: Expr.Add):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        if isinstance(left, float):
+            if isinstance(right, float):
+                return left + right
+            if isinstance(right, str):
+                return str(left) + right
+        elif isinstance(left, str):
+            if isinstance(right, str):
+                return left + right
+            if isinstance(right, float):
+                return left + str(right)
+        raise RuntimeError(_expr.operator, "Operands must be two numbers or two strings.")
+
+    # Subtracts two numbers.
+    def visit_subtract_expr(self, _expr: Expr.Subtract):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left - right
+        raise RuntimeError(_expr.operator, "Operands must be numbers.")
+
+    # Multiplies two numbers.
+    def visit_multiply_expr(self, _expr: Expr.Multiply):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left * right
+        raise RuntimeError(_expr.operator, "Operands must be numbers.")
+
+    # Divides two numbers; like the generic handler, division does not check its operands.
+    def visit_divide_expr(self, _expr: Expr.Divide):
+        return float(_expr.left.accept(self)) / float(_expr.right.accept(self))
+
+    # Compares two numbers with >.
+    def visit_greater_expr(self, _expr: Expr.Greater):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left > right
+        raise RuntimeError(_expr.operator, "Operands must be numbers.")
+
+    # Compares two numbers with >=.
+    def visit_greaterequal_expr(self, _expr: Expr.GreaterEqual):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left >= right
+        raise RuntimeError(_expr.operator, "Operands must be numbers.")
+
+    # Compares two numbers with <.
+    def visit_less_expr(self, _expr: Expr.Less):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left < right
+        raise RuntimeError(_expr.operator, "Operands must be numbers.")
+
+    # Compares two numbers with <=.
+    def visit_lessequal_expr(self, _expr: Expr.LessEqual):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left <= right
+        raise RuntimeError(_expr.operator, "Operands must be numbers.")
+
+    # Tests two values for equality; values of different types, nil included, are never equal.
+    def visit_equal_expr(self, _expr: Expr.Equal):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        return type(left) is type(right) and left == right
+
+    # Tests two values for inequality.
+    def visit_notequal_expr(self, _expr: Expr.NotEqual):
+        left = _expr.left.accept(self)
+        right = _expr.right.accept(self)
+        return not (type(left) is type(right) and left == right)
+
+    # Negates a number; as in the generic handler, the error carries the operand rather than the operator.
+    def visit_negate_expr(self, _expr: Expr.Negate):
+        right = _expr.right.accept(self)
+        if isinstance(right, float):
+            return -right
+        raise RuntimeError(right, "Operand must be a number.")
+
+    # Inverts the truthiness of a value: only nil and false are falsey.
+    def visit_not_expr(self, _expr: Expr.Not):
+        right = _expr.right.accept(self)
+        return right is None or right is False
+
+    # Yields a falsey left operand, otherwise evaluates the right one.
+    def visit_and_expr(self, _expr: Expr.And):
+        left = _expr.left.accept(self)
+        if left is None or left is False:
+            return left
+        return _expr.right.accept(self)
+
+    # Yields a truthy left operand, otherwise evaluates the right one.
+    def visit_or_expr(self, _expr: Expr.Or):
+        left = _expr.left.accept(self)
+        if left is None or left is False:
+            return _expr.right.accept(self)
+        return left
+
+    # The handlers below run the superinstructions the Fuser substitutes for common idioms on plain locals.
+
+    # Adds a number to a local and assigns the result back to it, as i = i + 1 would.
+    def visit_increment_expr(self, _expr: Expr.Increment):
+        environment = self.environment
+        if _expr.depth:
+            environment = environment.ancestor(_expr.depth)
+        value = environment.slots[_expr.slot]
+        if isinstance(value, float):
+            value = environment.slots[_expr.slot] = value + _expr.value
+            return value
+        if isinstance(value, str):
+            value = environment.slots[_expr.slot] = value + str(_expr.value)
+            return value
+        raise RuntimeError(_expr.operator, "Operands must be two numbers or two strings.")
+
+    # Compares a local with a number.
+    def visit_compareconstant_expr(self, _expr: Expr.CompareConstant):
+        environment = self.environment
+        if _expr.depth:
+            environment = environment.ancestor(_expr.depth)
+        value = environment.slots[_expr.slot]
+        if isinstance(value, float):
+            return _expr.test(value, _expr.value)
+        raise RuntimeError(_expr.operator, "Operands must be numbers.")
+
+    # Compares two locals.
+    def visit_comparelocals_expr(self, _expr: Expr.CompareLocals):
+        left = self.environment.get_at(_expr.left_depth, _expr.left_slot)
+        right = self.environment.get_at(_expr.right_depth, _expr.right_slot)
+        if isinstance(left, float) and isinstance(right, float):
+            return _expr.test(left, right)
+        raise RuntimeError(_expr.operator, "Operands must be numbers.")
+
+    # Calls a function or class constructor, evaluating its arguments and executing it. A method called directly on an
+    # instance or through 'super' is called on the instance without first creating a bound function.
     def visit_call_expr(self, _expr: Expr.Call):
-        callee = self.evaluate(_expr.callee)
-        arguments = []
-        for argument in _expr.arguments:
-            arguments.append(self.evaluate(argument))
+        callee = _expr.callee
+        method = None
+        if type(callee) is Expr.Get:
+            _object = self.evaluate(callee.object)
+            if isinstance(_object, LoxInstance) and self.find_cached_field(callee, _object.shape) is None:
+                method = self.find_cached_method(callee, _object.klass, callee.name)
+            else:
+                callee = self.get_property(callee, _object)
+        elif type(callee) is Expr.Super:
+            method, _object = self.find_super_method(callee)
+        else:
+            callee = self.evaluate(callee)
+        arguments = [argument.accept(self) for argument in _expr.arguments]
+        if method is not None:
+            if len(arguments) != method.arity():
+                raise RuntimeError(_expr.paren, f"Expected {method.arity()} arguments but got {len(arguments)}.")
+            return method.call_method(self, _object, arguments)
         if not isinstance(callee, LoxCallable):
             raise RuntimeError(_expr.paren, "Can only call functions and classes.")
         function = callee
@@ -335,9 +635,59 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
             raise RuntimeError(_expr.paren, f"Expected {function.arity()} arguments but got {len(arguments)}.")
         return function.call(self, arguments)
 
+    # Evaluates a call a return statement returns the value of. A call to a Lox function is not made here: its function,
+    # the closure to run it in and its arguments are returned as the completion of the return statement, for the
+    # function making the call to run in place of itself once it has returned. Other calls are made as usual.
+    def tail_call(self, _expr: Expr.Call):
+        callee = _expr.callee
+        if type(callee) is Expr.Get:
+            _object = self.evaluate(callee.object)
+            if isinstance(_object, LoxInstance) and self.find_cached_field(callee, _object.shape) is None:
+                function = self.find_cached_method(callee, _object.klass, callee.name)
+                closure = function.binding(_object)
+            else:
+                function = self.get_property(callee, _object)
+                closure = None
+        elif type(callee) is Expr.Super:
+            function, _object = self.find_super_method(callee)
+            closure = function.binding(_object)
+        else:
+            function = self.evaluate(callee)
+            closure = None
+        arguments = [argument.accept(self) for argument in _expr.arguments]
+        if not isinstance(function, LoxCallable):
+            raise RuntimeError(_expr.paren, "Can only call functions and classes.")
+        if len(arguments) != function.arity():
+            raise RuntimeError(_expr.paren, f"Expected {function.arity()} arguments but got {len(arguments)}.")
+        if not isinstance(function, LoxFunction):
+            return (function.call(self, arguments),)
+        return function, closure if closure is not None else self.closure_of(function), arguments
+
+    # Returns the closure a function runs in when called by itself rather than as a method of an instance.
+    def closure_of(self, function: LoxFunction):
+        return function.closure
+
     # Retrieves a property from an object instance, throwing an error if the object is not an instance.
     def visit_get_expr(self, _expr: Expr.Get):
-        _object = self.evaluate(_expr.object)
-        if isinstance(_object, LoxInstance):
-            return _object.get(_expr.name)
-        raise RuntimeError(_expr.name, "Only instances have properties.")
+        return self.get_property(_expr, self.evaluate(_expr.object))
+
+    # Reads the property a Get expression names from an evaluated object. A field is returned as it is; a method is
+    # bound to the instance. Both are found through the expression's inline caches.
+    def get_property(self, _expr: Expr.Get, _object: object):
+        if not isinstance(_object, LoxInstance):
+            raise RuntimeError(_expr.name, "Only instances have properties.")
+        shape = _object.shape
+        if shape is not _expr.cache_shape:
+            _expr.cache_shape = shape
+            _expr.cache_index = shape.indexes.get(_expr.name.lexme)
+        if _expr.cache_index is not None:
+            return _object.values[_expr.cache_index]
+        return self.find_cached_method(_expr, _object.klass, _expr.name).bind(_object)
+
+    # Finds the index of the field a Get expression names in instances of a shape, or None if they have no such field,
+    # through the expression's inline cache, which holds on as long as the instances it reads share one shape.
+    def find_cached_field(self, _expr: Expr.Get, shape: Shape):
+        if shape is not _expr.cache_shape:
+            _expr.cache_shape = shape
+            _expr.cache_index = shape.indexes.get(_expr.name.lexme)
+        return _expr.cache_index
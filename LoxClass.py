@@ -6,6 +6,7 @@ inheritance (via superclass), and provides the mechanism for calling class const
 from LoxCallable import LoxCallable
 from LoxInstance import LoxInstance
 from LoxFunction import LoxFunction
+from Shape import Shape
 from typing import List, Dict, Self
 
 
@@ -15,17 +16,17 @@ class LoxClass(LoxCallable):
         self._superclass = superclass  # Store the superclass, if any, for inheritance.
         self._name = name  # The name of the class.
         self._methods = methods  # A dictionary of method names to their corresponding LoxFunction instances.
+        # Every method an instance can call, inherited ones included, flattened once when the class is declared so a
+        # lookup is a single dictionary access however deep the hierarchy; a class's own methods override inherited ones.
+        self.method_table = {**superclass.method_table, **methods} if superclass is not None else dict(methods)
+        # The 'init' method, looked up once for every construction and arity check.
+        self.initializer = self.method_table.get("init")
+        # The shape of a new instance, which has no fields yet; every instance of the class starts from it.
+        self.shape = Shape()
 
-    # Find a method in the class or its superclass by name.
+    # Find a method in the class or its superclasses by name, or None if there is none.
     def find_method(self, name: str):
-        # Check if the method exists in the current class.
-        if name in self._methods:
-            return self._methods[name]
-        # If the method isn't found and there is a superclass, try to find the method in the superclass.
-        if self._superclass is not None:
-            return self._superclass.find_method(name)
-        # Return None if the method is not found in the class hierarchy.
-        return None
+        return self.method_table.get(name)
 
     # Return the class name as its string representation.
     def __str__(self):
@@ -36,20 +37,16 @@ class LoxClass(LoxCallable):
     def call(self, interpreter: "Interpreter", arguments: List[object]):
         # Create a new instance of this class.
         instance = LoxInstance(self)
-        # Look for an 'init' method which acts as the class constructor.
-        initializer = self.find_method("init")
-        # If an initializer is found, bind it to the new instance and call it with the provided arguments.
-        if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+        # If there is an initializer, call it on the new instance with the provided arguments.
+        if self.initializer is not None:
+            self.initializer.call_method(interpreter, instance, arguments)
         # Return the new instance.
         return instance
 
     # Get the number of parameters expected by the class's initialiser, if any.
     def arity(self):
-        # Find the 'init' method.
-        initializer = self.find_method("init")
         # If there is no initialiser, the arity is zero since the class can be instantiated without arguments.
-        if initializer is None:
+        if self.initializer is None:
             return 0
         # If an initialiser exists, return its arity (number of parameters it expects).
-        return initializer.arity()
+        return self.initializer.arity()
@@ -3,29 +3,61 @@ Represents a function in Lox. Implements LoxCallable. Manages function parameter
 it was declared), and execution. Supports method binding and initialisers for classes.
 """
 
-from typing import List, Self
+from typing import List, Self, Tuple
+from functools import lru_cache
+from math import copysign
 from Return import Return
-from Environment import Environment
+from Environment import Environment, allocations_avoided
 from LoxCallable import LoxCallable
 from LoxInstance import LoxInstance
 from Stmt import Function
 
 
+# Returns the keys a memoised function's cache is looked up by for a list of arguments: each number paired with its
+# sign, since 0 and -0 are equal but can give different results, and every other value as it is.
+def memo_keys(arguments: List[object]):
+    return [(argument, copysign(1.0, argument)) if type(argument) is float else argument for argument in arguments]
+
+
+# Returns the arguments a list of keys made by memo_keys stands for.
+def memo_arguments(keys: Tuple[object, ...]):
+    return [key[0] if type(key) is tuple else key for key in keys]
+
+
 class LoxFunction(LoxCallable):
     # Initialise a Lox function with its declaration, closure environment, and initializer status.
     def __init__(self, declaration: Function, closure: Environment, is_initializer: bool):
         self.is_initializer = is_initializer  # Indicates if this function is a class initialiser.
         self.closure = closure  # The environment capturing the surrounding scope at the time of function definition.
         self.declaration = declaration  # The function declaration.
+        self.shared_binding = None  # Environment shared by every binding of a method that never refers to 'this'.
+        self.memo = None  # Cache of the results of calls by their arguments, when the function is pure and memoised.
 
     # Create a new function bound to a given instance, for handling 'this' keyword.
     def bind(self, instance: LoxInstance):
-        # Create a new environment enclosing the function's closure for the bound instance.
-        environment = Environment(self.closure)
-        # Define 'this' in the new environment to refer to the instance.
-        environment.define("this", instance)
         # Return a new LoxFunction that is identical to this one but with 'this' bound to the instance.
-        return LoxFunction(self.declaration, environment, self.is_initializer)
+        return LoxFunction(self.declaration, self.binding(instance), self.is_initializer)
+
+    # Return the environment a method runs in when bound to a given instance, which holds 'this' in its only slot.
+    def binding(self, instance: LoxInstance):
+        # A method that never reads 'this' can share one environment between all of its bindings; only the
+        # initialiser, which returns 'this', always needs the real instance.
+        if not self.declaration.uses_this and not self.is_initializer:
+            if self.shared_binding is None:
+                self.shared_binding = Environment(self.closure, 1)
+            return self.shared_binding
+        # Create a new environment enclosing the function's closure for the bound instance.
+        environment = Environment(self.closure, 1)
+        # Define 'this', the environment's only slot, to refer to the instance.
+        environment.slots[0] = instance
+        return environment
+
+    # Return the binding for an instance as binding does, counting it into allocations_avoided if it is shared. An
+    # interpreter collecting statistics installs this in place of binding on the methods it declares.
+    def counting_binding(self, instance: LoxInstance):
+        if self.shared_binding is not None and not self.declaration.uses_this and not self.is_initializer:
+            allocations_avoided["bind"] += 1
+        return LoxFunction.binding(self, instance)
 
     # Return a string representation of the function, primarily for debugging purposes.
     def to_string(self):
@@ -37,23 +69,54 @@ class LoxFunction(LoxCallable):
         # The arity is the length of the function's parameters list.
         return len(self.declaration.params)
 
-    # Call this LoxFunction with a given list of arguments.
+    # Call this LoxFunction with a given list of arguments, or look up the result of the same call if it is memoised.
     def call(self, interpreter: "Interpreter", arguments: List[object]):
-        # Create a new environment for the function's execution, enclosing its closure.
-        environment = Environment(self.closure)
-        # Define the function's parameters in the new environment with the provided arguments.
-        for idx, param in enumerate(self.declaration.params):
-            environment.define(param.lexme, arguments[idx])
-        try:
-            # Execute the function's body within the new environment.
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as return_value:
-            # If a return statement is hit, return its value.
-            if self.is_initializer:
-                # If this function is an initializer, always return the instance.
-                return self.closure.get_at(0, "this")
-            return return_value.value
-        # If the function completes without hitting a return statement, return None unless it's an initializer.
-        if self.is_initializer:
-            return self.closure.get_at(0, "this")
-        return None
+        if self.memo is not None:
+            return self.memo(*memo_keys(arguments))
+        return self.run(interpreter, self.closure, arguments)
+
+    # Memoise calls to this function, which must be pure, in a cache of the results of the given number of calls with
+    # the most recently used arguments, which it is called with as the keys memo_keys makes of them. Arguments of
+    # different types are told apart even when they are equal, as true and 1 are in Python, and the cache's
+    # cache_info() reports its hits and misses.
+    def memoize(self, interpreter: "Interpreter", closure: object, size: int):
+        self.memo = lru_cache(maxsize=size, typed=True)(
+            lambda *keys: self.run(interpreter, closure, memo_arguments(keys)))
+
+    # Call this method on an instance as if it had been bound to it first, without creating the bound function.
+    def call_method(self, interpreter: "Interpreter", instance: LoxInstance, arguments: List[object]):
+        return self.run(interpreter, self.binding(instance), arguments)
+
+    # Run the function's body with the given arguments in a new environment enclosing a closure. A tail call the body
+    # ends with is made here, in a loop, running the callee in place of the function rather than nesting its call.
+    def run(self, interpreter: "Interpreter", closure: Environment, arguments: List[object]):
+        function = self
+        while True:
+            declaration = function.declaration
+            # Create a new environment for the function's execution, enclosing its closure, or reuse the spare one if
+            # no closure can outlive the call.
+            if declaration.reusable:
+                environment = interpreter.take_frame(declaration, closure, "call")
+            else:
+                environment = Environment(closure, declaration.size)
+            # Define the function's parameters, which occupy the first slots, with the provided arguments.
+            environment.slots[:len(arguments)] = arguments
+            try:
+                # Execute the function's body within the new environment; a return statement's completion holds its
+                # value, or the function, closure and arguments of the tail call it returns.
+                completion = interpreter.execute_block(declaration.body, environment)
+            except Return as return_value:
+                # In exception mode, a return statement raises its value instead.
+                completion = (return_value.value,)
+            finally:
+                if declaration.reusable:
+                    declaration.frame = environment
+            # If this function is an initializer, always return the instance.
+            if function.is_initializer:
+                return closure.slots[0]
+            # If the function completes without hitting a return statement, return None.
+            if completion is None:
+                return None
+            if len(completion) == 1:
+                return completion[0]
+            function, closure, arguments = completion
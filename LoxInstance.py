@@ -1,7 +1,8 @@
 """
-Represents an instance of a LoxClass in the interpreter. Stores instance fields and provides methods to get and set 
-them. It manages method lookups, enabling dynamic method binding for class instances. The class ensures encapsulation 
-and access control for instance variables and methods. 
+Represents an instance of a LoxClass in the interpreter. Stores instance fields, laid out by a Shape shared with other
+instances that gained the same fields in the same order, and provides methods to get and set them. It manages method
+lookups, enabling dynamic method binding for class instances. The class ensures encapsulation and access control for
+instance variables and methods.
 """
 
 from Token import Token
@@ -9,10 +10,13 @@ from RuntimeError import RuntimeError
 
 
 class LoxInstance:
-    # Initialise a new instance of a Lox class with a reference to its class and an empty fields dictionary.
+    __slots__ = ("klass", "shape", "values")
+
+    # Initialise a new instance of a Lox class with a reference to its class and no fields, in the class's root shape.
     def __init__(self, klass: "LoxClass"):
         self.klass = klass  # Store the class definition.
-        self.fields = {}  # Initialise an empty dictionary for instance fields.
+        self.shape = klass.shape  # The shape giving the index of each field in values.
+        self.values = []  # The values of the instance's fields, in the order they were added.
 
     # Return a string representation of this instance, typically for debugging purposes.
     def __str__(self):
@@ -21,9 +25,10 @@ class LoxInstance:
 
     # Retrieve a field or method from this instance based on a given name.
     def get(self, name: Token):
-        # If the field exists in this instance's fields, return its value.
-        if name.lexme in self.fields:
-            return self.fields[name.lexme]
+        # If the field exists in this instance's shape, return its value.
+        index = self.shape.indexes.get(name.lexme)
+        if index is not None:
+            return self.values[index]
         # If the field is not found, attempt to find a method of the same name in the class.
         method = self.klass.find_method(name.lexme)
         # If a method is found, return it bound to this instance.
@@ -34,5 +39,13 @@ class LoxInstance:
 
     # Assign a value to a field of this instance.
     def set(self, name: Token, value: object):
-        # Store the value in this instance's fields dictionary under the given name.
-        self.fields[name.lexme] = value
+        self.set_field(name.lexme, value)
+
+    # Assign a value to a field of this instance by name, adding the field, and so changing shape, if it is new.
+    def set_field(self, name: str, value: object):
+        index = self.shape.indexes.get(name)
+        if index is not None:
+            self.values[index] = value
+            return
+        self.shape = self.shape.with_field(name)
+        self.values.append(value)
@@ -0,0 +1,41 @@
+"""
+Persistent cache of translated programs for PythonInterpreter. Works like AstCache, in the same __loxcache__ directory
+next to each script, but stores the generated Python module as readable source, whose first line records the cache tag
+and the hash of the script it was translated from.
+"""
+
+import os
+from AstCache import AstCache
+
+
+class ModuleCache(AstCache):
+    # Extension of the cache files.
+    extension = "py"
+
+    # Load the cached module source for a script, or return None if there is no valid entry.
+    def load(self, script_path: str, digest: str):
+        try:
+            with open(self.path_for(script_path), "r") as f:
+                header = f.readline()
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+        # The entry is stale if the script has changed or it was written by a different version.
+        if header != f"# {self.tag} {digest}\n":
+            return None
+        return source
+
+    # Store the module source translated from a script, silently giving up if the cache is not writable.
+    def store(self, script_path: str, digest: str, source: str):
+        path = self.path_for(script_path)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "w") as f:
+                f.write(f"# {self.tag} {digest}\n")
+                f.write(source)
+            # Replace atomically so a concurrent run never sees a partly written entry.
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,84 @@
+"""
+Instruction set of the bytecode virtual machine. Each instruction is one word of a Chunk's code holding its opcode,
+followed by the number of operand words listed in OPERANDS: constant pool indexes, local slots, upvalue indexes,
+argument counts or absolute jump targets. Opcodes are numbered in groups, so that the VM can narrow an opcode down to
+its group with a range test before comparing it with each opcode in the group.
+"""
+
+from enum import IntEnum
+
+
+class OpCode(IntEnum):
+    # Values and variables.
+    CONSTANT = 0
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    GET_LOCAL = 5
+    SET_LOCAL = 6
+    DEFINE_LOCAL = 7
+    GET_BOXED = 8
+    SET_BOXED = 9
+    DEFINE_BOXED = 10
+    GET_UPVALUE = 11
+    SET_UPVALUE = 12
+    GET_GLOBAL = 13
+    SET_GLOBAL = 14
+    DEFINE_GLOBAL = 15
+    # Operators.
+    EQUAL = 16
+    NOT_EQUAL = 17
+    GREATER = 18
+    GREATER_EQUAL = 19
+    LESS = 20
+    LESS_EQUAL = 21
+    ADD = 22
+    SUBTRACT = 23
+    MULTIPLY = 24
+    DIVIDE = 25
+    NOT = 26
+    NEGATE = 27
+    # Jumps, to absolute offsets.
+    JUMP = 28
+    JUMP_IF_FALSE = 29
+    JUMP_IF_TRUE = 30
+    POP_JUMP_IF_FALSE = 31
+    # Calls, objects and everything else.
+    CALL = 32
+    RETURN = 33
+    CLOSURE = 34
+    GET_PROPERTY = 35
+    CHECK_INSTANCE = 36
+    SET_PROPERTY = 37
+    GET_SUPER = 38
+    INHERIT = 39
+    CLASS = 40
+    PRINT = 41
+
+
+# Number of operand words following each opcode; opcodes not listed take none.
+OPERANDS = {
+    OpCode.CONSTANT: 1,
+    OpCode.GET_LOCAL: 1,
+    OpCode.SET_LOCAL: 1,
+    OpCode.DEFINE_LOCAL: 1,
+    OpCode.GET_BOXED: 1,
+    OpCode.SET_BOXED: 1,
+    OpCode.DEFINE_BOXED: 1,
+    OpCode.GET_UPVALUE: 1,
+    OpCode.SET_UPVALUE: 1,
+    OpCode.GET_GLOBAL: 1,
+    OpCode.SET_GLOBAL: 1,
+    OpCode.DEFINE_GLOBAL: 1,
+    OpCode.GET_PROPERTY: 1,
+    OpCode.SET_PROPERTY: 1,
+    OpCode.GET_SUPER: 3,
+    OpCode.JUMP: 1,
+    OpCode.JUMP_IF_FALSE: 1,
+    OpCode.JUMP_IF_TRUE: 1,
+    OpCode.POP_JUMP_IF_FALSE: 1,
+    OpCode.CALL: 1,
+    OpCode.CLOSURE: 1,
+    OpCode.CLASS: 3,
+}
@@ -0,0 +1,216 @@
+"""
+Optimises a resolved AST before it is interpreted. Runs between the Resolver and the Interpreter and rewrites the tree
+according to an optimisation level:
+
+    0: no changes.
+    1: fold constant arithmetic, comparisons, string concatenation and logical operators, and prune if and while
+       statements whose condition is a constant.
+    2: additionally drop statements after a return and expression statements that have no effect.
+
+Constant expressions are folded by evaluating them with an Interpreter, so the folded value is exactly what the
+program would have computed. An expression whose evaluation fails, such as "a" - 1, is left in place so it still
+raises the same error, at the same point, at runtime. Nodes that are kept are reused rather than copied, so they keep
+the depths the resolver recorded on them.
+"""
+
+import Expr
+import Stmt
+from TokenType import TokenType
+from Interpreter import Interpreter
+
+# Highest supported optimisation level.
+MAX_LEVEL = 2
+
+
+class Optimizer(Expr.Visitor[Expr.Expr], Stmt.Visitor[Stmt.Stmt]):
+    # Initialise the optimiser with its level.
+    def __init__(self, level: int):
+        self.level = level
+        # Interpreter used to evaluate constant expressions; they never touch its environment.
+        self.evaluator = Interpreter()
+
+    # Optimise a list of statements, returning the new list.
+    def optimize(self, statements: list):
+        if self.level == 0:
+            return statements
+        return self.optimize_statements(statements)
+
+    # Optimise each statement of a list, dropping those that are removed and, at level 2, those after a return.
+    def optimize_statements(self, statements: list):
+        optimized = []
+        for statement in statements:
+            result = statement.accept(self)
+            if result is None:
+                continue
+            optimized.append(result)
+            # Nothing after a return in the same list can ever run.
+            if self.level >= 2 and isinstance(result, Stmt.Return):
+                break
+        return optimized
+
+    # Optimise a statement nested directly in another, substituting a statement that does nothing if it is removed.
+    def optimize_nested(self, _stmt: Stmt.Stmt):
+        result = _stmt.accept(self)
+        return result if result is not None else Stmt.Expression(Expr.Literal(None))
+
+    # Optimise an expression.
+    def optimize_expr(self, _expr: Expr.Expr):
+        return _expr.accept(self)
+
+    # Evaluate an expression whose operands are all literals, returning a literal or the expression if it fails.
+    def fold(self, _expr: Expr.Expr):
+        try:
+            return Expr.Literal(self.evaluator.evaluate(_expr))
+        except Exception:
+            return _expr
+
+    # Determine whether evaluating an expression can neither fail nor have side effects.
+    def is_pure(self, _expr: Expr.Expr):
+        if isinstance(_expr, (Expr.Literal, Expr.This)):
+            return True
+        # Locals are always defined, but reading an undefined global raises an error.
+        if isinstance(_expr, Expr.Variable):
+            return _expr.depth is not None
+        if isinstance(_expr, Expr.Grouping):
+            return self.is_pure(_expr.expression)
+        if isinstance(_expr, Expr.Logical):
+            return self.is_pure(_expr.left) and self.is_pure(_expr.right)
+        if isinstance(_expr, Expr.Unary):
+            return _expr.operator.type == TokenType.BANG and self.is_pure(_expr.right)
+        if isinstance(_expr, Expr.Binary):
+            # Equality accepts any operands; every other operator can fail on the wrong types.
+            return (_expr.operator.type in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL)
+                    and self.is_pure(_expr.left) and self.is_pure(_expr.right))
+        return False
+
+    # Block statements keep their own scope, so only their contents are optimised.
+    def visit_block_stmt(self, _stmt: Stmt.Block):
+        _stmt.statements = self.optimize_statements(_stmt.statements)
+        return _stmt
+
+    # Optimise each method of a class.
+    def visit_class_stmt(self, _stmt: Stmt.Class):
+        for method in _stmt.methods:
+            method.accept(self)
+        return _stmt
+
+    # Drop expression statements that cannot have any effect at level 2.
+    def visit_expression_stmt(self, _stmt: Stmt.Expression):
+        _stmt.expression = self.optimize_expr(_stmt.expression)
+        if self.level >= 2 and self.is_pure(_stmt.expression):
+            return None
+        return _stmt
+
+    # Optimise a function body.
+    def visit_function_stmt(self, _stmt: Stmt.Function):
+        _stmt.body = self.optimize_statements(_stmt.body)
+        return _stmt
+
+    # Replace an if statement with a constant condition by the branch that would run, or remove it.
+    def visit_if_stmt(self, _stmt: Stmt.If):
+        _stmt.condition = self.optimize_expr(_stmt.condition)
+        if isinstance(_stmt.condition, Expr.Literal):
+            if self.evaluator.is_truthy(_stmt.condition.value):
+                return _stmt.then_branch.accept(self)
+            return _stmt.else_branch.accept(self) if _stmt.else_branch is not None else None
+        _stmt.then_branch = self.optimize_nested(_stmt.then_branch)
+        if _stmt.else_branch is not None:
+            _stmt.else_branch = self.optimize_nested(_stmt.else_branch)
+        return _stmt
+
+    # Optimise the printed expression.
+    def visit_print_stmt(self, _stmt: Stmt.Print):
+        _stmt.expression = self.optimize_expr(_stmt.expression)
+        return _stmt
+
+    # Optimise the returned expression.
+    def visit_return_stmt(self, _stmt: Stmt.Return):
+        if _stmt.value is not None:
+            _stmt.value = self.optimize_expr(_stmt.value)
+        return _stmt
+
+    # Optimise a variable's initialiser.
+    def visit_var_stmt(self, _stmt: Stmt.Var):
+        if _stmt.initializer is not None:
+            _stmt.initializer = self.optimize_expr(_stmt.initializer)
+        return _stmt
+
+    # Remove a while loop whose condition is constantly false.
+    def visit_while_stmt(self, _stmt: Stmt.While):
+        _stmt.condition = self.optimize_expr(_stmt.condition)
+        if isinstance(_stmt.condition, Expr.Literal) and not self.evaluator.is_truthy(_stmt.condition.value):
+            return None
+        _stmt.body = self.optimize_nested(_stmt.body)
+        return _stmt
+
+    # Optimise the assigned value.
+    def visit_assign_expr(self, _expr: Expr.Assign):
+        _expr.value = self.optimize_expr(_expr.value)
+        return _expr
+
+    # Fold a binary operation on two literals.
+    def visit_binary_expr(self, _expr: Expr.Binary):
+        _expr.left = self.optimize_expr(_expr.left)
+        _expr.right = self.optimize_expr(_expr.right)
+        if isinstance(_expr.left, Expr.Literal) and isinstance(_expr.right, Expr.Literal):
+            return self.fold(_expr)
+        return _expr
+
+    # Optimise the callee and arguments of a call.
+    def visit_call_expr(self, _expr: Expr.Call):
+        _expr.callee = self.optimize_expr(_expr.callee)
+        _expr.arguments = [self.optimize_expr(argument) for argument in _expr.arguments]
+        return _expr
+
+    # Optimise the object of a property access.
+    def visit_get_expr(self, _expr: Expr.Get):
+        _expr.object = self.optimize_expr(_expr.object)
+        return _expr
+
+    # Parentheses around a literal are dropped.
+    def visit_grouping_expr(self, _expr: Expr.Grouping):
+        _expr.expression = self.optimize_expr(_expr.expression)
+        if isinstance(_expr.expression, Expr.Literal):
+            return _expr.expression
+        return _expr
+
+    # Literals are already as simple as they get.
+    def visit_literal_expr(self, _expr: Expr.Literal):
+        return _expr
+
+    # Short-circuit a logical operator whose left operand is a literal.
+    def visit_logical_expr(self, _expr: Expr.Logical):
+        _expr.left = self.optimize_expr(_expr.left)
+        _expr.right = self.optimize_expr(_expr.right)
+        if isinstance(_expr.left, Expr.Literal):
+            truthy = self.evaluator.is_truthy(_expr.left.value)
+            # 'or' yields a truthy left operand and 'and' a falsey one; otherwise the result is the right operand.
+            if truthy == (_expr.operator.type == TokenType.OR):
+                return _expr.left
+            return _expr.right
+        return _expr
+
+    # Optimise the object and value of a property assignment.
+    def visit_set_expr(self, _expr: Expr.Set):
+        _expr.object = self.optimize_expr(_expr.object)
+        _expr.value = self.optimize_expr(_expr.value)
+        return _expr
+
+    # 'super' has nothing to optimise.
+    def visit_super_expr(self, _expr: Expr.Super):
+        return _expr
+
+    # 'this' has nothing to optimise.
+    def visit_this_expr(self, _expr: Expr.This):
+        return _expr
+
+    # Fold a unary operation on a literal.
+    def visit_unary_expr(self, _expr: Expr.Unary):
+        _expr.right = self.optimize_expr(_expr.right)
+        if isinstance(_expr.right, Expr.Literal):
+            return self.fold(_expr)
+        return _expr
+
+    # Variable reads are left for the interpreter.
+    def visit_variable_expr(self, _expr: Expr.Variable):
+        return _expr
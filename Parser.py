@@ -1,10 +1,10 @@
 """
-Converts a list of tokens into an Abstract Syntax Tree (AST). Implements parsing logic to build the AST from lexical 
-tokens. It handles syntax rules and constructs for the Lox language, including expressions, statements, and control 
+Converts a stream of tokens into an Abstract Syntax Tree (AST). Implements parsing logic to build the AST from lexical 
+tokens, which are pulled one at a time from a list or a lazy generator so only a small window is ever held. It handles syntax rules and constructs for the Lox language, including expressions, statements, and control 
 structures. The class provides error recovery mechanisms to handle and report parsing errors gracefully. 
 """
 
-from typing import List
+from typing import Iterable
 from Token import Token
 from TokenType import TokenType
 from ErrorReporter import error_reporter
@@ -18,22 +18,24 @@ class ParseError(Exception):
 
 class Parser:
     # Initialise the parser with tokens and set the starting point for parsing.
-    def __init__(self, tokens: List[Token]):
-        # Initialise parser with a list of tokens.
-        self._tokens = tokens  
-        # Set the current position in the token list to the beginning.
-        self._current = 0  
+    def __init__(self, tokens: Iterable[Token]):
+        # Tokens are pulled from an iterator, so a list or a scanner's token generator can be consumed alike.
+        self._tokens = iter(tokens)  
+        # The lookahead window: the token just consumed and the current, not yet consumed, token.
+        self._previous = None  
+        self._current = next(self._tokens)  
 
     # Parse the tokens into a list of statements until the end of tokens is reached.
     def parse(self):
-        # Initialise an empty list to hold parsed statements.
-        statements = []  
+        # Collect every parsed statement into a list.
+        return list(self.iter_statements())  
+
+    # Yield statements one at a time as they are parsed, before the rest of the tokens have been scanned.
+    def iter_statements(self):
         # Continue parsing until the end of tokens is reached.
         while not self.is_at_end():  
-            # Parse a declaration and add it to the list of statements.
-            statements.append(self.declaration())  
-        # Return the list of parsed statements.
-        return statements  
+            # Parse a declaration and hand it to the caller.
+            yield self.declaration()  
         
     # Parse and return an expression, starting with assignment expressions.
     def expression(self):
@@ -517,26 +519,27 @@ class Parser:
 
     # Advance the current token pointer and return the previous token.
     def advance(self):
-        # Advance the current position if not at the end of the tokens list.
+        # Slide the window forward by pulling the next token, unless the EOF token has been reached.
         if not self.is_at_end():
-            self._current += 1
+            self._previous = self._current
+            self._current = next(self._tokens)
         # Return the token just passed by advance.
-        return self.previous()
+        return self._previous
 
     # Check if the current token pointer is at the end of the tokens list.
     def is_at_end(self):
         # Return True if the current token is the EOF (end of file) token.
-        return self.peek().type == TokenType.EOF
+        return self._current.type == TokenType.EOF
 
     # Get the current token without advancing the pointer.
     def peek(self):
-        # Return the current token based on the current pointer position.
-        return self._tokens[self._current]
+        # Return the current token in the lookahead window.
+        return self._current
 
     # Get the token just before the current one.
     def previous(self):
-        # Return the token before the current position.
-        return self._tokens[self._current - 1]
+        # Return the token most recently consumed.
+        return self._previous
 
     # Raise a parsing error and synchronise the parser.
     def error(self, token: Token, msg: str):
@@ -0,0 +1,201 @@
+"""
+Finds the functions of a resolved program that are pure, whose result depends only on their arguments and whose only
+effect is to return it, so that the interpreter can memoise their calls. It runs after the Resolver and marks each
+Stmt.Function it proves pure. A function is not pure if its body:
+
+    prints, or assigns a global variable or a variable it captured;
+    reads or assigns a property, or refers to 'this' or 'super', since fields can change between calls;
+    declares a function or class, since each call would return a new one;
+    captures a variable of an enclosing function, which may change between calls;
+    reads a global that is not constant: one the script declares more than once or assigns, or one it never
+        declares, such as the native 'clock' and 'input';
+    calls anything but a constant global declared by a pure function.
+
+Methods are never pure, as they depend on their instance. A call to a pure function can only return a number, string,
+boolean or nil it computed, or one of the values its arguments or constant globals hold, so its result can be cached
+by its arguments. Globals are only known to be constant within the script being analysed.
+"""
+
+from typing import Dict, List, Set
+import Expr
+import Stmt
+
+
+class PurityAnalyzer(Expr.Visitor[None], Stmt.Visitor[None]):
+    # Initialise the analyser with nothing found yet.
+    def __init__(self):
+        # Every function and method analysed, and the one whose body is being walked, or None at top level.
+        self.functions: List[Stmt.Function] = []
+        self.function: Stmt.Function = None
+        # Functions whose body does something that makes them impure whatever the globals turn out to hold.
+        self.impure: Set[Stmt.Function] = set()
+        # Names of the globals each function reads, and of those it calls.
+        self.reads: Dict[Stmt.Function, Set[str]] = {}
+        self.calls: Dict[Stmt.Function, Set[str]] = {}
+        # Names of the globals the program assigns anywhere.
+        self.assigned: Set[str] = set()
+
+    # Mark each pure function of a resolved program, returning the program.
+    def analyze(self, statements: List[Stmt.Stmt]):
+        self.walk(statements)
+        # A global is constant if the top level declares it once and nothing assigns it.
+        declarations = {}
+        for statement in statements:
+            if isinstance(statement, (Stmt.Var, Stmt.Function, Stmt.Class)):
+                name = statement.name.lexme
+                declarations[name] = statement if name not in declarations else None
+        constants = {name: declaration for name, declaration in declarations.items()
+                     if declaration is not None and name not in self.assigned}
+        pure = {function for function in self.functions if function not in self.impure
+                and not function.upvalues and self.reads[function] <= constants.keys()}
+        # Drop the functions calling anything but a pure function until every one left only calls the others.
+        changed = True
+        while changed:
+            changed = False
+            for function in list(pure):
+                if any(constants.get(name) not in pure for name in self.calls[function]):
+                    pure.discard(function)
+                    changed = True
+        for function in self.functions:
+            function.pure = function in pure
+        return statements
+
+    # Walk a list of statements.
+    def walk(self, statements: List[Stmt.Stmt]):
+        for statement in statements:
+            statement.accept(self)
+
+    # Walk an expression.
+    def walk_expr(self, _expr: Expr.Expr):
+        _expr.accept(self)
+
+    # Record that the function being walked, if any, is impure.
+    def taint(self):
+        if self.function is not None:
+            self.impure.add(self.function)
+
+    # Walk the statements of a block.
+    def visit_block_stmt(self, _stmt: Stmt.Block):
+        self.walk(_stmt.statements)
+
+    # A class declared in a function makes it impure, and its methods are never pure, but their bodies are walked for
+    # the globals they assign.
+    def visit_class_stmt(self, _stmt: Stmt.Class):
+        self.taint()
+        if _stmt.superclass is not None:
+            self.walk_expr(_stmt.superclass)
+        for method in _stmt.methods:
+            self.impure.add(method)
+            self.analyze_function(method)
+
+    # Walk an expression statement.
+    def visit_expression_stmt(self, _stmt: Stmt.Expression):
+        self.walk_expr(_stmt.expression)
+
+    # Analyse a function's body on its own; declaring it makes an enclosing function impure.
+    def visit_function_stmt(self, _stmt: Stmt.Function):
+        self.taint()
+        self.analyze_function(_stmt)
+
+    # Walk a function's body, recording what it does against the function rather than any enclosing one.
+    def analyze_function(self, function: Stmt.Function):
+        enclosing = self.function
+        self.function = function
+        self.functions.append(function)
+        self.reads[function] = set()
+        self.calls[function] = set()
+        self.walk(function.body)
+        self.function = enclosing
+
+    # Walk the condition and branches of an if statement.
+    def visit_if_stmt(self, _stmt: Stmt.If):
+        self.walk_expr(_stmt.condition)
+        _stmt.then_branch.accept(self)
+        if _stmt.else_branch is not None:
+            _stmt.else_branch.accept(self)
+
+    # Printing is an effect.
+    def visit_print_stmt(self, _stmt: Stmt.Print):
+        self.taint()
+        self.walk_expr(_stmt.expression)
+
+    # Walk the returned expression.
+    def visit_return_stmt(self, _stmt: Stmt.Return):
+        if _stmt.value is not None:
+            self.walk_expr(_stmt.value)
+
+    # Walk a variable's initialiser.
+    def visit_var_stmt(self, _stmt: Stmt.Var):
+        if _stmt.initializer is not None:
+            self.walk_expr(_stmt.initializer)
+
+    # Walk the condition and body of a while loop.
+    def visit_while_stmt(self, _stmt: Stmt.While):
+        self.walk_expr(_stmt.condition)
+        _stmt.body.accept(self)
+
+    # Assigning a global is an effect, and so is assigning a captured variable, which only a function that captures
+    # variables, and so is impure anyway, can do.
+    def visit_assign_expr(self, _expr: Expr.Assign):
+        if _expr.depth is None:
+            self.assigned.add(_expr.name.lexme)
+            self.taint()
+        self.walk_expr(_expr.value)
+
+    # Walk both operands.
+    def visit_binary_expr(self, _expr: Expr.Binary):
+        self.walk_expr(_expr.left)
+        self.walk_expr(_expr.right)
+
+    # Record a call of a global by name; calling anything else makes the function impure.
+    def visit_call_expr(self, _expr: Expr.Call):
+        callee = _expr.callee
+        if isinstance(callee, Expr.Variable) and callee.depth is None:
+            if self.function is not None:
+                self.calls[self.function].add(callee.name.lexme)
+        else:
+            self.taint()
+            self.walk_expr(callee)
+        for argument in _expr.arguments:
+            self.walk_expr(argument)
+
+    # Fields can change between calls.
+    def visit_get_expr(self, _expr: Expr.Get):
+        self.taint()
+        self.walk_expr(_expr.object)
+
+    # Walk the expression in parentheses.
+    def visit_grouping_expr(self, _expr: Expr.Grouping):
+        self.walk_expr(_expr.expression)
+
+    # Literals are pure.
+    def visit_literal_expr(self, _expr: Expr.Literal):
+        pass
+
+    # Walk both operands.
+    def visit_logical_expr(self, _expr: Expr.Logical):
+        self.walk_expr(_expr.left)
+        self.walk_expr(_expr.right)
+
+    # Mutating a field is an effect.
+    def visit_set_expr(self, _expr: Expr.Set):
+        self.taint()
+        self.walk_expr(_expr.object)
+        self.walk_expr(_expr.value)
+
+    # 'super' depends on the instance.
+    def visit_super_expr(self, _expr: Expr.Super):
+        self.taint()
+
+    # 'this' depends on the instance.
+    def visit_this_expr(self, _expr: Expr.This):
+        self.taint()
+
+    # Walk the operand.
+    def visit_unary_expr(self, _expr: Expr.Unary):
+        self.walk_expr(_expr.right)
+
+    # Record a read of a global, which is pure only if the global is constant.
+    def visit_variable_expr(self, _expr: Expr.Variable):
+        if _expr.depth is None and self.function is not None:
+            self.reads[self.function].add(_expr.name.lexme)
@@ -0,0 +1,43 @@
+"""
+Transpiling variant of Interpreter, selected with --engine python. A resolved program is translated by PythonTranspiler
+into the source of a Python module, which is what lox.py caches, so a cached script skips translation as well as
+scanning, parsing and resolving. Running it compiles the source with compile(), executes the module against the
+PythonRuntime helpers and the interpreter's globals, and calls its top-level script, leaving CPython's bytecode
+interpreter to do the work our visitors otherwise do. Runtime errors are reported at the Lox lines the transpiler wrote
+into the code.
+"""
+
+from typing import List
+import Stmt
+from RuntimeError import RuntimeError
+from ErrorReporter import error_reporter
+from Interpreter import Interpreter
+from PythonTranspiler import PythonTranspiler
+from TranspiledFunction import TranspiledFunction
+import PythonRuntime
+
+
+class PythonInterpreter(Interpreter):
+    # Translates resolved statements into the source of the Python module that runs them.
+    def prepare(self, statements: List[Stmt.Stmt]):
+        return PythonTranspiler().transpile(statements)
+
+    # Compiles and runs the source of a translated program.
+    def interpret(self, source: str):
+        namespace = {name: value for name, value in vars(PythonRuntime).items() if not name.startswith("__")}
+        namespace["TranspiledFunction"] = TranspiledFunction
+        namespace["G"] = self.globals.values
+        namespace["stringify"] = self.stringify
+        # The interpreter is a global of the translated module rather than of PythonRuntime, so that several can run.
+        namespace["interpreter"] = self
+        try:
+            code = compile(source, "<lox>", "exec")
+        except SyntaxError as error:
+            # An expression can still nest deeper than CPython's parser allows, even calling the runtime helpers.
+            error_reporter.report(error.lineno, " in translated code", error.msg)
+            return
+        exec(code, namespace)
+        try:
+            namespace["script"]()
+        except RuntimeError as error:
+            error_reporter.runtime_error(error)
@@ -0,0 +1,144 @@
+"""
+Runtime support for programs translated to Python by PythonTranspiler. Translated code inlines the common case of each
+operation, such as adding two numbers or calling a function with the right number of arguments, and falls back on these
+helpers for everything else: the less common cases, the error checks, and raising runtime errors at the Lox line the
+transpiler passes in. Every name defined here is available to translated code.
+"""
+
+# Operator functions that translated code passes to numeric().
+from operator import ge, gt, le, lt, mul, sub
+from typing import Callable, Dict
+from TokenType import TokenType
+from Token import Token
+from RuntimeError import RuntimeError
+from LoxCallable import LoxCallable
+from LoxClass import LoxClass
+from LoxInstance import LoxInstance
+from Cell import Cell
+
+
+# Returns a runtime error reported at a line of the Lox script.
+def error(line: int, msg: str):
+    return RuntimeError(Token(TokenType.IDENTIFIER, "", None, line), msg)
+
+
+# Raises a runtime error at a line of the Lox script.
+def fail(line: int, msg: str):
+    raise error(line, msg)
+
+
+# Raises the error for an arithmetic or comparison operator applied to something other than two numbers.
+def operands(line: int):
+    raise error(line, "Operands must be numbers.")
+
+
+# Raises the error for negating something other than a number, which like the Interpreter's carries the operand.
+def negate_operand(value: object):
+    raise RuntimeError(value, "Operand must be a number.")
+
+
+# Applies an arithmetic or comparison operator that requires two numbers, for code nested too deeply to inline it.
+def numeric(line: int, operator: Callable[[float, float], object], a: object, b: object):
+    if type(a) is type(b) is float:
+        return operator(a, b)
+    raise error(line, "Operands must be numbers.")
+
+
+# Divides two values, which like the inlined division performs no operand check.
+def divide(a: object, b: object):
+    return float(a) / float(b)
+
+
+# Whether two values are equal, which values of different types never are.
+def equal(a: object, b: object):
+    return type(a) is type(b) and a == b
+
+
+# Whether two values are not equal.
+def not_equal(a: object, b: object):
+    return not equal(a, b)
+
+
+# Negates a number, for code nested too deeply to inline the check.
+def negate(value: object):
+    if type(value) is float:
+        return -value
+    negate_operand(value)
+
+
+# Adds anything but two numbers, or two numbers in code nested too deeply to inline the addition: concatenates
+# strings, converting a number added to a string.
+def add(line: int, a: object, b: object):
+    if isinstance(a, float) and isinstance(b, float):
+        return a + b
+    if isinstance(a, str) and isinstance(b, str):
+        return a + b
+    if isinstance(a, float) and isinstance(b, str):
+        return str(a) + b
+    if isinstance(a, str) and isinstance(b, float):
+        return a + str(b)
+    raise error(line, "Operands must be two numbers or two strings.")
+
+
+# Reads a global variable that turned out not to be defined.
+def undefined(line: int, name: str):
+    raise error(line, f"Undefined variable '{name}'.")
+
+
+# Assigns a global variable, which must already be defined, returning the value.
+def set_global(globals: Dict[str, object], line: int, name: str, value: object):
+    if name not in globals:
+        raise error(line, f"Undefined variable '{name}'")
+    globals[name] = value
+    return value
+
+
+# Assigns a captured variable through its Cell, returning the value.
+def set_cell(cell: Cell, value: object):
+    cell.value = value
+    return value
+
+
+# Calls anything other than a function with the right number of arguments, on behalf of the interpreter running the
+# translated code, which native functions and classes are passed.
+def call(interpreter: "PythonInterpreter", line: int, callee: object, *arguments: object):
+    if not isinstance(callee, LoxCallable):
+        raise error(line, "Can only call functions and classes.")
+    if len(arguments) != callee.arity():
+        raise error(line, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+    return callee.call(interpreter, list(arguments))
+
+
+# Reads a property that is not a field of an instance: a method bound to it, or an error.
+def get(line: int, instance: object, name: str):
+    if not isinstance(instance, LoxInstance):
+        raise error(line, "Only instances have properties.")
+    index = instance.shape.indexes.get(name)
+    if index is not None:
+        return instance.values[index]
+    method = instance.klass.find_method(name)
+    if method is None:
+        raise error(line, f"Undefined property '{name}'.")
+    return method.bind(instance)
+
+
+# Returns an instance whose property is being assigned, checking that it is one.
+def check_instance(line: int, instance: object):
+    if not isinstance(instance, LoxInstance):
+        raise error(line, "Only instances have fields.")
+    return instance
+
+
+# Stores a value in a field of an instance, returning the value.
+def store(instance: LoxInstance, name: str, value: object):
+    instance.set_field(name, value)
+    return value
+
+
+# Finds a superclass method and binds it to 'this'.
+def get_super(line: int, superclass: LoxClass, instance: LoxInstance, name: str):
+    method = superclass.find_method(name)
+    if method is None:
+        raise error(line, f"Undefined property '{name}'.")
+    return method.bind(instance)
+
@@ -0,0 +1,427 @@
+"""
+Translates a resolved program into the source of a Python module for PythonInterpreter, so that CPython's own bytecode
+interpreter runs Lox code instead of our visitors. Every Lox function becomes a module-level Python function, and the
+top-level statements become the function 'script'.
+
+Lox locals become Python locals, renamed with a unique suffix so that shadowing and sibling scopes cannot clash, while
+globals stay in the interpreter's globals dictionary. Variables that closures capture are boxed in Cells, using the
+Resolver's flat-closure analysis: a function's code takes its captured Cells as its first argument, so each closure
+sees the variables of the scope it was created in even though Python functions do not nest here. Expressions inline
+their common case and runtime checks, for example
+
+    (_t1 - _t2 if type(_t1 := a_1) is type(_t2 := b_2) is float else operands(3))
+
+and fall back on PythonRuntime for the rest, passing the Lox line for any runtime error to be reported at. Inlining
+nests parentheses twice for every operand, so an expression nesting deeper than INLINE_DEPTH calls the helpers
+throughout instead, which keeps long chains of operators within the nesting CPython's parser accepts.
+"""
+
+from math import isfinite
+from typing import List
+import Expr
+import Stmt
+from TokenType import TokenType
+
+# Python comparison operators for the Lox ones, which all require two numbers.
+COMPARISONS = {
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+# Python arithmetic operators for the Lox ones that require two numbers.
+ARITHMETIC = {TokenType.MINUS: "-", TokenType.STAR: "*"}
+
+# Names of the PythonRuntime operator functions that helpers apply for the Lox operators that require two numbers.
+OPERATOR_FUNCTIONS = {
+    TokenType.GREATER: "gt",
+    TokenType.GREATER_EQUAL: "ge",
+    TokenType.LESS: "lt",
+    TokenType.LESS_EQUAL: "le",
+    TokenType.MINUS: "sub",
+    TokenType.STAR: "mul",
+}
+
+# Depth of the deepest expression whose common case is inlined; deeper ones call the PythonRuntime helpers.
+INLINE_DEPTH = 10
+
+# Operators whose result is always a boolean, so a condition using one needs no truthiness test.
+BOOLEAN_OPERATORS = {*COMPARISONS, TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL, TokenType.BANG}
+
+
+class PythonTranspiler(Expr.Visitor, Stmt.Visitor):
+    # Initialise the transpiler outside any function.
+    def __init__(self):
+        # Source of each finished Python function.
+        self.functions = []
+        # Lines of the Python function being written, and the indentation of the next line.
+        self.lines = []
+        self.indent = 1
+        # Python names of the variables in each scope of the current Lox function, by slot, innermost last.
+        self.scopes = []
+        # Temporaries used so far in the current function.
+        self.temps = 0
+        # Depth of the expression being translated within its statement, the deepest reached, and whether it inlines.
+        self.depth = 0
+        self.deepest = 0
+        self.inline = True
+        # Calls translated so far.
+        self.calls = 0
+        # Counter giving every Python name made from a Lox name a unique suffix.
+        self.names = 0
+        # Whether the function being written is an initialiser, which always returns 'this'.
+        self.initializer = False
+
+    # Translates a program into the source of a module defining its functions and its top-level script.
+    def transpile(self, statements: List[Stmt.Stmt]):
+        self.lines = ["def script():"]
+        for statement in statements:
+            statement.accept(self)
+        self.emit("pass")
+        self.functions.append("\n".join(self.lines))
+        return "\n\n\n".join(self.functions) + "\n"
+
+    # Appends a line to the current function at the current indentation.
+    def emit(self, line: str):
+        self.lines.append("    " * self.indent + line)
+
+    # Returns a new temporary of the current function.
+    def temp(self):
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    # Returns a unique Python name for a Lox name.
+    def unique(self, name: str):
+        self.names += 1
+        return f"{name}_{self.names}"
+
+    # Translates an expression, returning Python source for its value. An outermost expression that turns out to nest
+    # deeper than INLINE_DEPTH is translated again calling the helpers.
+    def evaluate(self, _expr: Expr.Expr):
+        if self.depth > 0:
+            return self.subexpression(_expr)
+        self.deepest = 0
+        self.inline = True
+        value = self.subexpression(_expr)
+        if self.deepest > INLINE_DEPTH:
+            self.inline = False
+            value = self.subexpression(_expr)
+        return value
+
+    # Translates an expression one level deeper than the one being translated.
+    def subexpression(self, _expr: Expr.Expr):
+        self.depth += 1
+        self.deepest = max(self.deepest, self.depth)
+        value = _expr.accept(self)
+        self.depth -= 1
+        return value
+
+    # Returns Python source for the truthiness of an expression as a condition.
+    def condition(self, _expr: Expr.Expr):
+        value = self.evaluate(_expr)
+        if self.is_boolean(_expr):
+            return value
+        temp = self.temp()
+        return f"(({temp} := {value}) is not None and {temp} is not False)"
+
+    # Whether an expression always produces a boolean.
+    def is_boolean(self, _expr: Expr.Expr):
+        while isinstance(_expr, Expr.Grouping):
+            _expr = _expr.expression
+        if isinstance(_expr, (Expr.Binary, Expr.Unary)):
+            return _expr.operator.type in BOOLEAN_OPERATORS
+        return isinstance(_expr, Expr.Literal) and isinstance(_expr.value, bool)
+
+    # Translates a list of statements into an indented block.
+    def block(self, statements: List[Stmt.Stmt]):
+        self.indent += 1
+        start = len(self.lines)
+        for statement in statements:
+            statement.accept(self)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    # Translates a function or method into a module-level Python function, returning source that creates a closure
+    # over it in the current scope.
+    def function(self, _stmt: Stmt.Function, initializer: bool):
+        enclosing = (self.lines, self.indent, self.scopes, self.temps, self.initializer)
+        name = self.unique(f"fn_{_stmt.name.lexme}")
+        params = [self.unique(param.lexme) for param in _stmt.params]
+        self.lines = [f"def {name}({', '.join(['U', *params])}):"]
+        self.indent = 1
+        self.scopes = [dict(enumerate(params))]
+        self.temps = 0
+        self.initializer = initializer
+        upvalues = [f"u{index}" for index in range(len(_stmt.upvalues))]
+        if upvalues:
+            self.emit(f"{', '.join(upvalues)}, = U")
+        # Parameters that a nested function captures are boxed on entry.
+        for slot in _stmt.boxed_params:
+            self.emit(f"{params[slot]} = Cell({params[slot]})")
+        for statement in _stmt.body:
+            statement.accept(self)
+        self.emit("return u0.value" if initializer else "return None")
+        self.functions.append("\n".join(self.lines))
+        self.lines, self.indent, self.scopes, self.temps, self.initializer = enclosing
+        # Captures are found from the scope the function is declared in.
+        captures = [self.scopes[-1 - depth][index] if depth is not None else f"u{index}"
+                    for depth, index in _stmt.upvalues]
+        return (f"TranspiledFunction({name}, {_stmt.name.lexme!r}, {len(params)}, {initializer}, {_stmt.uses_this}, "
+                f"[{', '.join(captures)}])")
+
+    # Returns the Python name for the variable a local declaration defines, in the current scope.
+    def declare(self, _stmt: Stmt.Stmt):
+        name = self.unique(_stmt.name.lexme)
+        self.scopes[-1][_stmt.slot] = name
+        return name
+
+    # Emits code defining the variable a declaration declares with a value: a global, a boxed local or a local.
+    def define(self, _stmt: Stmt.Stmt, value: str):
+        if _stmt.slot is None:
+            self.emit(f"G[{_stmt.name.lexme!r}] = {value}")
+        elif _stmt.boxed:
+            self.emit(f"{self.scopes[-1][_stmt.slot]} = Cell({value})")
+        else:
+            self.emit(f"{self.scopes[-1][_stmt.slot]} = {value}")
+
+    # Emits code storing a new value in a variable a declaration already defined.
+    def redefine(self, _stmt: Stmt.Stmt, value: str):
+        if _stmt.slot is not None and _stmt.boxed:
+            self.emit(f"{self.scopes[-1][_stmt.slot]}.value = {value}")
+        else:
+            self.define(_stmt, value)
+
+    # Returns Python source that reads a resolved variable, or the Cell holding it when it is captured.
+    def variable(self, _expr: Expr.Expr):
+        if _expr.upvalue is not None:
+            return f"u{_expr.upvalue}.value"
+        name = self.scopes[-1 - _expr.depth][_expr.slot]
+        return f"{name}.value" if _expr.boxed else name
+
+    # Blocks only open a scope; Python names are already unique.
+    def visit_block_stmt(self, _stmt: Stmt.Block):
+        if _stmt.scoped:
+            self.scopes.append({})
+        for statement in _stmt.statements:
+            statement.accept(self)
+        if _stmt.scoped:
+            self.scopes.pop()
+
+    # Classes are built from their methods' closures, which capture 'super' and 'this' Cells of two short scopes.
+    def visit_class_stmt(self, _stmt: Stmt.Class):
+        if _stmt.slot is not None:
+            self.declare(_stmt)
+        superclass = "None"
+        if _stmt.superclass is not None:
+            superclass = self.temp()
+            self.emit(f"{superclass} = {self.evaluate(_stmt.superclass)}")
+            self.emit(f"if type({superclass}) is not LoxClass: "
+                      f"fail({_stmt.superclass.name.line}, 'Superclass must be a class.')")
+        # Methods of a captured local class capture its Cell, so it has to exist before they are created.
+        if _stmt.slot is not None and _stmt.boxed:
+            self.define(_stmt, "None")
+        if _stmt.superclass is not None:
+            self.scopes.append({0: self.unique("super")})
+            self.emit(f"{self.scopes[-1][0]} = Cell({superclass})")
+        self.scopes.append({0: self.unique("this")})
+        self.emit(f"{self.scopes[-1][0]} = Cell(None)")
+        methods = [f"{method.name.lexme!r}: {self.function(method, method.name.lexme == 'init')}"
+                   for method in _stmt.methods]
+        self.scopes.pop()
+        if _stmt.superclass is not None:
+            self.scopes.pop()
+        self.redefine(_stmt, f"LoxClass({_stmt.name.lexme!r}, {superclass}, {{{', '.join(methods)}}})")
+
+    # Expression statements discard their value; assignments become Python assignment statements.
+    def visit_expression_stmt(self, _stmt: Stmt.Expression):
+        _expr = _stmt.expression
+        if isinstance(_expr, Expr.Assign):
+            value = self.evaluate(_expr.value)
+            if _expr.upvalue is None and _expr.depth is None:
+                temp = self.temp()
+                self.emit(f"{temp} = {value}")
+                self.emit(f"if {_expr.name.lexme!r} not in G: set_global(G, {_expr.name.line}, {_expr.name.lexme!r}, None)")
+                self.emit(f"G[{_expr.name.lexme!r}] = {temp}")
+            else:
+                self.emit(f"{self.variable(_expr)} = {value}")
+        elif isinstance(_expr, Expr.Set):
+            instance = self.temp()
+            self.emit(f"{instance} = {self.evaluate(_expr.object)}")
+            self.emit(f"if type({instance}) is not LoxInstance: fail({_expr.name.line}, 'Only instances have fields.')")
+            self.emit(f"{instance}.set_field({_expr.name.lexme!r}, {self.evaluate(_expr.value)})")
+        else:
+            self.emit(self.evaluate(_expr))
+
+    # Function declarations create a closure; a captured local function's Cell exists first so it can call itself.
+    def visit_function_stmt(self, _stmt: Stmt.Function):
+        if _stmt.slot is not None:
+            self.declare(_stmt)
+            if _stmt.boxed:
+                self.define(_stmt, "None")
+        self.redefine(_stmt, self.function(_stmt, False))
+
+    # If statements become Python if statements.
+    def visit_if_stmt(self, _stmt: Stmt.If):
+        self.emit(f"if {self.condition(_stmt.condition)}:")
+        self.block([_stmt.then_branch])
+        if _stmt.else_branch is not None:
+            self.emit("else:")
+            self.block([_stmt.else_branch])
+
+    # Print statements print the stringified value.
+    def visit_print_stmt(self, _stmt: Stmt.Print):
+        self.emit(f"print(stringify({self.evaluate(_stmt.expression)}))")
+
+    # Return statements return their value, or 'this' from an initialiser.
+    def visit_return_stmt(self, _stmt: Stmt.Return):
+        if self.initializer:
+            self.emit("return u0.value")
+        elif _stmt.value is None:
+            self.emit("return None")
+        else:
+            self.emit(f"return {self.evaluate(_stmt.value)}")
+
+    # Variable declarations define their initial value, nil by default.
+    def visit_var_stmt(self, _stmt: Stmt.Var):
+        value = self.evaluate(_stmt.initializer) if _stmt.initializer is not None else "None"
+        if _stmt.slot is not None:
+            self.declare(_stmt)
+        self.define(_stmt, value)
+
+    # While loops become Python while loops, testing the condition before each iteration.
+    def visit_while_stmt(self, _stmt: Stmt.While):
+        self.emit(f"while {self.condition(_stmt.condition)}:")
+        self.block([_stmt.body])
+
+    # Assignments used as values assign with := or through a runtime helper.
+    def visit_assign_expr(self, _expr: Expr.Assign):
+        value = self.evaluate(_expr.value)
+        if _expr.upvalue is not None:
+            return f"set_cell(u{_expr.upvalue}, {value})"
+        if _expr.depth is None:
+            return f"set_global(G, {_expr.name.line}, {_expr.name.lexme!r}, {value})"
+        name = self.scopes[-1 - _expr.depth][_expr.slot]
+        if _expr.boxed:
+            return f"set_cell({name}, {value})"
+        return f"({name} := {value})"
+
+    # Binary expressions inline the operation on two numbers together with the operand check.
+    def visit_binary_expr(self, _expr: Expr.Binary):
+        left = self.evaluate(_expr.left)
+        right = self.evaluate(_expr.right)
+        type = _expr.operator.type
+        line = _expr.operator.line
+        if not self.inline:
+            return self.binary_helper(type, line, left, right)
+        if type == TokenType.SLASH:
+            # Division performs no operand check.
+            return f"(float({left}) / float({right}))"
+        a, b = self.temp(), self.temp()
+        both = f"type({a} := {left}) is type({b} := {right})"
+        if type == TokenType.EQUAL_EQUAL:
+            return f"({both} and {a} == {b})"
+        if type == TokenType.BANG_EQUAL:
+            return f"(not ({both} and {a} == {b}))"
+        if type == TokenType.PLUS:
+            return f"({a} + {b} if {both} is float else add({line}, {a}, {b}))"
+        operator = COMPARISONS.get(type) or ARITHMETIC[type]
+        return f"({a} {operator} {b} if {both} is float else operands({line}))"
+
+    # Returns a call of the PythonRuntime helper for a binary operator, which nests its operands only once.
+    def binary_helper(self, type: TokenType, line: int, left: str, right: str):
+        if type == TokenType.SLASH:
+            return f"divide({left}, {right})"
+        if type == TokenType.EQUAL_EQUAL:
+            return f"equal({left}, {right})"
+        if type == TokenType.BANG_EQUAL:
+            return f"not_equal({left}, {right})"
+        if type == TokenType.PLUS:
+            return f"add({line}, {left}, {right})"
+        return f"numeric({line}, {OPERATOR_FUNCTIONS[type]}, {left}, {right})"
+
+    # Calls to a translated function with the right number of arguments call its code directly. Both branches pass the
+    # arguments, so arguments that make calls themselves are evaluated into temporaries along with the callee rather
+    # than written out twice, which would double the code for every call nested in them.
+    def visit_call_expr(self, _expr: Expr.Call):
+        callee = self.evaluate(_expr.callee)
+        calls = self.calls
+        arguments = [self.evaluate(argument) for argument in _expr.arguments]
+        nested = self.calls > calls
+        self.calls += 1
+        if not self.inline:
+            return f"call({', '.join(['interpreter', str(_expr.paren.line), callee, *arguments])})"
+        function = self.temp()
+        count = len(arguments)
+        test = f"type({function} := {callee}) is TranspiledFunction"
+        if nested:
+            temps = [self.temp() for _ in arguments]
+            bindings = [f"{temp} := {argument}" for temp, argument in zip(temps, arguments)]
+            test = f"({', '.join([f'{function} := {callee}', *bindings])}) and type({function}) is TranspiledFunction"
+            arguments = temps
+        return (f"({function}.code({', '.join([f'{function}.upvalues', *arguments])}) "
+                f"if {test} and {function}.params == {count} "
+                f"else call({', '.join(['interpreter', str(_expr.paren.line), function, *arguments])}))")
+
+    # Property reads inline reading a field of an instance.
+    def visit_get_expr(self, _expr: Expr.Get):
+        if not self.inline:
+            return f"get({_expr.name.line}, {self.evaluate(_expr.object)}, {_expr.name.lexme!r})"
+        instance = self.temp()
+        index = self.temp()
+        name = repr(_expr.name.lexme)
+        return (f"({instance}.values[{index}] if type({instance} := {self.evaluate(_expr.object)}) is LoxInstance "
+                f"and ({index} := {instance}.shape.indexes.get({name})) is not None "
+                f"else get({_expr.name.line}, {instance}, {name}))")
+
+    # Parentheses are kept as they are.
+    def visit_grouping_expr(self, _expr: Expr.Grouping):
+        return self.evaluate(_expr.expression)
+
+    # Literals are written as Python literals, except infinities and NaN, which Python has no literal for.
+    def visit_literal_expr(self, _expr: Expr.Literal):
+        if isinstance(_expr.value, float) and not isfinite(_expr.value):
+            return f"float({str(_expr.value)!r})"
+        return repr(_expr.value)
+
+    # Logical operators return their left operand when it decides the result, testing its truthiness once.
+    def visit_logical_expr(self, _expr: Expr.Logical):
+        left = self.evaluate(_expr.left)
+        right = self.evaluate(_expr.right)
+        temp = self.temp()
+        falsey = f"({temp} := {left}) is None or {temp} is False"
+        if _expr.operator.type == TokenType.OR:
+            return f"({right} if {falsey} else {temp})"
+        return f"({temp} if {falsey} else {right})"
+
+    # Property assignments used as values check for an instance before evaluating the value.
+    def visit_set_expr(self, _expr: Expr.Set):
+        instance = f"check_instance({_expr.name.line}, {self.evaluate(_expr.object)})"
+        return f"store({instance}, {_expr.name.lexme!r}, {self.evaluate(_expr.value)})"
+
+    # 'super' binds the captured superclass's method to the captured 'this'.
+    def visit_super_expr(self, _expr: Expr.Super):
+        return (f"get_super({_expr.method.line}, u{_expr.upvalue}.value, u{_expr.this_upvalue}.value, "
+                f"{_expr.method.lexme!r})")
+
+    # 'this' is read like any other captured variable.
+    def visit_this_expr(self, _expr: Expr.This):
+        return self.variable(_expr)
+
+    # Unary expressions inline the operand check of negation.
+    def visit_unary_expr(self, _expr: Expr.Unary):
+        right = self.evaluate(_expr.right)
+        temp = self.temp()
+        if _expr.operator.type == TokenType.BANG:
+            return f"(({temp} := {right}) is None or {temp} is False)"
+        if not self.inline:
+            return f"negate({right})"
+        return f"(-{temp} if type({temp} := {right}) is float else negate_operand({temp}))"
+
+    # Variables read their Python local, Cell or global.
+    def visit_variable_expr(self, _expr: Expr.Variable):
+        if _expr.upvalue is None and _expr.depth is None:
+            name = repr(_expr.name.lexme)
+            return f"(G[{name}] if {name} in G else undefined({_expr.name.line}, {name}))"
+        return self.variable(_expr)
@@ -26,6 +26,24 @@ class ClassType(Enum):
     CLASS = 2
     SUBCLASS = 3
 
+# Tracks one function, or the top-level script, while it is resolved: where its scopes start and what it captures.
+class FunctionScope:
+    def __init__(self, base: int):
+        # Index in Resolver.scopes of the function's outermost scope; scopes below it belong to enclosing functions.
+        self.base = base
+        # How each captured variable is found when the function is declared: (depth, slot) for a local of the
+        # enclosing function, or (None, index) for an upvalue the enclosing function captured itself.
+        self.upvalues = []
+        # Maps each capture to its index in upvalues, so a variable is captured only once.
+        self.indexes = {}
+
+    # Returns the upvalue index for a capture, adding it if the function does not capture it yet.
+    def add_upvalue(self, capture: tuple):
+        if capture not in self.indexes:
+            self.indexes[capture] = len(self.upvalues)
+            self.upvalues.append(capture)
+        return self.indexes[capture]
+
 
 class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
     def __init__(self, interpreter: Interpreter):
@@ -33,10 +51,23 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
         self.interpreter = interpreter
         # Initialise an empty list to manage scopes. This will be used to track variable scopes and their bindings.
         self.scopes = []
+        # Slot indexes of the variables in each scope, parallel to scopes; each variable gets the next free slot.
+        self.scope_slots = []
+        # Nodes that declare or refer to each variable of a scope from its own function, parallel to scopes, and the
+        # variables of each scope that a nested function captures; captured variables are boxed for flat closures.
+        self.scope_references = []
+        self.scope_captures = []
+        # Functions being resolved, innermost last, starting with the top-level script.
+        self.functions = [FunctionScope(0)]
         # Set the initial function context to NONE, indicating that the current context is not within a function.
         self.current_function = FunctionType.NONE
         # Set the initial class context to NONE, indicating that the current context is not within a class.
         self.current_class = ClassType.NONE
+        # Number of functions and classes declared so far, used to tell whether a scope contains any closures. A scope
+        # without closures never escapes: nothing can refer to its environment once it has finished running.
+        self.closure_count = 0
+        # Method whose 'this' a 'this' or 'super' expression would refer to, or None outside methods.
+        self.current_method = None
 
     # Utilises singledispatchmethod for method overloading based on argument type, enabling different handling for various input types.
     @singledispatchmethod
@@ -86,6 +117,12 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
         enclosing_function = self.current_function
         # Set the current function context to the type of the function being resolved.
         self.current_function = type
+        self.closure_count += 1
+        closure_count = self.closure_count
+        self.functions.append(FunctionScope(len(self.scopes)))
+        # A method always captures 'this' first, so binding it only has to replace its first upvalue.
+        if type in (FunctionType.METHOD, FunctionType.INTIALIZER):
+            self.capture(len(self.functions) - 1, len(self.scopes) - 1, "this")
         # Start a new scope for the function's parameters and body.
         self.begin_scope()
         # Iterate over each parameter in the function's definition.
@@ -96,6 +133,15 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
             self.define(param)
         # Resolve the body of the function, handling any variables or nested functions.
         self.resolve(function.body)
+        # The function's environment holds its parameters and the locals declared directly in its body.
+        function.size = len(self.scope_slots[-1])
+        # Record which parameters a nested function captures, and what this function captures.
+        function.boxed_params = [self.scope_slots[-1][param.lexme] for param in function.params
+                                 if param.lexme in self.scope_captures[-1]]
+        function.upvalues = self.functions.pop().upvalues
+        # Without closures in its body, each call's environment can be reused by the next call.
+        function.reusable = self.closure_count == closure_count
+        function.frame = None
         # End the current scope, popping it off the scope stack and cleaning up.
         self.end_scope()
         # Restore the previous function context now that the function's resolution is complete.
@@ -105,22 +151,42 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
     def begin_scope(self):
         # Append a new, empty dictionary to the scopes list to represent a new scope.
         self.scopes.append({})
+        self.scope_slots.append({})
+        self.scope_references.append({})
+        self.scope_captures.append(set())
 
     # end scope ends the current scope, effectively removing the most recent scope.
     def end_scope(self):
         # Remove the last dictionary from the scopes list, which represents ending the current scope.
         self.scopes.pop()
+        self.scope_slots.pop()
+        # Every declaration of and local reference to a captured variable now knows it is boxed.
+        references = self.scope_references.pop()
+        for name in self.scope_captures.pop():
+            for node in references.get(name, ()):
+                node.boxed = True
 
     # declares a new variable in the current scope. It checks for variable name uniqueness within the scope.
-    def declare(self, name: Token):
+    # Returns the variable's slot in the scope's environment, or None for a global.
+    def declare(self, name: Token, declaration: Stmt.Stmt = None):
         # If there are no scopes, do nothing. This means we're not within a valid scope to declare variables.
         if len(self.scopes) == 0:
-            return
+            return None
         # If the variable name already exists in the current scope, report an error.
         if name.lexme in self.scopes[-1]:
             error_reporter.error(name, "Already a variable with this name in this scope.")
         # Add the variable to the current scope and mark it as not yet defined (False).
         self.scopes[-1][name.lexme] = False
+        if declaration is not None:
+            self.scope_references[-1].setdefault(name.lexme, []).append(declaration)
+        return self.assign_slot(name.lexme)
+
+    # Gives a name in the current scope the next free slot of the scope's environment, returning its index.
+    def assign_slot(self, name: str):
+        slots = self.scope_slots[-1]
+        if name not in slots:
+            slots[name] = len(slots)
+        return slots[name]
 
     # define marks a previously declared variable in the current scope as defined.
     def define(self, name: Token):
@@ -136,19 +202,53 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
         for idx in range(len(self.scopes) - 1, -1, -1):
             # If variable found in current scope
             if name.lexme in self.scopes[idx]:  
-                # Tell interpreter variable's depth.
-                self.interpreter.resolve(_expr, len(self.scopes) - 1 - idx)  
+                # Tell the interpreter the variable's depth and slot.
+                self.interpreter.resolve(_expr, len(self.scopes) - 1 - idx, self.scope_slots[idx][name.lexme])  
+                # A variable of an enclosing function is captured; one of this function may later turn out to be.
+                if idx < self.functions[-1].base:
+                    _expr.upvalue = self.capture(len(self.functions) - 1, idx, name.lexme)
+                else:
+                    self.scope_references[idx].setdefault(name.lexme, []).append(_expr)
                 # Exit after resolving to avoid unnecessary iterations.
                 return  
 
+    # Captures a variable declared in a scope of an enclosing function, returning its upvalue index in the function.
+    def capture(self, function_index: int, scope_index: int, name: str):
+        function = self.functions[function_index]
+        enclosing = self.functions[function_index - 1]
+        if scope_index >= enclosing.base:
+            # A local of the enclosing function is found from the scope the function is declared in.
+            self.scope_captures[scope_index].add(name)
+            return function.add_upvalue((function.base - 1 - scope_index, self.scope_slots[scope_index][name]))
+        # Otherwise the enclosing function has to capture it first.
+        return function.add_upvalue((None, self.capture(function_index - 1, scope_index, name)))
+
+    # Finds the innermost scope declaring a name, returning its index or None if the name is global.
+    def find_scope(self, name: str):
+        for idx in range(len(self.scopes) - 1, -1, -1):
+            if name in self.scopes[idx]:
+                return idx
+        return None
+
     # Processes a block statement, handling scopes for statements within it.
     def visit_block_stmt(self, _stmt: Stmt.Block):
+        # A block that declares nothing needs no scope, and so no environment at runtime.
+        _stmt.scoped = any(isinstance(statement, (Stmt.Var, Stmt.Function, Stmt.Class)) for statement in _stmt.statements)
+        _stmt.frame = None
+        if not _stmt.scoped:
+            self.resolve(_stmt.statements)
+            return None
+        closure_count = self.closure_count
         # Start a new scope for the block.
         self.begin_scope()  
         # Resolve all statements within the block.
         self.resolve(_stmt.statements) 
+        # The block's environment needs a slot for each variable declared in it.
+        _stmt.size = len(self.scope_slots[-1])
         # End the block's scope.
         self.end_scope() 
+        # A block no closure can capture may reuse one environment every time it runs.
+        _stmt.reusable = self.closure_count == closure_count
         # Explicitly return None for clarity.
         return None  
 
@@ -163,10 +263,12 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
     def visit_class_stmt(self, _stmt: Stmt.Class):
         # Save the current class context.
         enclosing_class = self.current_class 
+        # Methods close over the scope the class is declared in.
+        self.closure_count += 1
         # Set current class type to CLASS. 
         self.current_class = ClassType.CLASS  
         # Declare the class name in the current scope.
-        self.declare(_stmt.name) 
+        _stmt.slot = self.declare(_stmt.name, _stmt) 
         # Define the class name in the current scope. 
         self.define(_stmt.name)  
         # Prevent a class from inheriting from itself.
@@ -184,10 +286,12 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
             self.begin_scope()  
             # Add "super" to the scope to access superclass methods.
             self.scopes[-1]["super"] = True  
+            self.assign_slot("super")
         # Start a new scope for "this".
         self.begin_scope()  
         # Add "this" to the scope to refer to the current instance.
         self.scopes[-1]["this"] = True 
+        self.assign_slot("this")
         # Resolve each method in the class. 
         for method in _stmt.methods:  
             # Default declaration type is METHOD.
@@ -196,8 +300,12 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
             if method.name.lexme == "init":  
                 # Set declaration type to INITIALIZER.
                 declaration = FunctionType.INTIALIZER  
-            # Resolve the method with its type.
+            # Resolve the method with its type, noting whether anything in it refers to 'this'.
+            enclosing_method = self.current_method
+            self.current_method = method
+            method.uses_this = False
             self.resolve_function(method, declaration)  
+            self.current_method = enclosing_method
         # End the scope for "this".
         self.end_scope()  
         # If there was a superclass
@@ -240,13 +348,15 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
                 error_reporter.error(_stmt.keyword, "Can't return a value from an initialiser.")
                 # Resolve the return value.
             self.resolve(_stmt.value)  
+            # Returning a call's value leaves nothing for the function to do after the call: it is a tail call.
+            _stmt.tail_call = isinstance(_stmt.value, Expr.Call)
         # Explicitly return None for clarity.
         return None  
 
     # Processes function declarations, setting up their scope and resolving their bodies.
     def visit_function_stmt(self, _stmt: Stmt.Function):
         # Declare the function in the current scope.
-        self.declare(_stmt.name)  
+        _stmt.slot = self.declare(_stmt.name, _stmt)  
         # Define the function, marking it as available in the current scope.
         self.define(_stmt.name)
         # Resolve the function's body.
@@ -257,7 +367,7 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
     # Handles variable declarations, including optional initializers.
     def visit_var_stmt(self, _stmt: Stmt.Var):
         # Declare the variable in the current scope.
-        self.declare(_stmt.name)  
+        _stmt.slot = self.declare(_stmt.name, _stmt)  
         # If the variable has an initializer, resolve it.
         if _stmt.initializer is not None:  
             self.resolve(_stmt.initializer)
@@ -342,6 +452,13 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
             error_reporter.error(_expr.keyword, "Can't use 'super' in a class with no superclass.")
         # Resolve 'super' in the current scope.
         self.resolve_local(_expr, _expr.keyword)  
+        # 'super' binds the superclass method to 'this'.
+        if self.current_method is not None:
+            self.current_method.uses_this = True
+        # A flat closure also needs the instance 'super' methods are bound to.
+        this_scope = self.find_scope("this")
+        if this_scope is not None and this_scope < self.functions[-1].base:
+            _expr.this_upvalue = self.capture(len(self.functions) - 1, this_scope, "this")
         return None
 
     # Processes 'this' expressions, used within classes to refer to the current object.
@@ -351,6 +468,8 @@ class Resolver(Expr.Visitor[None], Stmt.Visitor[None]):
             error_reporter.error(_expr.keyword, "Can't use 'this' outside of a class.")
         # Resolve 'this' in the current scope.
         self.resolve_local(_expr, _expr.keyword)  
+        if self.current_method is not None:
+            self.current_method.uses_this = True
         return None
 
     # Processes unary expressions, resolving the operand.
@@ -45,6 +45,16 @@ class Scanner:
         self.tokens.append(Token(TokenType.EOF, "", None, self.line))  # Append an End of File token at the end.
         return self.tokens  # Return the list of scanned tokens.
     
+    # Yields tokens one at a time as they are scanned, ending with an EOF token, without keeping the whole list.
+    def iter_tokens(self):
+        while not self.is_at_end():  # Continue until end of source code is reached.
+            self.start = self.current  # Mark the start of a new token.
+            self.scan_token()  # Scan a token into the list, which is then drained so it never grows.
+            if self.tokens:
+                yield from self.tokens
+                self.tokens.clear()
+        yield Token(TokenType.EOF, "", None, self.line)  # Finish with an End of File token.
+
     # Checks if the current position is at the end of the source code.
     def is_at_end(self):
         return self.current >= len(self.src)
@@ -0,0 +1,30 @@
+"""
+Hidden class describing the layout of a LoxInstance's fields. Instead of a dictionary of its own, an instance keeps its
+field values in a list and points to a Shape that maps each field name to its index in that list. Every class has an
+empty root shape for its new instances; adding a field moves an instance to the shape that extends its current one with
+that field, which is created once and remembered as a transition, so instances of a class that gain the same fields in
+the same order share one chain of shapes. A property access that has seen a shape before therefore knows where the
+field is, or that it is missing, without looking up its name.
+"""
+
+from typing import Dict, Self
+
+
+class Shape:
+    __slots__ = ("indexes", "transitions")
+
+    # Initialise a shape with the index of each field an instance of it has.
+    def __init__(self, indexes: Dict[str, int] = None):
+        # Maps field names to their indexes in an instance's list of values.
+        self.indexes = indexes if indexes is not None else {}
+        # Maps field names to the shape instances of this one move to when that field is added.
+        self.transitions = {}
+
+    # Return the shape of an instance of this shape once it has a given field: this shape if it already has it.
+    def with_field(self, name: str) -> Self:
+        if name in self.indexes:
+            return self
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = self.transitions[name] = Shape({**self.indexes, name: len(self.indexes)})
+        return shape
@@ -0,0 +1,146 @@
+"""
+Specialises a resolved AST for the tree-walking interpreters. Binary, Unary and Logical nodes each cover several
+operators, so evaluating one means testing its operator on every evaluation, one comparison after another. This pass
+replaces each of them with the node type for its operator, such as Add or Less, whose interpreter handler applies that
+operator directly, and drops Grouping nodes, which only pass their value through. It runs after the Resolver and the
+Optimizer, as part of the Fuser from Interpreter.prepare, so the specialised tree is what gets cached. Nodes that are
+kept are reused, so they keep the annotations the Resolver recorded on them.
+"""
+
+from typing import List
+import Expr
+import Stmt
+from TokenType import TokenType
+
+# Node type substituted for a Binary node with each operator.
+BINARY = {
+    TokenType.PLUS: Expr.Add,
+    TokenType.MINUS: Expr.Subtract,
+    TokenType.STAR: Expr.Multiply,
+    TokenType.SLASH: Expr.Divide,
+    TokenType.GREATER: Expr.Greater,
+    TokenType.GREATER_EQUAL: Expr.GreaterEqual,
+    TokenType.LESS: Expr.Less,
+    TokenType.LESS_EQUAL: Expr.LessEqual,
+    TokenType.EQUAL_EQUAL: Expr.Equal,
+    TokenType.BANG_EQUAL: Expr.NotEqual,
+}
+
+# Node type substituted for a Unary node with each operator.
+UNARY = {TokenType.MINUS: Expr.Negate, TokenType.BANG: Expr.Not}
+
+# Node type substituted for a Logical node with each operator.
+LOGICAL = {TokenType.AND: Expr.And, TokenType.OR: Expr.Or}
+
+
+class Specializer(Expr.Visitor[Expr.Expr], Stmt.Visitor[None]):
+    # Specialise a list of statements in place, returning it.
+    def specialize(self, statements: List[Stmt.Stmt]):
+        for statement in statements:
+            statement.accept(self)
+        return statements
+
+    # Specialise an expression, returning the node that replaces it.
+    def specialize_expr(self, _expr: Expr.Expr):
+        return _expr.accept(self)
+
+    # Specialise the statements of a block.
+    def visit_block_stmt(self, _stmt: Stmt.Block):
+        self.specialize(_stmt.statements)
+
+    # Specialise each method of a class.
+    def visit_class_stmt(self, _stmt: Stmt.Class):
+        for method in _stmt.methods:
+            method.accept(self)
+
+    # Specialise the expression of an expression statement.
+    def visit_expression_stmt(self, _stmt: Stmt.Expression):
+        _stmt.expression = self.specialize_expr(_stmt.expression)
+
+    # Specialise a function body.
+    def visit_function_stmt(self, _stmt: Stmt.Function):
+        self.specialize(_stmt.body)
+
+    # Specialise the condition and branches of an if statement.
+    def visit_if_stmt(self, _stmt: Stmt.If):
+        _stmt.condition = self.specialize_expr(_stmt.condition)
+        _stmt.then_branch.accept(self)
+        if _stmt.else_branch is not None:
+            _stmt.else_branch.accept(self)
+
+    # Specialise the printed expression.
+    def visit_print_stmt(self, _stmt: Stmt.Print):
+        _stmt.expression = self.specialize_expr(_stmt.expression)
+
+    # Specialise the returned expression.
+    def visit_return_stmt(self, _stmt: Stmt.Return):
+        if _stmt.value is not None:
+            _stmt.value = self.specialize_expr(_stmt.value)
+
+    # Specialise a variable's initialiser.
+    def visit_var_stmt(self, _stmt: Stmt.Var):
+        if _stmt.initializer is not None:
+            _stmt.initializer = self.specialize_expr(_stmt.initializer)
+
+    # Specialise the condition and body of a while loop.
+    def visit_while_stmt(self, _stmt: Stmt.While):
+        _stmt.condition = self.specialize_expr(_stmt.condition)
+        _stmt.body.accept(self)
+
+    # Specialise the assigned value.
+    def visit_assign_expr(self, _expr: Expr.Assign):
+        _expr.value = self.specialize_expr(_expr.value)
+        return _expr
+
+    # Replace a binary expression with the node for its operator.
+    def visit_binary_expr(self, _expr: Expr.Binary):
+        left = self.specialize_expr(_expr.left)
+        right = self.specialize_expr(_expr.right)
+        return BINARY[_expr.operator.type](left, _expr.operator, right)
+
+    # Specialise the callee and arguments of a call.
+    def visit_call_expr(self, _expr: Expr.Call):
+        _expr.callee = self.specialize_expr(_expr.callee)
+        _expr.arguments = [self.specialize_expr(argument) for argument in _expr.arguments]
+        return _expr
+
+    # Specialise the object of a property access.
+    def visit_get_expr(self, _expr: Expr.Get):
+        _expr.object = self.specialize_expr(_expr.object)
+        return _expr
+
+    # Parentheses only affect parsing, so a grouping is replaced by the expression inside it.
+    def visit_grouping_expr(self, _expr: Expr.Grouping):
+        return self.specialize_expr(_expr.expression)
+
+    # Literals have nothing to specialise.
+    def visit_literal_expr(self, _expr: Expr.Literal):
+        return _expr
+
+    # Replace a logical expression with the node for its operator.
+    def visit_logical_expr(self, _expr: Expr.Logical):
+        left = self.specialize_expr(_expr.left)
+        right = self.specialize_expr(_expr.right)
+        return LOGICAL[_expr.operator.type](left, _expr.operator, right)
+
+    # Specialise the object and value of a property assignment.
+    def visit_set_expr(self, _expr: Expr.Set):
+        _expr.object = self.specialize_expr(_expr.object)
+        _expr.value = self.specialize_expr(_expr.value)
+        return _expr
+
+    # 'super' has nothing to specialise.
+    def visit_super_expr(self, _expr: Expr.Super):
+        return _expr
+
+    # 'this' has nothing to specialise.
+    def visit_this_expr(self, _expr: Expr.This):
+        return _expr
+
+    # Replace a unary expression with the node for its operator.
+    def visit_unary_expr(self, _expr: Expr.Unary):
+        return UNARY[_expr.operator.type](_expr.operator, self.specialize_expr(_expr.right))
+
+    # Variable reads have nothing to specialise.
+    def visit_variable_expr(self, _expr: Expr.Variable):
+        return _expr
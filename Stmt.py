@@ -1,8 +1,10 @@
 """
-Abstract base class for all statement types in Lox. Defines the structure for statement execution. Subclasses 
-(Expression, Print, Var, Block, If, While, Function, Return, etc.) Represent specific types of statements. 
-Each subclass defines the structure and execution logic for its type of statement, such as variable declarations, 
+Abstract base class for all statement types in Lox. Defines the structure for statement execution. Subclasses
+(Expression, Print, Var, Block, If, While, Function, Return, etc.) Represent specific types of statements.
+Each subclass defines the structure and execution logic for its type of statement, such as variable declarations,
 control flow constructs, and function definitions.
+
+Generated by GenerateAst.py; edit the tables there and regenerate rather than editing this file.
 """
 
 from Expr import Expr, Variable
@@ -10,19 +12,21 @@ from Token import Token
 from typing import Generic, TypeVar, List
 
 # Defines a generic type variable R for return types.
-R = TypeVar("R")  
+R = TypeVar("R")
+
+# Base class for all statement types; it has no fields of its own.
+class Stmt:
+    __slots__ = ()
 
-# Base class for all statement types.
-class Stmt:  
     def __init__(self):
         pass
 
-# Generic visitor class for implementing visitor pattern.
-class Visitor(Generic[R]):  
+# Generic visitor class for implementing visitor pattern for statements.
+class Visitor(Generic[R]):
     def __init__(self):
-        pass 
+        pass
 
-# Maps statement types to their attributes for dynamic class generation.
+# Maps statement types to their attributes; the position of each, from 1, is its kind tag.
 subclasses = {
     "Block": {"statements": "List[Stmt]"},
     "Expression": {"expression": "Expr"},
@@ -35,22 +39,128 @@ subclasses = {
     "While": {"condition": "Expr", "body": "Stmt"},
 }
 
-# Iterate through statement types and dynamically create classes.
-for name, attributes in subclasses.items():  
-    args = ""  # Initialises argument string for constructor signature.
-    instance_init = ""  # Initialises instance variable assignment code.
-    for arg, arg_type in attributes.items():  # Builds constructor argument string.
-        args += f", {arg}: {arg_type}"
 
-    subclass_str = ""  # Initialises the string to hold the class definition code.
-    subclass_str += f"class {name}(Stmt):\n"  # Starts class definition.
-    subclass_str += f"    def __init__(self{args}):\n"  # Adds constructor signature.
+class Block(Stmt):
+    __slots__ = ("statements", "scoped", "size", "reusable", "frame")
+    kind = 1
+
+    def __init__(self, statements: List[Stmt]):
+        self.statements = statements
+        self.scoped = True
+        self.size = 0
+        self.reusable = False
+        self.frame = None
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_block_stmt(self)
+
+
+class Expression(Stmt):
+    __slots__ = ("expression",)
+    kind = 2
+
+    def __init__(self, expression: Expr):
+        self.expression = expression
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_expression_stmt(self)
+
+
+class Function(Stmt):
+    __slots__ = ("name", "params", "body", "slot", "boxed", "size", "boxed_params", "upvalues", "reusable", "frame", "uses_this", "pure")
+    kind = 3
+
+    def __init__(self, name: Token, params: List[Token], body: List[Stmt]):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.slot = None
+        self.boxed = False
+        self.size = 0
+        self.boxed_params = ()
+        self.upvalues = ()
+        self.reusable = False
+        self.frame = None
+        self.uses_this = True
+        self.pure = False
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_function_stmt(self)
+
+
+class Class(Stmt):
+    __slots__ = ("name", "superclass", "methods", "slot", "boxed")
+    kind = 4
+
+    def __init__(self, name: Token, superclass: Variable, methods: List[Function]):
+        self.name = name
+        self.superclass = superclass
+        self.methods = methods
+        self.slot = None
+        self.boxed = False
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_class_stmt(self)
+
+
+class If(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+    kind = 5
+
+    def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Stmt):
+        self.condition = condition
+        self.then_branch = then_branch
+        self.else_branch = else_branch
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_if_stmt(self)
+
+
+class Print(Stmt):
+    __slots__ = ("expression",)
+    kind = 6
+
+    def __init__(self, expression: Expr):
+        self.expression = expression
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_print_stmt(self)
+
+
+class Return(Stmt):
+    __slots__ = ("keyword", "value", "tail_call")
+    kind = 7
+
+    def __init__(self, keyword: Token, value: Expr):
+        self.keyword = keyword
+        self.value = value
+        self.tail_call = False
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_return_stmt(self)
+
+
+class Var(Stmt):
+    __slots__ = ("name", "initializer", "slot", "boxed")
+    kind = 8
+
+    def __init__(self, name: Token, initializer: Expr):
+        self.name = name
+        self.initializer = initializer
+        self.slot = None
+        self.boxed = False
+
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_var_stmt(self)
+
 
-    for arg in attributes:  # Adds code to assign instance variables.
-        subclass_str += f"        self.{arg} = {arg}\n"
+class While(Stmt):
+    __slots__ = ("condition", "body")
+    kind = 9
 
-    subclass_str += "\n"
-    subclass_str += "    def accept(self, visitor: Visitor[R]):\n"  # Adds accept method for visitor pattern.
-    subclass_str += f"        return visitor.visit_{name.lower()}_stmt(self)\n"
+    def __init__(self, condition: Expr, body: Stmt):
+        self.condition = condition
+        self.body = body
 
-    exec(subclass_str, globals())  # Dynamically executes the class definition code in the global namespace.
+    def accept(self, visitor: Visitor[R]):
+        return visitor.visit_while_stmt(self)
@@ -7,6 +7,9 @@ about the source code position.
 from TokenType import TokenType
 
 class Token:
+    # Fixed attribute slots instead of a per-token __dict__, keeping large token lists small.
+    __slots__ = ("type", "lexme", "literal", "line")
+
     def __init__(self, type: TokenType, lexme: str, literal: object, line: int):
         # Initialise a new Token object with provided attributes.
         # type: Specifies the category of the token (e.g., NUMBER, STRING, IDENTIFIER).
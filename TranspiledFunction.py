@@ -0,0 +1,54 @@
+"""
+A function value in programs translated to Python by PythonTranspiler. Each Lox function becomes a module-level Python
+function taking the list of Cells it captured, its upvalues, followed by the Lox arguments; a TranspiledFunction pairs
+that code with the upvalues of one closure, as FlatFunction does for the tree walker. A method's first upvalue is always
+'this', so binding one only replaces that Cell.
+"""
+
+from typing import Callable, List
+from LoxCallable import LoxCallable
+from LoxInstance import LoxInstance
+from Cell import Cell
+
+
+class TranspiledFunction(LoxCallable):
+    __slots__ = ("code", "name", "params", "is_initializer", "uses_this", "upvalues")
+
+    # Initialise a closure over translated code with its declaration's details and the Cells it captured.
+    def __init__(self, code: Callable, name: str, params: int, is_initializer: bool, uses_this: bool,
+                 upvalues: List[Cell]):
+        self.code = code
+        self.name = name
+        # Number of parameters, checked by call sites before calling the code directly.
+        self.params = params
+        self.is_initializer = is_initializer
+        self.uses_this = uses_this
+        self.upvalues = upvalues
+
+    # Create a new function bound to a given instance by giving it its own 'this' Cell.
+    def bind(self, instance: LoxInstance):
+        return TranspiledFunction(self.code, self.name, self.params, self.is_initializer, self.uses_this,
+                                  self.binding(instance))
+
+    # Return the upvalues of this method when bound to a given instance.
+    def binding(self, instance: LoxInstance):
+        # A method that never reads 'this' can keep its unbound upvalues; only the initialiser always needs it.
+        if self.uses_this or self.is_initializer:
+            return [Cell(instance), *self.upvalues[1:]]
+        return self.upvalues
+
+    # Return a string representation of the function, as LoxFunction does.
+    def to_string(self):
+        return f"fn {self.name}>"
+
+    # Return the number of parameters that the function expects.
+    def arity(self):
+        return self.params
+
+    # Call the translated code with the given arguments; an initialiser's code returns the instance itself.
+    def call(self, interpreter: "PythonInterpreter", arguments: List[object]):
+        return self.code(self.upvalues, *arguments)
+
+    # Call this method on an instance as if it had been bound to it first, without creating the bound function.
+    def call_method(self, interpreter: "PythonInterpreter", instance: LoxInstance, arguments: List[object]):
+        return self.code(self.binding(instance), *arguments)
@@ -0,0 +1,37 @@
+"""
+A function value in the bytecode virtual machine: a VMFunction prototype and the Cells of the variables it captured,
+as FlatFunction keeps them for the tree walker. A method's first upvalue is always 'this', so binding one only replaces
+that Cell. The VM calls closures itself; a closure only implements LoxCallable so that classes and arity checks treat
+it like any other function.
+"""
+
+from typing import List
+from LoxCallable import LoxCallable
+from LoxInstance import LoxInstance
+from VMFunction import VMFunction
+from Cell import Cell
+
+
+class VMClosure(LoxCallable):
+    __slots__ = ("function", "upvalues")
+
+    # Initialise a closure over a prototype with the Cells it captured.
+    def __init__(self, function: VMFunction, upvalues: List[Cell]):
+        self.function = function
+        self.upvalues = upvalues
+
+    # Create a new closure bound to a given instance by giving it its own 'this' Cell.
+    def bind(self, instance: LoxInstance):
+        function = self.function
+        # A method that never reads 'this' can keep its unbound upvalues; only the initialiser always needs it.
+        if not function.uses_this and not function.is_initializer:
+            return VMClosure(function, self.upvalues)
+        return VMClosure(function, [Cell(instance), *self.upvalues[1:]])
+
+    # Return a string representation of the function, as LoxFunction does.
+    def to_string(self):
+        return f"fn {self.function.name}>"
+
+    # Return the number of parameters that the function expects.
+    def arity(self):
+        return self.function.arity
@@ -0,0 +1,29 @@
+"""
+A function compiled to bytecode: its Chunk together with what the virtual machine needs to call it. This is only the
+prototype, held in the constant pool of the enclosing chunk; each time the declaration runs, the VM wraps it in a
+VMClosure with the Cells it captures.
+"""
+
+from typing import List
+from Chunk import Chunk
+
+
+class VMFunction:
+    __slots__ = ("name", "arity", "chunk", "size", "boxed_params", "upvalues", "is_initializer", "uses_this")
+
+    # Initialise a prototype from its compiled chunk and the frame layout the compiler worked out for it.
+    def __init__(self, name: str, arity: int, chunk: Chunk, size: int, boxed_params: List[int], upvalues: List[int],
+                 is_initializer: bool, uses_this: bool):
+        self.name = name
+        self.arity = arity
+        self.chunk = chunk
+        # Number of local slots in a call's frame, enough for the parameters and every scope nested in the body.
+        self.size = size
+        # Slots of the parameters that a nested function captures, which are boxed in Cells on entry.
+        self.boxed_params = boxed_params
+        # Where each captured Cell is found when the closure is created: a slot of the enclosing frame, or, encoded as
+        # -1 - index, one of the enclosing closure's own upvalues.
+        self.upvalues = upvalues
+        self.is_initializer = is_initializer
+        # Whether the method refers to 'this', so that binding it needs the instance.
+        self.uses_this = uses_this
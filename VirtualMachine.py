@@ -0,0 +1,372 @@
+"""
+Stack-based bytecode virtual machine, selected with --engine vm. The resolved program is compiled by BytecodeCompiler
+into Chunks, which a single dispatch loop runs without recursing in Python: a Lox call saves the caller's registers on
+a frame stack and switches to the callee's chunk, and a return switches back. Operands live on one value stack shared
+by every frame, and each call's locals in a list of slots sized by the compiler. Closures are flat, capturing Cells as
+FlatInterpreter's do, and classes and instances are the same LoxClass and LoxInstance the tree walker uses.
+
+Since the frames live on the heap rather than on Python's stack, how deeply Lox calls can nest is limited only by a
+memory budget, set with --stack-budget: the VM estimates how much memory each frame takes up from its number of slots,
+and reports a stack overflow when the frames of the unfinished calls would take up more than the budget.
+
+Output, runtime error messages and lines match the Interpreter. Runtime errors are reported at the line of the
+instruction that failed, which the compiler takes from the same token the Interpreter reports.
+"""
+
+import sys
+from typing import List
+import Stmt
+from TokenType import TokenType
+from Token import Token
+from RuntimeError import RuntimeError
+from ErrorReporter import error_reporter
+from Interpreter import Interpreter
+from LoxCallable import LoxCallable
+from LoxClass import LoxClass
+from LoxInstance import LoxInstance
+from OpCode import OpCode
+from BytecodeCompiler import BytecodeCompiler
+from VMClosure import VMClosure
+from Cell import Cell
+
+# Opcodes as plain integers, for comparison with the words of the code arrays.
+CONSTANT = int(OpCode.CONSTANT)
+NIL = int(OpCode.NIL)
+TRUE = int(OpCode.TRUE)
+FALSE = int(OpCode.FALSE)
+POP = int(OpCode.POP)
+GET_LOCAL = int(OpCode.GET_LOCAL)
+SET_LOCAL = int(OpCode.SET_LOCAL)
+DEFINE_LOCAL = int(OpCode.DEFINE_LOCAL)
+GET_BOXED = int(OpCode.GET_BOXED)
+SET_BOXED = int(OpCode.SET_BOXED)
+DEFINE_BOXED = int(OpCode.DEFINE_BOXED)
+GET_UPVALUE = int(OpCode.GET_UPVALUE)
+SET_UPVALUE = int(OpCode.SET_UPVALUE)
+GET_GLOBAL = int(OpCode.GET_GLOBAL)
+SET_GLOBAL = int(OpCode.SET_GLOBAL)
+DEFINE_GLOBAL = int(OpCode.DEFINE_GLOBAL)
+GET_PROPERTY = int(OpCode.GET_PROPERTY)
+CHECK_INSTANCE = int(OpCode.CHECK_INSTANCE)
+SET_PROPERTY = int(OpCode.SET_PROPERTY)
+GET_SUPER = int(OpCode.GET_SUPER)
+EQUAL = int(OpCode.EQUAL)
+NOT_EQUAL = int(OpCode.NOT_EQUAL)
+GREATER = int(OpCode.GREATER)
+GREATER_EQUAL = int(OpCode.GREATER_EQUAL)
+LESS = int(OpCode.LESS)
+LESS_EQUAL = int(OpCode.LESS_EQUAL)
+ADD = int(OpCode.ADD)
+SUBTRACT = int(OpCode.SUBTRACT)
+MULTIPLY = int(OpCode.MULTIPLY)
+DIVIDE = int(OpCode.DIVIDE)
+NOT = int(OpCode.NOT)
+NEGATE = int(OpCode.NEGATE)
+PRINT = int(OpCode.PRINT)
+JUMP = int(OpCode.JUMP)
+JUMP_IF_FALSE = int(OpCode.JUMP_IF_FALSE)
+JUMP_IF_TRUE = int(OpCode.JUMP_IF_TRUE)
+POP_JUMP_IF_FALSE = int(OpCode.POP_JUMP_IF_FALSE)
+CALL = int(OpCode.CALL)
+CLOSURE = int(OpCode.CLOSURE)
+RETURN = int(OpCode.RETURN)
+INHERIT = int(OpCode.INHERIT)
+CLASS = int(OpCode.CLASS)
+
+# Memory, in bytes, that the frames of unfinished Lox calls may take up by default before the VM reports a stack
+# overflow instead of running out of memory.
+STACK_BUDGET = 64 * 1024 * 1024
+# Estimated size of a frame, in bytes: the registers saved for its caller, and its list of slots before any are added.
+FRAME_BYTES = sys.getsizeof((None,) * 7) + sys.getsizeof([])
+# Estimated size, in bytes, added to a frame by each of its slots.
+SLOT_BYTES = sys.getsizeof([None]) - sys.getsizeof([])
+
+
+# Compares two values for equality in Lox's logic.
+def is_equal(a: object, b: object):
+    if a is None:
+        return b is None
+    return type(a) == type(b) and a == b
+
+
+class VirtualMachine(Interpreter):
+    # Initialise the VM with the memory its call stack may take up, in bytes.
+    def __init__(self, returns: str = "value", stack_budget: int = STACK_BUDGET):
+        super().__init__(returns)
+        self.stack_budget = stack_budget
+
+    # Runs the resolved statements as they are: the BytecodeCompiler gives each operator its own opcode anyway.
+    def prepare(self, statements: List[Stmt.Stmt]):
+        return statements
+
+    # Compiles the statements to bytecode and runs the top-level script.
+    def interpret(self, statements: List[Stmt.Stmt]):
+        script = VMClosure(BytecodeCompiler().compile(statements), [])
+        try:
+            self.run(script)
+        except RuntimeError as error:
+            error_reporter.runtime_error(error)
+
+    # Builds the token a runtime error is reported at: the line of the instruction at an offset of a function's code.
+    def token_at(self, closure: VMClosure, offset: int):
+        return Token(TokenType.IDENTIFIER, "", None, closure.function.chunk.line_at(offset))
+
+    # Runs a closure until it returns from its outermost frame. Every instruction advances ip past its operands before
+    # anything that can fail, so ip - 1 is always within the failing instruction.
+    def run(self, closure: VMClosure):
+        globals = self.globals.values
+        stringify = self.stringify
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        # Registers of the suspended callers: closure, upvalues, code, constants, slots, return address, and the memory
+        # their frames took up, which is all that limits how deep Lox calls can nest.
+        frames = []
+        budget = self.stack_budget
+        used = FRAME_BYTES + SLOT_BYTES * closure.function.size
+        upvalues = closure.upvalues
+        code = closure.function.chunk.code
+        constants = closure.function.chunk.constants
+        slots = [None] * closure.function.size
+        ip = 0
+        while True:
+            op = code[ip]
+            # Opcodes are narrowed down to their group first, and then tested most frequent first.
+            if op < EQUAL:
+                if op == GET_LOCAL:
+                    push(slots[code[ip + 1]])
+                    ip += 2
+                elif op == CONSTANT:
+                    push(constants[code[ip + 1]])
+                    ip += 2
+                elif op == SET_LOCAL:
+                    slots[code[ip + 1]] = stack[-1]
+                    ip += 2
+                elif op == POP:
+                    pop()
+                    ip += 1
+                elif op == GET_UPVALUE:
+                    push(upvalues[code[ip + 1]].value)
+                    ip += 2
+                elif op == DEFINE_LOCAL:
+                    slots[code[ip + 1]] = pop()
+                    ip += 2
+                elif op == GET_GLOBAL:
+                    ip += 2
+                    name = constants[code[ip - 1]]
+                    if name not in globals:
+                        raise RuntimeError(self.token_at(closure, ip - 1), f"Undefined variable '{name}'.")
+                    push(globals[name])
+                elif op == GET_BOXED:
+                    push(slots[code[ip + 1]].value)
+                    ip += 2
+                elif op == NIL:
+                    push(None)
+                    ip += 1
+                elif op == SET_GLOBAL:
+                    ip += 2
+                    name = constants[code[ip - 1]]
+                    if name not in globals:
+                        raise RuntimeError(self.token_at(closure, ip - 1), f"Undefined variable '{name}'")
+                    globals[name] = stack[-1]
+                elif op == SET_UPVALUE:
+                    upvalues[code[ip + 1]].value = stack[-1]
+                    ip += 2
+                elif op == SET_BOXED:
+                    slots[code[ip + 1]].value = stack[-1]
+                    ip += 2
+                elif op == DEFINE_BOXED:
+                    slots[code[ip + 1]] = Cell(pop())
+                    ip += 2
+                elif op == TRUE:
+                    push(True)
+                    ip += 1
+                elif op == FALSE:
+                    push(False)
+                    ip += 1
+                else:
+                    globals[constants[code[ip + 1]]] = pop()
+                    ip += 2
+            elif op < JUMP:
+                ip += 1
+                if op == NOT:
+                    value = stack[-1]
+                    stack[-1] = value is None or value is False
+                    continue
+                if op == NEGATE:
+                    value = stack[-1]
+                    if not isinstance(value, float):
+                        # As in the Interpreter, the error carries the operand rather than a token.
+                        raise RuntimeError(value, "Operand must be a number.")
+                    stack[-1] = -value
+                    continue
+                b = pop()
+                a = stack[-1]
+                if op == ADD:
+                    if isinstance(a, float):
+                        if isinstance(b, float):
+                            stack[-1] = a + b
+                            continue
+                        if isinstance(b, str):
+                            stack[-1] = str(a) + b
+                            continue
+                    elif isinstance(a, str):
+                        if isinstance(b, str):
+                            stack[-1] = a + b
+                            continue
+                        if isinstance(b, float):
+                            stack[-1] = a + str(b)
+                            continue
+                    raise RuntimeError(self.token_at(closure, ip - 1), "Operands must be two numbers or two strings.")
+                if op == EQUAL:
+                    stack[-1] = is_equal(a, b)
+                elif op == NOT_EQUAL:
+                    stack[-1] = not is_equal(a, b)
+                elif op == DIVIDE:
+                    # Division performs no operand check, as in the Interpreter.
+                    stack[-1] = float(a) / float(b)
+                elif not (isinstance(a, float) and isinstance(b, float)):
+                    raise RuntimeError(self.token_at(closure, ip - 1), "Operands must be numbers.")
+                elif op == LESS:
+                    stack[-1] = a < b
+                elif op == SUBTRACT:
+                    stack[-1] = a - b
+                elif op == MULTIPLY:
+                    stack[-1] = a * b
+                elif op == GREATER:
+                    stack[-1] = a > b
+                elif op == LESS_EQUAL:
+                    stack[-1] = a <= b
+                else:
+                    stack[-1] = a >= b
+            elif op < CALL:
+                if op == POP_JUMP_IF_FALSE:
+                    value = pop()
+                    if value is None or value is False:
+                        ip = code[ip + 1]
+                    else:
+                        ip += 2
+                elif op == JUMP:
+                    ip = code[ip + 1]
+                elif op == JUMP_IF_FALSE:
+                    value = stack[-1]
+                    if value is None or value is False:
+                        ip = code[ip + 1]
+                    else:
+                        ip += 2
+                else:
+                    value = stack[-1]
+                    if value is None or value is False:
+                        ip += 2
+                    else:
+                        ip = code[ip + 1]
+            elif op == CALL:
+                count = code[ip + 1]
+                ip += 2
+                callee = stack[-1 - count]
+                if isinstance(callee, VMClosure):
+                    target = callee
+                elif isinstance(callee, LoxClass):
+                    # A class call creates the instance and runs the bound initialiser, if any, which returns it.
+                    instance = LoxInstance(callee)
+                    initializer = callee.initializer
+                    if initializer is None:
+                        if count != 0:
+                            raise RuntimeError(self.token_at(closure, ip - 1),
+                                               f"Expected 0 arguments but got {count}.")
+                        stack[-1] = instance
+                        continue
+                    target = initializer.bind(instance)
+                elif isinstance(callee, LoxCallable):
+                    # Native functions are called directly.
+                    arguments = stack[len(stack) - count:]
+                    if count != callee.arity():
+                        raise RuntimeError(self.token_at(closure, ip - 1),
+                                           f"Expected {callee.arity()} arguments but got {count}.")
+                    del stack[len(stack) - count - 1:]
+                    push(callee.call(self, arguments))
+                    continue
+                else:
+                    raise RuntimeError(self.token_at(closure, ip - 1), "Can only call functions and classes.")
+                function = target.function
+                if count != function.arity:
+                    raise RuntimeError(self.token_at(closure, ip - 1),
+                                       f"Expected {function.arity} arguments but got {count}.")
+                size = FRAME_BYTES + SLOT_BYTES * function.size
+                if used + size > budget:
+                    raise RuntimeError(self.token_at(closure, ip - 1), "Stack overflow.")
+                frames.append((closure, upvalues, code, constants, slots, ip, used))
+                used += size
+                # The arguments become the first slots of the callee's frame, with captured parameters boxed.
+                base = len(stack) - count
+                slots = stack[base:]
+                del stack[base - 1:]
+                slots.extend([None] * (function.size - count))
+                for slot in function.boxed_params:
+                    slots[slot] = Cell(slots[slot])
+                closure = target
+                upvalues = target.upvalues
+                code = function.chunk.code
+                constants = function.chunk.constants
+                ip = 0
+            elif op == RETURN:
+                value = pop()
+                if not frames:
+                    return value
+                closure, upvalues, code, constants, slots, ip, used = frames.pop()
+                push(value)
+            elif op == GET_PROPERTY:
+                ip += 2
+                name = constants[code[ip - 1]]
+                instance = stack[-1]
+                if not isinstance(instance, LoxInstance):
+                    raise RuntimeError(self.token_at(closure, ip - 1), "Only instances have properties.")
+                index = instance.shape.indexes.get(name)
+                if index is not None:
+                    stack[-1] = instance.values[index]
+                    continue
+                method = instance.klass.find_method(name)
+                if method is None:
+                    raise RuntimeError(self.token_at(closure, ip - 1), f"Undefined property '{name}'.")
+                stack[-1] = method.bind(instance)
+            elif op == CHECK_INSTANCE:
+                ip += 1
+                if not isinstance(stack[-1], LoxInstance):
+                    raise RuntimeError(self.token_at(closure, ip - 1), "Only instances have fields.")
+            elif op == SET_PROPERTY:
+                value = pop()
+                stack[-1].set_field(constants[code[ip + 1]], value)
+                stack[-1] = value
+                ip += 2
+            elif op == PRINT:
+                print(stringify(pop()))
+                ip += 1
+            elif op == CLOSURE:
+                prototype = constants[code[ip + 1]]
+                # Each capture is a Cell boxed in a slot of this frame, or one this closure captured itself.
+                push(VMClosure(prototype, [slots[index] if index >= 0 else upvalues[-1 - index]
+                                           for index in prototype.upvalues]))
+                ip += 2
+            elif op == GET_SUPER:
+                ip += 4
+                name = constants[code[ip - 3]]
+                method = upvalues[code[ip - 2]].value.find_method(name)
+                if method is None:
+                    raise RuntimeError(self.token_at(closure, ip - 1), f"Undefined property '{name}'.")
+                push(method.bind(upvalues[code[ip - 1]].value))
+            elif op == INHERIT:
+                ip += 1
+                if not isinstance(stack[-1], LoxClass):
+                    raise RuntimeError(self.token_at(closure, ip - 1), "Superclass must be a class.")
+            elif op == CLASS:
+                name = constants[code[ip + 1]]
+                count = code[ip + 2]
+                superclass = pop() if code[ip + 3] else None
+                methods = {}
+                for method in stack[len(stack) - count:]:
+                    methods[method.function.name] = method
+                del stack[len(stack) - count:]
+                push(LoxClass(name, superclass, methods))
+                ip += 4
+            else:
+                raise ValueError(f"Unknown opcode {op} at offset {ip}.")
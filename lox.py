@@ -6,22 +6,86 @@ or errors.
 
 import sys
 import os
+import mmap
+import argparse
 from Scanner import Scanner
+from FastScanner import FastScanner
+from CompactTokens import materialize
 from Parser import Parser
+from PrattParser import PrattParser
 from ErrorReporter import error_reporter
 from Interpreter import Interpreter
+from FlatInterpreter import FlatInterpreter
+from ClosureInterpreter import ClosureInterpreter
+from VirtualMachine import VirtualMachine, STACK_BUDGET
+from PythonInterpreter import PythonInterpreter
+from BytecodeCompiler import BytecodeCompiler
+from Disassembler import disassemble
 from Resolver import Resolver
+from PurityAnalyzer import PurityAnalyzer
+from AstCache import AstCache
+from ModuleCache import ModuleCache
+from Optimizer import Optimizer, MAX_LEVEL
+
+
+# Scanning engines selectable with --scanner; the reference scanner is kept for comparison and debugging.
+SCANNERS = {"fast": FastScanner, "reference": Scanner}
+# Parsers selectable with --parser; both build identical trees, the recursive-descent one being the reference.
+PARSERS = {"pratt": PrattParser, "descent": Parser}
+# Closure representations selectable with --closures: functions keep their declaring environment chain, or flat
+# closures keep only the variables they capture.
+INTERPRETERS = {"chain": Interpreter, "flat": FlatInterpreter}
+# Execution engines selectable with --engine, each with the closure representations it supports, its default first:
+# walking the tree, compiling it into Python closures first, compiling it to bytecode for a stack VM, or translating it
+# into Python source for CPython to run.
+ENGINES = {"tree": INTERPRETERS, "closure": {"chain": ClosureInterpreter}, "vm": {"flat": VirtualMachine},
+           "python": {"flat": PythonInterpreter}}
+# Ways the tree walkers can return from a function, selectable with --returns: passing the returned value up as the
+# completion of each enclosing statement, or raising it in a Return exception, as they once always did.
+RETURNS = ("value", "exception")
+# Caches of engines that cache something other than the resolved statements.
+CACHES = {"python": ModuleCache}
 
 
 class Lox:
-    def __init__(self):
-        self._interpreter = Interpreter()
+    def __init__(self, scanner: str = "fast", stream: bool = False, compact: bool = False, map_files: bool = False,
+                 parser: str = "pratt", cache: bool = True, optimize: int = 0, closures: str = None,
+                 engine: str = "tree", returns: str = "value", stack_budget: int = None, memoize: int = 0,
+                 statistics: bool = False):
+        interpreters = ENGINES[engine]
+        interpreter = interpreters[closures or next(iter(interpreters))]
+        # Only the VM, which keeps Lox calls off Python's stack, takes a budget for the memory its call stack may use,
+        # and only the tree walkers memoise pure functions and collect statistics for the benchmarks.
+        options = {}
+        if stack_budget is not None:
+            options["stack_budget"] = stack_budget
+        if memoize:
+            options["memoize"] = memoize
+        if statistics:
+            options["statistics"] = statistics
+        self._interpreter = interpreter(returns, **options)
+        # The scanner class used to tokenise source code.
+        self._scanner = SCANNERS[scanner]
+        # Whether tokens are streamed into the parser instead of being scanned into a list first.
+        self._stream = stream
+        # Whether tokens are stored in compact parallel arrays, which always uses the fast scanner.
+        self._compact = compact or map_files
+        # Whether script files are memory-mapped and scanned in place instead of being read into a string.
+        self._map_files = map_files
+        # The parser class used to build the syntax tree.
+        self._parser = PARSERS[parser]
+        # Optimisation level applied to resolved programs.
+        self._optimize = optimize
+        # On-disk cache of compiled scripts, or None when caching is disabled; each engine prepares its own program and
+        # each level is cached separately.
+        variant = f"-{engine}" + (f"-O{optimize}" if optimize else "")
+        self._cache = CACHES.get(engine, AstCache)(variant) if cache else None
 
     def main(self):
         # Construct the path to the directory containing scripts to run.
         script_to_run = os.path.join(os.getcwd(), "lox_scripts")
         # List all files in the directory and store them.
-        scripts_received = [file for file in os.listdir(script_to_run)]
+        scripts_received = [file for file in os.listdir(script_to_run) if file.endswith(".lox")]
         # Sort the list of scripts alphabetically for display.
         scripts_received.sort()
         if '.DS_Store' in scripts_received:
@@ -90,41 +154,147 @@ class Lox:
 
     # Executes a Lox script from a file, handling syntax and runtime errors.
     def run_file(self, path: str):
+        # Uses the compiled program cached for this exact script content, if there is one.
+        program = None
+        if self._cache is not None:
+            digest = self._cache.digest(path)
+            program = self._cache.load(path, digest)
+        if program is None:
+            program = self.prepare(self.compile_file(path))
+            # Caches the program for later runs unless it failed to compile.
+            if program is not None and self._cache is not None:
+                self._cache.store(path, digest, program)
+        if program is not None:
+            self.execute(program)
+        # Exits with error code 65 if a syntax error occurred.
+        if error_reporter.had_error:
+            sys.exit(65)
+        # Exits with error code 70 if a runtime error occurred.
+        if error_reporter.had_runtime_error:
+            sys.exit(70)
+
+    # Scans, parses and resolves a script file. A memory-mapped file is closed once it has been compiled, rather than
+    # when it is garbage collected, after the lexemes the tree still refers to have been read out of it.
+    def compile_file(self, path: str):
+        src = self.read_file(path)
+        try:
+            statements = self.compile(src)
+            if isinstance(src, mmap.mmap) and statements is not None:
+                materialize(statements)
+            return statements
+        finally:
+            if isinstance(src, mmap.mmap):
+                src.close()
+
+    # Reads a script file, or memory-maps it when enabled so the scanner works on the mapped bytes without a copy.
+    def read_file(self, path: str):
+        if self._map_files:
+            return self.map_file(path)
         # Opens the file for reading.
         with open(path, "r") as f: 
-            # Reads and executes the script content.
-            self.run(f.read())  
-            # Exits with error code 65 if a syntax error occurred.
-            if error_reporter.had_error:
-                sys.exit(65)
-            # Exits with error code 70 if a runtime error occurred.
-            if error_reporter.had_runtime_error:
-                sys.exit(70)
-
-    # Interprets the Lox source code provided as a string.
+            return f.read()
+
+    # Maps a script file read-only into memory and returns the buffer, which stays valid after the file is closed.
+    def map_file(self, path: str):
+        with open(path, "rb") as f:
+            # An empty file cannot be mapped, but then there is nothing to scan anyway.
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Interprets the Lox source code provided as a string, or as UTF-8 bytes when tokens are compact.
     def run(self, src: str):
-        # Initialises the scanner with the source code.
-        scanner = Scanner(src)  
-        # Scans the source code into tokens.
-        tokens = scanner.scan_tokens()  
+        program = self.prepare(self.compile(src))
+        if program is not None:
+            self.execute(program)
+
+    # Scans, parses and resolves source code, returning its statements, annotated with the depths of their resolved
+    # locals, or None if a syntax or resolution error was reported.
+    def compile(self, src: str):
+        # Scans the source code into tokens: into compact arrays, lazily when streaming so only a small window is held
+        # at once, or into a plain list.
+        if self._compact:
+            tokens = FastScanner(src).scan_compact()
+        else:
+            scanner = self._scanner(src)
+            tokens = scanner.iter_tokens() if self._stream else scanner.scan_tokens()  
         # Initialises the parser with the scanned tokens.
-        parser = Parser(tokens)  
+        parser = self._parser(tokens)  
         # Parses the tokens into statements.
         statements = parser.parse()  
         # Returns early if a syntax error was reported during parsing.
         if error_reporter.had_error:
-            return
+            return None
         # Initialises the resolver.
         resolver = Resolver(self._interpreter)  
         # Resolves variables and scopes in the statements.
         resolver.resolve(statements)  
         # Stops if there was a resolution error.
         if error_reporter.had_error:
-            return
-        self._interpreter.interpret(statements)  # Interprets the resolved statements.
+            return None
+        # Marks the pure functions, whose calls the interpreter may memoise.
+        PurityAnalyzer().analyze(statements)
+        # Optimises the resolved statements.
+        return Optimizer(self._optimize).optimize(statements)
+
+    # Compiles a script file to bytecode and prints the disassembled chunks instead of running it.
+    def disassemble_file(self, path: str):
+        program = self.compile_file(path)
+        if program is not None:
+            print(disassemble(BytecodeCompiler().compile(program)))
+        if error_reporter.had_error:
+            sys.exit(65)
+
+    # Turns compiled statements, unless compilation failed, into the program the interpreter runs.
+    def prepare(self, statements: list):
+        return self._interpreter.prepare(statements) if statements is not None else None
+
+    # Interprets a prepared program.
+    def execute(self, program: object):
+        self._interpreter.interpret(program)  # Interprets the resolved statements, or what the engine made of them.
 
 
 
 if __name__ == "__main__":
-    lox = Lox()
-    lox.main()
+    arg_parser = argparse.ArgumentParser(description="Run Lox scripts.")
+    arg_parser.add_argument("script", nargs="?", help="script to run; shows the script menu when omitted")
+    arg_parser.add_argument("--scanner", choices=SCANNERS, default="fast", help="scanning engine to use")
+    arg_parser.add_argument("--stream", action="store_true", help="stream tokens into the parser as they are scanned")
+    arg_parser.add_argument("--compact", action="store_true", help="store tokens in compact arrays (fast scanner only)")
+    arg_parser.add_argument("--mmap", action="store_true", help="memory-map script files and scan them in place")
+    arg_parser.add_argument("--parser", choices=PARSERS, default="pratt", help="expression parser to use")
+    arg_parser.add_argument("--no-cache", action="store_true", help="always recompile instead of using __loxcache__")
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=range(MAX_LEVEL + 1), default=0,
+                            help="optimisation level")
+    arg_parser.add_argument("--closures", choices=INTERPRETERS,
+                            help="closure representation: environment chains or flat closures over captured variables "
+                                 "(default: the engine's own)")
+    arg_parser.add_argument("--engine", choices=ENGINES, default="tree",
+                            help="execution engine: walk the tree, compile it into closures, or compile it to bytecode")
+    arg_parser.add_argument("--returns", choices=RETURNS, default="value",
+                            help="how the tree walkers return from functions: as a completion value or by exception")
+    arg_parser.add_argument("--stack-budget", type=int, metavar="MB",
+                            help="memory the vm engine's call stack may use before a stack overflow, in megabytes "
+                                 f"(default: {STACK_BUDGET // 1024 // 1024})")
+    arg_parser.add_argument("--memoize", type=int, default=0, metavar="SIZE",
+                            help="cache the results of up to SIZE calls to each pure function (tree engine only)")
+    arg_parser.add_argument("--disassemble", action="store_true", help="print the script's bytecode instead of running it")
+    args = arg_parser.parse_args()
+    if args.closures is not None and args.closures not in ENGINES[args.engine]:
+        arg_parser.error(f"--closures {args.closures} is not supported by --engine {args.engine}")
+    if args.stack_budget is not None and args.engine != "vm":
+        arg_parser.error(f"--stack-budget is not supported by --engine {args.engine}")
+    if args.memoize and args.engine != "tree":
+        arg_parser.error(f"--memoize is not supported by --engine {args.engine}")
+    lox = Lox(scanner=args.scanner, stream=args.stream, compact=args.compact, map_files=args.mmap, parser=args.parser,
+              cache=not args.no_cache, optimize=args.optimize, closures=args.closures,
+              engine=args.engine, returns=args.returns,
+              stack_budget=args.stack_budget * 1024 * 1024 if args.stack_budget is not None else None,
+              memoize=args.memoize)
+    # Run the given script directly, otherwise fall back to the interactive menu.
+    if args.script is not None and args.disassemble:
+        lox.disassemble_file(args.script)
+    elif args.script is not None:
+        lox.run_file(args.script)
+    else:
+        lox.main()